@@ -1,5 +1,7 @@
 from tests.base import ApiDBTestCase
 
+from zou.app.utils import fields
+
 
 class AssetTasksTestCase(ApiDBTestCase):
 
@@ -36,6 +38,38 @@ class AssetTasksTestCase(ApiDBTestCase):
             assets[0]["tasks"][0]["assignees"][0], str(self.person_id)
         )
 
+        assets = self.get("data/assets/with-tasks?fields=name,episode_id")
+        self.assertEqual(
+            assets, [{"name": self.asset.name, "episode_id": ""}]
+        )
+        assets = self.get("data/assets/with-tasks?fields=tasks")
+        self.assertEqual(len(assets[0]["tasks"]), 2)
+
+    def test_get_assets_and_tasks_columnar(self):
+        self.generate_fixture_task(name="Secondary")
+        assets = self.get("data/assets/with-tasks")
+        listing = self.get("data/assets/with-tasks?format=columnar")
+        ids = listing["ids"]
+        self.assertEqual(listing["type"], "Asset")
+        self.assertEqual(listing["entities"]["name"], [assets[0]["name"]])
+        self.assertEqual(
+            ids[listing["entities"]["asset_type_id"][0]],
+            assets[0]["asset_type_id"],
+        )
+        self.assertEqual(
+            [ids[index] for index in listing["tasks"]["id"]],
+            [task["id"] for task in assets[0]["tasks"]],
+        )
+        self.assertEqual(
+            ids[listing["tasks"]["assignees"][0][0]], self.person_id
+        )
+
+        listing = self.get(
+            "data/assets/with-tasks?format=columnar&episode_id=%s"
+            % fields.gen_uuid()
+        )
+        self.assertEqual(len(listing["entities"]["id"]), 1)
+
     def test_get_task_types_for_asset(self):
         task_types = self.get("data/assets/%s/task-types" % self.asset_id)
         self.assertEqual(len(task_types), 1)
@@ -1,4 +1,4 @@
-from tests.base import ApiTestCase
+from tests.base import ApiDBTestCase, ApiTestCase
 
 from zou import __version__
 from zou.app import app
@@ -18,3 +18,13 @@ class VersionTestCase(ApiTestCase):
         self.assertTrue("database-up" in data)
         self.assertTrue("event-stream-up" in data)
         self.assertTrue("key-value-store-up" in data)
+
+
+class CacheStatsTestCase(ApiDBTestCase):
+
+    def test_cache_stats_route(self):
+        data = self.get("/stats/cache")
+        self.assertTrue("local" in data)
+        self.assertTrue("functions" in data)
+        for line in self.get_raw("/stats/cache/influx").splitlines():
+            self.assertTrue(line.startswith("memoize,function="))
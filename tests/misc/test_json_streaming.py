@@ -0,0 +1,50 @@
+from tests.base import ApiDBTestCase
+
+from zou.app.models.task_type import TaskType
+
+
+class JsonStreamingTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(JsonStreamingTestCase, self).setUp()
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_asset_type()
+        self.generate_fixture_asset()
+        self.generate_fixture_sequence()
+        self.generate_fixture_shot()
+        self.generate_fixture_department()
+        self.generate_data(TaskType, 5, department_id=self.department.id)
+        self.config = self.flask_app.config
+        self.config["JSON_STREAMING_BATCH_SIZE"] = 2
+
+    def tearDown(self):
+        self.config["JSON_STREAMING"] = False
+        super(JsonStreamingTestCase, self).tearDown()
+
+    def get_streamed(self, path):
+        self.config["JSON_STREAMING"] = True
+        result = self.get(path)
+        self.config["JSON_STREAMING"] = False
+        return result
+
+    def test_stream_entries(self):
+        task_types = self.get("data/task-types")
+        self.assertEqual(len(task_types), 5)
+        self.assertEqual(self.get_streamed("data/task-types"), task_types)
+        self.assertEqual(
+            self.get_streamed("data/persons"), self.get("data/persons")
+        )
+
+    def test_stream_empty_entries(self):
+        self.assertEqual(self.get_streamed("data/task-status"), [])
+
+    def test_stream_invalid_filter(self):
+        self.config["JSON_STREAMING"] = True
+        self.get("data/task-types?department_id=wrong-id", 400)
+
+    def test_stream_shots_and_assets_with_tasks(self):
+        path = "data/shots/with-tasks"
+        self.assertEqual(self.get_streamed(path), self.get(path))
+        path = "data/assets/with-tasks"
+        self.assertEqual(self.get_streamed(path), self.get(path))
@@ -30,3 +30,26 @@ class PaginationTestCase(ApiDBTestCase):
         self.assertEqual(pagination_infos["page"], 2)
         self.assertEqual(pagination_infos["offset"], 100)
         self.assertEqual(pagination_infos["limit"], 100)
+
+    def test_cursor(self):
+        person_ids = []
+        result = self.get("data/persons?cursor=&total=exact")
+        self.assertEqual(result["total"], 251)
+        self.assertEqual(result["limit"], 100)
+        person_ids += [person["id"] for person in result["data"]]
+        while result["next_cursor"] is not None:
+            result = self.get(
+                "data/persons?cursor=%s" % result["next_cursor"]
+            )
+            self.assertFalse("total" in result)
+            person_ids += [person["id"] for person in result["data"]]
+        self.assertEqual(len(person_ids), 251)
+        self.assertEqual(len(set(person_ids)), 251)
+
+    def test_cursor_estimate(self):
+        result = self.get("data/persons?cursor=&total=estimate")
+        self.assertIsInstance(result["total"], int)
+        self.assertEqual(len(result["data"]), 100)
+
+    def test_wrong_cursor(self):
+        self.get("data/persons?cursor=wrong", 400)
@@ -1,7 +1,7 @@
 # -*- coding: UTF-8 -*-
 from tests.base import ApiDBTestCase
 
-from zou.app.utils import fields
+from zou.app.utils import events, fields
 
 
 class PersonTestCase(ApiDBTestCase):
@@ -38,6 +38,25 @@ class PersonTestCase(ApiDBTestCase):
         self.assertEqual(person, person_again)
         self.get_404("data/persons/%s" % fields.gen_uuid())
 
+    def test_get_persons_fields(self):
+        persons = self.get("data/persons?fields=first_name,last_name")
+        self.assertEqual(len(persons), 4)
+        self.assertEqual(
+            list(persons[0].keys()), ["id", "first_name", "last_name", "type"]
+        )
+        result = self.get("data/persons?fields=first_name&cursor=")
+        self.assertEqual(
+            list(result["data"][0].keys()),
+            ["id", "updated_at", "first_name", "type"],
+        )
+        person = self.get(
+            "data/persons/%s?fields=first_name" % self.person.id
+        )
+        self.assertEqual(person, {"first_name": "John"})
+        self.get("data/persons?fields=password", 400)
+        self.get("data/persons/%s?fields=password" % self.person.id, 400)
+        self.get("data/persons?fields=unknown", 400)
+
     def test_create_person(self):
         data = {
             "first_name": "John2",
@@ -72,6 +91,22 @@ class PersonTestCase(ApiDBTestCase):
         self.assertEqual(data["first_name"], person_again["first_name"])
         self.put_404("data/persons/%s" % fields.gen_uuid(), data)
 
+    def test_update_person_changes(self):
+        class Handler(object):
+            def handle_event(self, data):
+                self.data = data
+
+        handler = Handler()
+        events.register("person:update", "get_changes", handler)
+        data = {
+            "first_name": "Johnny",
+            "email": "johnny@gmail.com",
+            "phone": "+33 6 00 00 00 00",
+        }
+        self.put("data/persons/%s" % self.person.id, data)
+        events.unregister("person:update", "get_changes")
+        self.assertEqual(handler.data["changes"], {"first_name": "Johnny"})
+
     def test_delete_person(self):
         persons = self.get("data/persons")
         self.assertEqual(len(persons), 4)
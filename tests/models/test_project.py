@@ -59,6 +59,7 @@ class ProjectTestCase(ApiDBTestCase):
         self.generate_fixture_project_closed()
         self.delete("data/projects/%s" % self.project_closed.id)
         self.assertIsNone(Project.get(self.project_closed.id))
+        self.get_404("data/projects/deletion-jobs/unknown")
 
     def test_project_status(self):
         data = {
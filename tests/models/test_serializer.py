@@ -0,0 +1,86 @@
+import uuid
+
+from sqlalchemy.inspection import inspect
+
+from tests.base import ApiDBTestCase
+
+from zou.app.models.entity import Entity
+from zou.app.models.person import Person
+from zou.app.models.project import Project
+from zou.app.models.task import Task
+from zou.app.utils import fields
+from zou.app.utils.fields import serialize_value
+
+
+def inspect_serialize(instance, obj_type=None, relations=False):
+    """
+    Serialization based on instance inspection, used as reference.
+    """
+    obj_dict = {}
+    for attr in inspect(instance).attrs.keys():
+        if relations or not instance.is_join(attr):
+            obj_dict[attr] = serialize_value(getattr(instance, attr))
+    obj_dict["type"] = obj_type or type(instance).__name__
+    return obj_dict
+
+
+class SerializerTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(SerializerTestCase, self).setUp()
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_asset_type()
+        self.generate_assigned_task()
+
+    def assert_same_serialization(self, instances, obj_type=None):
+        for relations in [False, True]:
+            expected = [
+                inspect_serialize(instance, obj_type, relations)
+                for instance in instances
+            ]
+            serialized = [
+                instance.serialize(obj_type=obj_type, relations=relations)
+                for instance in instances
+            ]
+            self.assertEqual(serialized, expected)
+            self.assertEqual(
+                [list(obj_dict.keys()) for obj_dict in serialized],
+                [list(obj_dict.keys()) for obj_dict in expected],
+            )
+            self.assertEqual(
+                type(instances[0]).serialize_list(
+                    instances, obj_type=obj_type, relations=relations
+                ),
+                expected,
+            )
+
+    def test_serialize(self):
+        self.assert_same_serialization(Task.query.all())
+        self.assert_same_serialization(Entity.query.all())
+        self.assert_same_serialization(Project.query.all())
+        self.assert_same_serialization(Entity.query.all(), "Asset")
+
+    def test_serialize_new_instance(self):
+        task = Task(
+            name="New task",
+            project_id=str(self.project.id),
+            entity_id=self.asset.id,
+        )
+        self.assert_same_serialization([task])
+
+    def test_serialize_list_native(self):
+        tasks = Task.query.all()
+        native_tasks = Task.serialize_list(tasks, native=True)
+        self.assertIsInstance(native_tasks[0]["id"], uuid.UUID)
+        self.assertEqual(
+            fields.serialize_list(native_tasks), Task.serialize_list(tasks)
+        )
+
+    def test_serialize_list_overriden_serialize(self):
+        persons = Person.query.all()
+        self.assertEqual(
+            Person.serialize_list(persons),
+            [person.serialize() for person in persons],
+        )
+        self.assertTrue("full_name" in Person.serialize_list(persons)[0])
@@ -1,7 +1,9 @@
+import unittest
+
 from tests.base import ApiDBTestCase
 from zou.app.models.task_type import TaskType
 
-from zou.app.utils import fields
+from zou.app.utils import api, fields
 
 
 class TaskTypeTestCase(ApiDBTestCase):
@@ -55,3 +57,27 @@ class TaskTypeTestCase(ApiDBTestCase):
         task_types = self.get("data/task-types")
         self.assertEqual(len(task_types), 2)
         self.delete_404("data/task-types/%s" % fields.gen_uuid())
+
+    @unittest.skipIf(api.msgpack is None, "msgpack is not installed")
+    def test_get_task_types_msgpack(self):
+        headers = dict(self.base_headers, Accept=api.MSGPACK_MIMETYPE)
+        response = self.app.get("data/task-types", headers=headers)
+        self.assertEqual(response.mimetype, api.MSGPACK_MIMETYPE)
+        task_types = api.msgpack.unpackb(response.data, raw=False)
+        self.assertEqual(task_types, self.get("data/task-types"))
+
+    @unittest.skipIf(api.msgpack is None, "msgpack is not installed")
+    def test_create_task_type_msgpack(self):
+        data = {
+            "name": "animation",
+            "color": "#000000",
+            "department_id": str(self.department_id)
+        }
+        headers = dict(
+            self.post_headers, **{"Content-Type": api.MSGPACK_MIMETYPE}
+        )
+        response = self.app.post(
+            "data/task-types", data=api.msgpack.packb(data), headers=headers
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(self.get("data/task-types")), 4)
@@ -0,0 +1,33 @@
+from tests.base import ApiDBTestCase
+
+from zou.app.models.person import Person
+from zou.app.models.task_type import TaskType
+from zou.app.services import cache_service, tasks_service
+
+
+class CacheServiceTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(CacheServiceTestCase, self).setUp()
+
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_project_closed_status()
+        self.generate_fixture_project_closed()
+        self.generate_fixture_asset_type()
+        self.generate_fixture_department()
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+        self.generate_fixture_person()
+
+    def test_warm_cache(self):
+        result = cache_service.warm_cache()
+        self.assertEqual(result["projects"], 1)
+        self.assertEqual(result["persons"], Person.query.count())
+        self.assertEqual(result["task_types"], TaskType.query.count())
+
+        task_type_id = str(self.task_type.id)
+        TaskType.query.filter_by(id=task_type_id).update({"name": "Cached"})
+        self.assertNotEqual(
+            tasks_service.get_task_type(task_type_id)["name"], "Cached"
+        )
@@ -34,6 +34,20 @@ class NamesServiceTestCase(ApiDBTestCase):
         self.assertEqual(asset_name, "Props / Tree")
         self.assertEqual(shot_name, "E01 / S01 / P01")
 
+    def test_get_full_entity_names(self):
+        names = names_service.get_full_entity_names(
+            [self.asset.id, self.shot.id]
+        )
+        self.assertEqual(
+            names[str(self.asset.id)],
+            names_service.get_full_entity_name(self.asset.id),
+        )
+        self.assertEqual(
+            names[str(self.shot.id)],
+            ("E01 / S01 / P01", str(self.episode.id)),
+        )
+        self.assertEqual(names_service.get_full_entity_names([]), {})
+
     def test_get_preview_file_name(self):
         preview_file = files_service.create_preview_file(
             "main",
@@ -181,8 +181,24 @@ class ProjectServiceTestCase(ApiDBTestCase):
         )
 
         project_id = str(self.project.id)
-        deletion_service.remove_project(project_id)
+        steps = []
+        deletion_service.remove_project(
+            project_id, progress=lambda name, done, total: steps.append(name)
+        )
         self.assertIsNone(Project.get(project_id))
+        self.assertEqual(steps[0], "playlist")
+        self.assertEqual(steps[-1], "project")
+
+    def test_remove_project_job(self):
+        project_id = str(self.project.id)
+        project_name = self.project.name
+        projects_service.get_project_by_name(project_name)
+        deletion_service.remove_project_job(project_id)
+        self.assertRaises(
+            ProjectNotFoundException,
+            projects_service.get_project_by_name,
+            project_name,
+        )
 
     def test_is_tv_show(self):
         self.assertFalse(projects_service.is_tv_show(self.project.serialize()))
@@ -116,6 +116,23 @@ class ShotUtilsTestCase(ApiDBTestCase):
         self.assertEqual(shot["episode_name"], str(self.episode.name))
         self.assertEqual(len(shot["tasks"]), 1)
 
+    def test_get_full_shot_invalidation(self):
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.generate_fixture_department()
+        self.generate_fixture_task_status()
+        self.generate_fixture_task_type()
+        self.generate_fixture_shot_task()
+
+        shot = shots_service.get_full_shot(self.shot.id)
+        self.assertEqual(shot["tasks"][0]["priority"], 0)
+        self.shot_task.update({"priority": 3})
+        shot = shots_service.get_full_shot(self.shot.id)
+        self.assertEqual(shot["tasks"][0]["priority"], 3)
+        self.sequence.update({"name": "SE_renamed"})
+        shot = shots_service.get_full_shot(self.shot.id)
+        self.assertEqual(shot["sequence_name"], "SE_renamed")
+
     def test_get_scene(self):
         self.assertEqual(
             str(self.scene.id),
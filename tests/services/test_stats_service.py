@@ -0,0 +1,120 @@
+from tests.base import ApiDBTestCase
+
+from zou.app.models.task_stats import TaskStats
+from zou.app.services import (
+    assets_service,
+    shots_service,
+    stats_service,
+    tasks_service,
+)
+from zou.app.utils import events
+
+
+class StatsServiceTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(StatsServiceTestCase, self).setUp()
+        self.generate_fixture_project_status()
+        self.generate_fixture_project()
+        self.generate_fixture_asset_type()
+        self.generate_fixture_asset()
+        self.generate_fixture_episode()
+        self.generate_fixture_sequence()
+        self.generate_fixture_shot()
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.generate_fixture_department()
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+        self.generate_fixture_task_status_wip()
+        self.generate_fixture_task()
+        self.generate_fixture_shot_task()
+        self.project_id = str(self.project.id)
+        self.task_type_id = str(self.task_type.id)
+        self.animation_id = str(self.task_type_animation.id)
+        self.status_id = str(self.task_status.id)
+        self.wip_id = str(self.task_status_wip.id)
+        events.register_all(
+            {event_name: stats_service for event_name in stats_service.EVENTS}
+        )
+
+    def test_get_episode_stats_for_project(self):
+        stats = shots_service.get_episode_stats_for_project(self.project_id)
+        episode_id = str(self.episode.id)
+        self.assertEqual(
+            stats[episode_id][self.animation_id][self.status_id],
+            {"name": "opn", "color": "#FFFFFF", "count": 1, "frames": 0},
+        )
+        self.assertEqual(stats["all"]["all"][self.status_id]["count"], 1)
+        self.assertTrue(stats_service.is_project_stats_built(self.project_id))
+
+    def test_get_sequence_and_asset_type_stats(self):
+        stats = shots_service.get_sequence_stats_for_project(self.project_id)
+        self.assertEqual(
+            stats[str(self.sequence.id)][self.animation_id][self.status_id][
+                "count"
+            ],
+            1,
+        )
+        stats = assets_service.get_asset_type_stats_for_project(
+            self.project_id
+        )
+        self.assertEqual(
+            stats[str(self.asset_type.id)][self.task_type_id][self.status_id][
+                "count"
+            ],
+            1,
+        )
+
+    def test_handle_event(self):
+        stats_service.rebuild_project_stats(self.project_id)
+        self.shot_task.update({"task_status_id": self.task_status_wip.id})
+        stats_service.handle_event({"task_id": str(self.shot_task.id)})
+        stats = shots_service.get_sequence_stats_for_project(self.project_id)
+        task_type_stats = stats[str(self.sequence.id)][self.animation_id]
+        self.assertEqual(list(task_type_stats.keys()), [self.wip_id])
+
+        task_id = str(self.shot_task.id)
+        entity_id = str(self.shot_task.entity_id)
+        self.shot_task.delete()
+        stats_service.handle_event(
+            {"task_id": task_id, "entity_id": entity_id}
+        )
+        stats = shots_service.get_sequence_stats_for_project(self.project_id)
+        self.assertEqual(stats, {})
+
+    def get_sequence_status_ids(self):
+        stats = stats_service.get_stats(self.project_id, "sequence")
+        return [
+            str(task_status_id)
+            for (_, group_id, _, task_status_id, _, _, _, _) in stats
+            if str(group_id) == str(self.sequence.id)
+        ]
+
+    def test_status_changes(self):
+        stats_service.rebuild_project_stats(self.project_id)
+        self.assertEqual(self.get_sequence_status_ids(), [self.status_id])
+
+        tasks_service.start_task(self.shot_task.id)
+        self.assertEqual(self.get_sequence_status_ids(), [self.wip_id])
+
+        self.generate_fixture_task_status_to_review()
+        tasks_service.task_to_review(
+            self.shot_task.id, self.person.serialize(), "comment"
+        )
+        self.assertEqual(
+            self.get_sequence_status_ids(),
+            [str(self.task_status_to_review.id)],
+        )
+
+    def test_rebuild_stats(self):
+        self.assertEqual(stats_service.rebuild_stats(), 1)
+        self.assertEqual(
+            TaskStats.query.filter_by(group_type="asset_type").count(), 1
+        )
+        self.assertEqual(
+            TaskStats.query.filter_by(group_type="sequence").count(), 1
+        )
+        self.assertEqual(
+            TaskStats.query.filter_by(group_type="episode").count(), 1
+        )
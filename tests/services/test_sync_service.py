@@ -4,7 +4,9 @@ import gazu
 from tests.base import ApiDBTestCase
 
 from zou.app.models.entity import Entity
+from zou.app.models.monthly_time_spent import MonthlyTimeSpent
 from zou.app.models.project import Project
+from zou.app.models.time_spent import TimeSpent
 from zou.app.services import sync_service
 from zou.app.utils import events
 
@@ -81,6 +83,42 @@ class SyncServiceTestCase(ApiDBTestCase):
         self.assertIsNone(Entity.get(asset_id))
         self.assertTrue("asset_id" in self.last_event_data)
 
+    def test_sync_time_spent(self):
+        self.generate_fixture_person()
+        self.generate_fixture_assigner()
+        self.generate_fixture_department()
+        self.generate_fixture_task_type()
+        self.generate_fixture_task_status()
+        self.generate_fixture_task()
+        time_spent_id = str(uuid.uuid4())
+        gazu.client.fetch_one = lambda model_name, model_id: {
+            "id": time_spent_id,
+            "task_id": str(self.task.id),
+            "person_id": str(self.person.id),
+            "date": "2018-06-04",
+            "duration": 600,
+            "type": "TimeSpent",
+        }
+
+        create_func = sync_service.create_entry(
+            "time-spents", "time-spent", TimeSpent, "new"
+        )
+        create_func({"time_spent_id": time_spent_id})
+        monthly_time_spent = MonthlyTimeSpent.get_by(
+            person_id=self.person.id, year=2018, month=6
+        )
+        self.assertEqual(monthly_time_spent.duration, 600)
+
+        delete_func = sync_service.delete_entry(
+            "time-spents", "time-spent", TimeSpent
+        )
+        delete_func({"time_spent_id": time_spent_id})
+        self.assertIsNone(
+            MonthlyTimeSpent.get_by(
+                person_id=self.person.id, year=2018, month=6
+            )
+        )
+
     def test_forward_event(self):
         events.register("task:update", "handle_event", self)
         forward_func = sync_service.forward_event("task:update")
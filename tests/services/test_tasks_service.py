@@ -6,7 +6,11 @@ from tests.base import ApiDBTestCase
 from zou.app.models.task import Task
 from zou.app.models.task_type import TaskType
 from zou.app.models.time_spent import TimeSpent
-from zou.app.services import tasks_service, deletion_service
+from zou.app.services import (
+    assets_service,
+    deletion_service,
+    tasks_service
+)
 from zou.app.utils import events, fields
 
 from zou.app.services.exception import TaskNotFoundException
@@ -379,6 +383,23 @@ class TaskServiceTestCase(ApiDBTestCase):
         self.assertIsNotNone(self.task.end_date)
         self.assertLess(self.task.end_date, datetime.datetime.now())
 
+    def test_update_task_changes(self):
+        class Handler(object):
+            def handle_event(self, data):
+                self.data = data
+
+        handler = Handler()
+        events.register("task:update", "get_changes", handler)
+        done_status = tasks_service.get_done_status()
+        tasks_service.update_task(
+            self.task.id,
+            {"task_status_id": done_status["id"], "duration": 50}
+        )
+        changes = handler.data["changes"]
+        self.assertEqual(changes["task_status_id"], done_status["id"])
+        self.assertTrue("end_date" in changes)
+        self.assertFalse("duration" in changes)
+
     def test_remove_task(self):
         self.working_file.delete()
         self.output_file.delete()
@@ -409,6 +430,36 @@ class TaskServiceTestCase(ApiDBTestCase):
             self.task_id
         )
 
+    def test_remove_task_force_listing(self):
+        criterions = {"project_id": str(self.project.id)}
+        assets = assets_service.get_assets_and_tasks(criterions)
+        self.assertEqual(len(assets[0]["tasks"]), 1)
+        deletion_service.remove_task(self.task_id, force=True)
+        assets = assets_service.get_assets_and_tasks(criterions)
+        self.assertEqual(len(assets[0]["tasks"]), 0)
+
+        self.generate_fixture_task()
+        self.task_id = self.task.id
+        assets = assets_service.get_assets_and_tasks(criterions)
+        self.assertEqual(len(assets[0]["tasks"]), 1)
+        deletion_service.remove_tasks([self.task_id])
+        assets = assets_service.get_assets_and_tasks(criterions)
+        self.assertEqual(len(assets[0]["tasks"]), 0)
+
+    def test_remove_tasks(self):
+        tasks_service.create_comment(
+            self.task.id,
+            self.task_status.id,
+            self.person.id,
+            "first comment"
+        )
+        task_1_id = str(self.task_id)
+        task_2_id = str(self.generate_fixture_task(name="second task").id)
+        task_ids = deletion_service.remove_tasks([task_1_id, task_2_id])
+        self.assertEqual(set(task_ids), set([task_1_id, task_2_id]))
+        self.assertIsNone(Task.get(task_1_id))
+        self.assertIsNone(Task.get(task_2_id))
+
     def test_delete_all_task_types(self):
         self.generate_fixture_project_standard()
         self.generate_fixture_asset_standard()
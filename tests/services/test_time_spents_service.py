@@ -1,7 +1,12 @@
 from tests.base import ApiDBTestCase
 
 
-from zou.app.services import tasks_service, time_spents_service
+from zou.app.models.monthly_time_spent import MonthlyTimeSpent
+from zou.app.services import (
+    deletion_service,
+    tasks_service,
+    time_spents_service,
+)
 
 
 class TimeSpentsServiceTestCase(ApiDBTestCase):
@@ -63,6 +68,66 @@ class TimeSpentsServiceTestCase(ApiDBTestCase):
         self.assertEqual(month_table["6"][self.user_id], 600)
         self.assertTrue("1" not in month_table)
 
+    def test_get_month_table_with_filters(self):
+        month_table = time_spents_service.get_month_table(
+            "2018", project_id=self.project.id
+        )
+        self.assertEqual(month_table["6"][self.person_id], 1400)
+        month_table = time_spents_service.get_month_table(
+            "2018", department_id=self.department.id
+        )
+        self.assertEqual(month_table["6"][self.person_id], 1100)
+        self.assertEqual(month_table["5"][self.person_id], 600)
+
+    def test_get_year_table(self):
+        year_table = time_spents_service.get_year_table()
+        self.assertEqual(year_table["2018"][self.person_id], 2000)
+        self.assertEqual(year_table["2019"][self.person_id], 850)
+        self.assertEqual(year_table["2018"][self.user_id], 600)
+
+    def test_monthly_time_spents(self):
+        monthly_time_spent = MonthlyTimeSpent.get_by(
+            person_id=self.person_id, year=2018, month=6
+        )
+        self.assertEqual(monthly_time_spent.duration, 1400)
+        tasks_service.create_or_update_time_spent(
+            self.task_id, self.person_id, "2018-06-04", 0
+        )
+        monthly_time_spent = MonthlyTimeSpent.get_by(
+            person_id=self.person_id, year=2018, month=6
+        )
+        self.assertEqual(monthly_time_spent.duration, 900)
+
+        deletion_service.remove_tasks([self.task_id])
+        monthly_time_spent = MonthlyTimeSpent.get_by(
+            person_id=self.person_id, year=2018, month=6
+        )
+        self.assertEqual(monthly_time_spent.duration, 300)
+        self.assertIsNone(
+            MonthlyTimeSpent.get_by(
+                person_id=self.person_id, year=2018, month=5
+            )
+        )
+        self.assertEqual(time_spents_service.rebuild_monthly_time_spents(), 1)
+
+    def test_insert_monthly_time_spents_conflict(self):
+        query = time_spents_service.build_monthly_time_spents_query()
+        MonthlyTimeSpent.query.filter_by(person_id=self.person_id).update(
+            {"duration": 1}, synchronize_session=False
+        )
+        time_spents_service.insert_monthly_time_spents(query)
+        MonthlyTimeSpent.commit()
+        monthly_time_spent = MonthlyTimeSpent.get_by(
+            person_id=self.person_id, year=2018, month=6
+        )
+        self.assertEqual(monthly_time_spent.duration, 1400)
+        self.assertEqual(
+            MonthlyTimeSpent.query.filter_by(
+                person_id=self.person_id, year=2018, month=6
+            ).count(),
+            1,
+        )
+
     def test_get_day_table(self):
         day_table = time_spents_service.get_day_table("2018", "06")
         self.assertEqual(day_table["3"][self.person_id], 600)
@@ -34,6 +34,30 @@ class ShotTasksTestCase(ApiDBTestCase):
         self.assertEqual(shots[0]["episode_name"], "E01")
         self.assertEqual(shots[0]["sequence_name"], "S01")
 
+        shots = self.get("data/shots/with-tasks?fields=id,name")
+        self.assertEqual(
+            shots, [{"id": str(self.shot.id), "name": self.shot.name}]
+        )
+        shots = self.get("data/shots/with-tasks?fields=tasks,frame_in")
+        self.assertEqual(len(shots[0]["tasks"]), 2)
+        self.assertEqual(shots[0]["frame_in"], 0)
+
+    def test_get_shots_and_tasks_columnar(self):
+        self.generate_fixture_shot_task(name="Secondary")
+        shots = self.get("data/shots/with-tasks")
+        listing = self.get("data/shots/with-tasks?format=columnar")
+        ids = listing["ids"]
+        self.assertEqual(listing["type"], "Shot")
+        self.assertEqual(ids[listing["entities"]["id"][0]], shots[0]["id"])
+        self.assertEqual(listing["entities"]["sequence_name"], ["S01"])
+        self.assertEqual(
+            [ids[index] for index in listing["tasks"]["task_type_id"]],
+            [task["task_type_id"] for task in shots[0]["tasks"]],
+        )
+        self.assertEqual(
+            ids[listing["tasks"]["assignees"][0][0]], self.person_id
+        )
+
     def test_get_task_types_for_shot(self):
         task_types = self.get("/data/shots/%s/task-types" % self.shot.id)
         self.assertEqual(len(task_types), 1)
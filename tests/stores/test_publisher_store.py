@@ -0,0 +1,125 @@
+from tests.base import ApiTestCase
+
+from zou.app import config
+from zou.app.stores import publisher_store
+from zou.app.utils import events
+
+
+class SocketIORecorder(object):
+    def __init__(self):
+        self.events = []
+        self.rooms = []
+
+    def emit(self, event, data, namespace=None, room=None):
+        self.events.append((event, data))
+        self.rooms.append(room)
+
+
+class PublisherStoreTestCase(ApiTestCase):
+
+    def setUp(self):
+        super(PublisherStoreTestCase, self).setUp()
+        self.socketio = publisher_store.socketio
+        self.config = {
+            "EVENT_COALESCE_WINDOW": config.EVENT_COALESCE_WINDOW,
+            "EVENT_COALESCE_BATCH_SIZE": config.EVENT_COALESCE_BATCH_SIZE,
+            "EVENT_STREAM_ROOMS": config.EVENT_STREAM_ROOMS,
+        }
+        publisher_store.socketio = SocketIORecorder()
+        config.EVENT_COALESCE_WINDOW = 60
+        config.EVENT_STREAM_ROOMS = False
+
+    def tearDown(self):
+        publisher_store.flush()
+        publisher_store.socketio = self.socketio
+        for key, value in self.config.items():
+            setattr(config, key, value)
+        super(PublisherStoreTestCase, self).tearDown()
+
+    def test_coalesce_updates(self):
+        publisher_store.publish("task:update", {"task_id": "1"})
+        publisher_store.publish("task:new", {"task_id": "2"})
+        publisher_store.publish("task:update", {"task_id": "1", "a": 1})
+        publisher_store.publish("task:update", {"task_id": "2"})
+        publisher_store.publish("task:delete", {"task_id": "2"})
+        self.assertEqual(
+            publisher_store.socketio.events,
+            [
+                ("task:new", {"task_id": "2"}),
+                ("task:update", {"task_id": "2"}),
+                ("task:delete", {"task_id": "2"}),
+            ],
+        )
+        publisher_store.flush()
+        self.assertEqual(
+            publisher_store.socketio.events[-1],
+            ("task:update", {"task_id": "1", "a": 1}),
+        )
+
+    def test_coalesce_changes(self):
+        publisher_store.publish(
+            "task:update", {"task_id": "1", "changes": {"a": 1, "b": 1}}
+        )
+        publisher_store.publish(
+            "task:update", {"task_id": "1", "changes": {"b": 2}}
+        )
+        publisher_store.publish(
+            "shot:update", {"shot_id": "2", "changes": {"a": 1}}
+        )
+        publisher_store.publish("shot:update", {"shot_id": "2"})
+        publisher_store.flush()
+        self.assertEqual(
+            publisher_store.socketio.events,
+            [
+                ("task:update", {"task_id": "1", "changes": {"a": 1, "b": 2}}),
+                ("shot:update", {"shot_id": "2"}),
+            ],
+        )
+
+    def test_relay_flushes_updates(self):
+        event = {
+            "name": "custom-model:update",
+            "data": {"custom_model_id": "1"},
+        }
+        with self.flask_app.test_request_context():
+            events.relay([event])
+        self.assertEqual(publisher_store.socketio.events, [])
+        events.relay([event])
+        self.assertEqual(
+            publisher_store.socketio.events,
+            [("custom-model:update", {"custom_model_id": "1"})],
+        )
+
+    def test_batch_updates(self):
+        config.EVENT_COALESCE_BATCH_SIZE = 2
+        for task_id in ["1", "2", "3"]:
+            publisher_store.publish(
+                "task:update", {"task_id": task_id, "project_id": "p1"}
+            )
+        publisher_store.publish("shot:update", {"shot_id": "4"})
+        publisher_store.flush()
+        self.assertEqual(
+            publisher_store.socketio.events,
+            [
+                (
+                    "task:update-batch",
+                    {"task_ids": ["1", "2", "3"], "project_id": "p1"},
+                ),
+                ("shot:update", {"shot_id": "4"}),
+            ],
+        )
+
+    def test_rooms(self):
+        config.EVENT_COALESCE_WINDOW = 0
+        config.EVENT_STREAM_ROOMS = True
+        publisher_store.publish(
+            "notification:new", {"notification_id": "1", "person_id": "2"}
+        )
+        publisher_store.publish(
+            "task:new", {"task_id": "3", "project_id": "4"}
+        )
+        publisher_store.publish("task-status:new", {"task_status_id": "5"})
+        self.assertEqual(
+            publisher_store.socketio.rooms,
+            ["person:2", "project:4", "admins", None],
+        )
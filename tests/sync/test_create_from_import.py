@@ -1,5 +1,6 @@
 from tests.base import ApiDBTestCase
 
+from zou.app.models.comment import Comment
 from zou.app.models.entity import Entity, EntityLink
 from zou.app.models.news import News
 from zou.app.models.project import Project
@@ -7,6 +8,7 @@ from zou.app.models.person import Person
 from zou.app.models.playlist import Playlist
 from zou.app.models.preview_file import PreviewFile
 from zou.app.models.task import Task
+from zou.app.utils import fields
 
 
 class CreateFromImportTestCase(ApiDBTestCase):
@@ -70,6 +72,25 @@ class CreateFromImportTestCase(ApiDBTestCase):
         entity = Entity.get(entity_dict["id"])
         self.assertEqual(entity_dict["name"], entity.name)
 
+    def test_entity_list(self):
+        self.generate_fixture_preview_file()
+        shot_dict = self.shot.serialize()
+        shot_dict["preview_file_id"] = str(self.preview_file.id)
+        new_shot_dict = dict(
+            shot_dict,
+            id=fields.gen_uuid(),
+            name="P02",
+            preview_file_id=fields.gen_uuid(),
+        )
+        Entity.create_from_import_list([shot_dict, new_shot_dict])
+
+        shot = Entity.get(self.shot.id)
+        self.assertEqual(shot.preview_file_id, self.preview_file.id)
+        new_shot = Entity.get(new_shot_dict["id"])
+        self.assertEqual(new_shot.name, "P02")
+        self.assertIsNone(new_shot.preview_file_id)
+        self.assertEqual(new_shot.entity_type_id, self.shot.entity_type_id)
+
     def test_entity_link(self):
         entity_link_dict = {
             "id": "726f9b44-526f-4fce-a979-6bf8bc8962a4",
@@ -198,6 +219,45 @@ class CreateFromImportTestCase(ApiDBTestCase):
         task = Task.get(task_dict["id"])
         self.assertEqual(task.name, task_dict["name"])
 
+    def test_task_list(self):
+        new_task_id = "3629fc9f-355f-420e-b3c7-5d69f02888e6"
+        task_dict = self.task.serialize(relations=True)
+        task_dict["name"] = "Updated"
+        task_dict["assignees"] = [str(self.person.id), fields.gen_uuid()]
+        new_task_dict = dict(task_dict, id=new_task_id, name="New")
+        new_task_dict["assignees"] = []
+        Task.create_from_import_list([task_dict, new_task_dict])
+
+        task = Task.get(self.task.id)
+        self.assertEqual(task.name, "Updated")
+        self.assertEqual(
+            [str(person.id) for person in task.assignees],
+            [str(self.person.id)]
+        )
+        self.assertEqual(Task.get(new_task_id).name, "New")
+        self.assertEqual(Task.get(new_task_id).assignees, [])
+        self.assertEqual(task_dict["type"], "Task")
+
+    def test_comment_list(self):
+        comment_dict = Comment.get(self.comment["id"]).serialize(
+            relations=True
+        )
+        comment_dict["text"] = "Updated"
+        comment_dict["mentions"] = [str(self.person.id)]
+        Comment.create_from_import_list([comment_dict])
+        comment = Comment.get(self.comment["id"])
+        self.assertEqual(comment.text, "Updated")
+        self.assertEqual(comment.mentions[0].id, self.person.id)
+
+    def test_task_list_with_wrong_entry(self):
+        task_dict = self.task.serialize(relations=True)
+        task_dict["name"] = "Updated"
+        wrong_task_dict = dict(task_dict, id=fields.gen_uuid())
+        # Same name, entity and task type than the first task.
+        with self.assertRaises(Exception):
+            Task.create_from_import_list([task_dict, wrong_task_dict])
+        self.assertEqual(Task.get(self.task.id).name, "Updated")
+
     """
     def test_notification(self):
         pass
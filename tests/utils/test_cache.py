@@ -1,5 +1,6 @@
 import unittest
 
+from zou.app import config
 from zou.app.utils import cache
 
 
@@ -21,6 +22,51 @@ class CacheTestCase(unittest.TestCase):
         import random
         return parameter + str(random.randrange(1, 50))
 
+    @cache.memoize_function(
+        50,
+        tags=lambda result, self, parameter: [cache.tag("task", parameter)]
+    )
+    def memoized_function3(self, parameter):
+        import random
+        return parameter + str(random.randrange(1, 1000000))
+
+    @cache.memoize_function(50, request_scope=True)
+    def memoized_function4(self, parameter):
+        return {"name": parameter}
+
+    @cache.memoize_function(50, single_flight=True)
+    def memoized_function5(self, parameter):
+        self.called += 1
+        return {"name": parameter, "called": self.called}
+
+    @cache.memoize_function(
+        50, project=lambda self, project_id, parameter: project_id
+    )
+    def memoized_function6(self, project_id, parameter):
+        import random
+        return parameter + str(random.randrange(1, 1000000))
+
+    @cache.memoize_function(
+        50,
+        tags=lambda result, self, parameter: [cache.tag("task", parameter)]
+    )
+    def memoized_function7(self, parameter):
+        self.called += 1
+        if self.called == 1:
+            cache.invalidate_tags(cache.tag("task", parameter))
+        return {"name": parameter, "called": self.called}
+
+    @cache.memoize_function(
+        50,
+        tags=lambda result, self, parameter: [cache.tag("task", parameter)],
+        single_flight=True,
+    )
+    def memoized_function8(self, parameter):
+        self.called += 1
+        if self.called == 1:
+            cache.invalidate_tags(cache.tag("task", parameter))
+        return {"name": parameter, "called": self.called}
+
     def test_memoize(self):
         result = self.memoized_function2("param1")
         result2 = self.memoized_function2("param1")
@@ -28,3 +74,189 @@ class CacheTestCase(unittest.TestCase):
 
         self.assertEqual(result, result2)
         self.assertNotEqual(result, result3)
+
+    def test_memoize_tags(self):
+        result = self.memoized_function3("param1")
+        result2 = self.memoized_function3("param2")
+        self.assertEqual(result, self.memoized_function3("param1"))
+        cache.invalidate_tags(cache.tag("task", "param1"))
+        self.assertNotEqual(result, self.memoized_function3("param1"))
+        self.assertEqual(result2, self.memoized_function3("param2"))
+
+    def test_memoize_tags_invalidated_during_call(self):
+        for memoized_function in [
+            self.memoized_function7,
+            self.memoized_function8,
+        ]:
+            self.called = 0
+            parameter = "invalidated-%s" % memoized_function.__name__
+            self.assertEqual(memoized_function(parameter)["called"], 1)
+            self.assertEqual(memoized_function(parameter)["called"], 2)
+            self.assertEqual(memoized_function(parameter)["called"], 2)
+
+    def test_invalidate_project(self):
+        result = self.memoized_function6("project-1", "param1")
+        result2 = self.memoized_function6("project-2", "param1")
+        self.assertEqual(
+            result, self.memoized_function6("project-1", "param1")
+        )
+        cache.invalidate_project("project-1")
+        self.assertNotEqual(
+            result, self.memoized_function6("project-1", "param1")
+        )
+        self.assertEqual(
+            result2, self.memoized_function6("project-2", "param1")
+        )
+
+    def test_get_tags_from_event_data(self):
+        tags = cache.get_tags_from_event_data({
+            "task_id": "task-1",
+            "shot_id": "shot-1",
+            "name": "Task",
+            "person_id": None
+        })
+        self.assertEqual(sorted(tags), ["entity:shot-1", "task:task-1"])
+
+    def test_local_cache_tags(self):
+        local_cache = cache.LocalCache(max_size=10, timeout=10)
+        local_cache.set("func", "a", 1, tags=["task:1"])
+        local_cache.set("func", "b", 2, tags=["task:1", "task:2"])
+        local_cache.set("func", "c", 3, tags=["task:2"])
+        local_cache.delete_tags(["task:1"])
+        self.assertFalse(local_cache.get("func", "a")[0])
+        self.assertFalse(local_cache.get("func", "b")[0])
+        self.assertTrue(local_cache.get("func", "c")[0])
+        self.assertEqual(local_cache.tags, {"task:2": {("func", 0, "c")}})
+
+    def test_local_cache(self):
+        local_cache = cache.LocalCache(max_size=2, timeout=10)
+        local_cache.set("func", "(['a'], [])", {"name": "a"})
+        (found, result) = local_cache.get("func", "(['a'], [])")
+        self.assertTrue(found)
+        self.assertEqual(result, {"name": "a"})
+        result["name"] = "b"
+        (found, result) = local_cache.get("func", "(['a'], [])")
+        self.assertEqual(result, {"name": "a"})
+        (found, result) = local_cache.get("func", "(['b'], [])")
+        self.assertFalse(found)
+
+        stats = local_cache.get_stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_local_cache_eviction(self):
+        local_cache = cache.LocalCache(max_size=2, timeout=10)
+        local_cache.set("func", "a", 1)
+        local_cache.set("func", "b", 2)
+        local_cache.get("func", "a")
+        local_cache.set("func", "c", 3)
+        self.assertTrue(local_cache.get("func", "a")[0])
+        self.assertFalse(local_cache.get("func", "b")[0])
+        self.assertTrue(local_cache.get("func", "c")[0])
+        self.assertEqual(local_cache.get_stats()["evictions"], 1)
+
+    def test_local_cache_timeout(self):
+        local_cache = cache.LocalCache(max_size=2, timeout=10)
+        local_cache.set("func", "a", 1, timeout=-1)
+        self.assertTrue(local_cache.get("func", "a")[0])
+        local_cache.timeout = -1
+        local_cache.set("func", "a", 1)
+        self.assertFalse(local_cache.get("func", "a")[0])
+
+    def test_local_cache_delete(self):
+        local_cache = cache.LocalCache(max_size=10, timeout=10)
+        local_cache.set("func", "a", 1)
+        local_cache.set("func", "b", 2)
+        local_cache.set("func2", "a", 3)
+        local_cache.delete("func", "a")
+        self.assertFalse(local_cache.get("func", "a")[0])
+        self.assertTrue(local_cache.get("func", "b")[0])
+        local_cache.delete("func")
+        self.assertFalse(local_cache.get("func", "b")[0])
+        self.assertTrue(local_cache.get("func2", "a")[0])
+        local_cache.clear()
+        self.assertFalse(local_cache.get("func2", "a")[0])
+
+    def test_local_key(self):
+        def func(a, b=2):
+            return a + b
+
+        make_local_key = cache.build_local_key_function(func)
+        self.assertEqual(
+            make_local_key((1,), {}),
+            make_local_key((1, 2), {})
+        )
+        self.assertEqual(
+            make_local_key((1,), {"b": 3}),
+            make_local_key((1, 3), {})
+        )
+        self.assertNotEqual(
+            make_local_key((1,), {}),
+            make_local_key((1, 3), {})
+        )
+
+    def test_request_scope(self):
+        from zou.app import app
+
+        with app.test_request_context():
+            result = self.memoized_function4("param1")
+            self.assertIs(result, self.memoized_function4("param1"))
+            self.assertIsNot(result, self.memoized_function4("param2"))
+            cache.clear_request_cache()
+            self.assertIsNot(result, self.memoized_function4("param1"))
+            self.assertEqual(result, self.memoized_function4("param1"))
+
+    def test_single_flight(self):
+        result = self.memoized_function5("param1")
+        self.assertEqual(result, self.memoized_function5("param1"))
+        self.assertEqual(self.called, 1)
+        self.memoized_function5("param2")
+        self.assertEqual(self.called, 2)
+        cache.cache.delete_memoized(self.memoized_function5, self, "param1")
+        self.memoized_function5("param1")
+        self.assertEqual(self.called, 3)
+
+    def test_single_flight_stale(self):
+        result = self.memoized_function5("param1")
+        cache_key = self.memoized_function5.make_cache_key(
+            self.memoized_function5.uncached, self, "param1"
+        )
+        lock_key = cache.LOCK_PREFIX + cache_key
+        cache.cache.delete(cache_key)
+        if cache.local_cache is not None:
+            cache.local_cache.clear()
+        cache.cache.add(lock_key, "other-worker")
+        lock_wait = config.MEMOIZE_LOCK_WAIT
+        config.MEMOIZE_LOCK_WAIT = 0.1
+        try:
+            self.assertEqual(result, self.memoized_function5("param1"))
+            self.assertEqual(self.called, 1)
+        finally:
+            config.MEMOIZE_LOCK_WAIT = lock_wait
+        cache.cache.delete(lock_key)
+        if cache.local_cache is not None:
+            cache.local_cache.clear()
+        self.memoized_function5("param1")
+        self.assertEqual(self.called, 2)
+
+    @unittest.skipUnless(config.MEMOIZE_STATS, "Stats are disabled")
+    def test_function_stats(self):
+        cache.clear()
+        namespace = cache.function_namespace(
+            self.memoized_function2.uncached
+        )[0]
+        stats = cache.get_function_stats().get(
+            namespace, {"calls": 0, "misses": 0}
+        )
+        result = self.memoized_function2("stats")
+        self.memoized_function2("stats")
+        new_stats = cache.get_function_stats()[namespace]
+        self.assertEqual(new_stats["calls"], stats["calls"] + 2)
+        self.assertEqual(new_stats["misses"], stats["misses"] + 1)
+        self.assertGreaterEqual(new_stats["average_payload_size"], len(result))
+
+    def test_should_refresh_early(self):
+        now = cache.time.time()
+        self.assertFalse(cache.should_refresh_early(now + 100, 1, 0))
+        self.assertFalse(cache.should_refresh_early(now + 1000, 0.01, 1))
+        self.assertTrue(cache.should_refresh_early(now - 1, 0.01, 1))
@@ -1,4 +1,6 @@
-from zou.app.utils import events
+from zou.app import config, db
+from zou.app.models.department import Department
+from zou.app.utils import cache, events, handler_pool
 from zou.app.services import events_service
 
 from tests.base import ApiDBTestCase
@@ -55,3 +57,87 @@ class EventsTestCase(ApiDBTestCase):
         event_models = events_service.get_last_events()
         self.assertEqual(len(event_models), 4)
         self.assertEqual(event_models[0]["name"], "task:new")
+
+    def test_outbox(self):
+        events.register("task:start", "inc_counter", self)
+        with self.flask_app.test_request_context():
+            events.emit("task:start")
+            events.emit("task:new")
+            self.assertEqual(self.counter, 1)
+            self.assertEqual(len(events_service.get_last_events()), 0)
+            events.flush()
+            self.assertEqual(self.counter, 2)
+        event_models = events_service.get_last_events()
+        self.assertEqual(
+            [event["name"] for event in event_models],
+            ["task:new", "task:start"],
+        )
+
+    def test_outbox_rollback(self):
+        events.register("task:start", "inc_counter", self)
+        with self.flask_app.test_request_context():
+            db.session.add(Department(name="Modeling", color="#FFFFFF"))
+            events.emit("task:start")
+            db.session.rollback()
+            events.emit("task:start")
+            events.flush()
+        self.assertEqual(self.counter, 2)
+        self.assertEqual(len(events_service.get_last_events()), 1)
+
+    def test_outbox_failed_write(self):
+        events.register("task:start", "inc_counter", self)
+        with self.flask_app.test_request_context():
+            Department.create(name="Modeling", color="#FFFFFF")
+            events.emit("task:start")
+            with self.assertRaises(Exception):
+                Department.create(name="Modeling", color="#FFFFFF")
+            events.flush()
+        self.assertEqual(self.counter, 2)
+        self.assertEqual(len(events_service.get_last_events()), 1)
+
+    def test_cache_invalidation_after_commit(self):
+        task_tag = cache.tag("task", "task-1")
+        version = cache.get_invalidation_version()
+        with self.flask_app.test_request_context():
+            db.session.add(Department(name="Modeling", color="#FFFFFF"))
+            events.emit("task:update", {"task_id": "task-1"})
+            self.assertFalse(cache.is_invalidated_since([task_tag], version))
+            db.session.commit()
+            self.assertTrue(cache.is_invalidated_since([task_tag], version))
+
+    def test_batch_handler(self):
+        batches = []
+
+        class BatchHandler(object):
+            def handle_events(self, handler_events):
+                batches.append([event["name"] for event in handler_events])
+
+        events.register("task:start", "batch", BatchHandler())
+        events.register("task:new", "batch", BatchHandler())
+        with self.flask_app.test_request_context():
+            events.emit("task:start")
+            events.emit("task:stop")
+            events.emit("task:new")
+            events.flush()
+        self.assertEqual(batches, [["task:start", "task:new"]])
+
+    def test_handler_pool(self):
+        class FailingHandler(object):
+            def handle_event(self, data):
+                raise Exception("Handler failure")
+
+        pool_size = config.EVENT_HANDLERS_POOL_SIZE
+        config.EVENT_HANDLERS_POOL_SIZE = 2
+        try:
+            events.register("task:start", "failing", FailingHandler())
+            events.register("task:start", "inc_counter", self)
+            stats = handler_pool.get_stats()
+            events.emit("task:start")
+            events.emit("task:start")
+            handler_pool.calls.join()
+        finally:
+            config.EVENT_HANDLERS_POOL_SIZE = pool_size
+        self.assertEqual(self.counter, 3)
+        new_stats = handler_pool.get_stats()
+        self.assertEqual(new_stats["failed"] - stats["failed"], 2)
+        self.assertEqual(new_stats["completed"] - stats["completed"], 2)
@@ -0,0 +1,90 @@
+import time
+
+from flask import g
+
+from tests.base import ApiDBTestCase
+
+from zou.app import db
+from zou.app.models.task_type import TaskType
+from zou.app.stores import read_replica_store
+from zou.app.utils import cache, read_replica
+
+
+class ReadReplicaTestCase(ApiDBTestCase):
+
+    def setUp(self):
+        super(ReadReplicaTestCase, self).setUp()
+        self.config = self.flask_app.config
+        # The primary database is used as a stand-in for the replica.
+        self.config["SQLALCHEMY_BINDS"] = {
+            "replica": self.config["SQLALCHEMY_DATABASE_URI"]
+        }
+        read_replica.replica_status.update({"checked_at": None, "lag": None})
+        read_replica_store.unpin(self.user["email"])
+        self.primary = db.get_engine(self.flask_app)
+        self.replica = db.get_engine(self.flask_app, bind="replica")
+        self.select = TaskType.query.statement
+        db.session.info.pop("has_writes", None)
+
+    def tearDown(self):
+        self.config["SQLALCHEMY_BINDS"] = None
+        read_replica.replica_status.update({"checked_at": None, "lag": None})
+        db.session.info.pop("has_writes", None)
+        super(ReadReplicaTestCase, self).tearDown()
+
+    def get_bind(self, clause, read_replica_requested=True):
+        g.read_replica = read_replica_requested
+        return db.session.get_bind(clause=clause)
+
+    def test_route_reads(self):
+        with self.flask_app.app_context():
+            self.assertEqual(self.get_bind(self.select), self.replica)
+            self.assertEqual(self.get_bind(self.select, False), self.primary)
+            self.config["SQLALCHEMY_BINDS"] = None
+            g.pop("read_replica_usable")
+            self.assertEqual(self.get_bind(self.select), self.primary)
+
+    def test_route_writes(self):
+        delete = TaskType.__table__.delete()
+        with self.flask_app.app_context():
+            self.assertEqual(self.get_bind(delete), self.primary)
+            self.assertEqual(self.get_bind(self.select), self.primary)
+
+    def test_replica_lag(self):
+        read_replica.replica_status.update(
+            {"checked_at": time.time(), "lag": 60}
+        )
+        with self.flask_app.app_context():
+            self.assertEqual(self.get_bind(self.select), self.primary)
+
+    def test_use_read_replica(self):
+        @read_replica.use_read_replica
+        def get_bind():
+            return db.session.get_bind(clause=self.select)
+
+        with self.flask_app.app_context():
+            g.read_replica = False
+            self.assertEqual(get_bind(), self.replica)
+            self.assertFalse(g.read_replica)
+
+    def test_pin_writers(self):
+        self.assertEqual(len(self.get("data/task-types")), 0)
+        self.assertFalse(read_replica_store.is_pinned(self.user["email"]))
+        self.post("data/task-types", {"name": "Modeling"})
+        self.assertTrue(read_replica_store.is_pinned(self.user["email"]))
+        self.assertEqual(len(self.get("data/task-types")), 1)
+
+    def test_memoized_functions_read_primary(self):
+        primary = self.primary
+
+        @cache.memoize_function(120)
+        def is_primary_read():
+            return db.session.get_bind(clause=self.select) is primary
+
+        cache.clear()
+        with self.flask_app.app_context():
+            g.read_replica = True
+            self.assertTrue(is_primary_read())
+            self.assertTrue(g.read_replica)
+            self.assertEqual(self.get_bind(self.select), self.replica)
+        cache.clear()
@@ -1,12 +1,14 @@
 import os
 import datetime
+import json
 import unittest
 import uuid
 
 from babel import Locale
 from pytz import timezone
+from werkzeug.test import EnvironBuilder
 
-from zou.app.utils import colors, fields, query, fs
+from zou.app.utils import api, colors, fields, query, fs
 from zou.app.models.person import Person
 from zou.app.models.task import Task
 
@@ -59,6 +61,51 @@ class UtilsTestCase(unittest.TestCase):
         self.assertEqual(fields.serialize_dict(data), result)
         self.assertEqual(fields.serialize_value(data), result)
 
+    @unittest.skipIf(api.orjson is None, "orjson is not installed")
+    def test_output_orjson(self):
+        from zou.app import app
+
+        data = {
+            "now": datetime.datetime.now(),
+            "unique_id": uuid.uuid4(),
+            "locale": Locale("en_US"),
+            "list": [1, "test"],
+            "string": "tést"
+        }
+        with app.app_context():
+            response = api.output_orjson(data, 200)
+        self.assertEqual(
+            json.loads(response.data.decode("utf-8")),
+            fields.serialize_value(data)
+        )
+
+    @unittest.skipIf(api.msgpack is None, "msgpack is not installed")
+    def test_output_msgpack(self):
+        from zou.app import app
+
+        unique_id = uuid.uuid4()
+        data = {
+            "now": datetime.datetime(2020, 1, 1, 12, 30, 15, 200),
+            "unique_id": unique_id,
+            "list": [1, "test"],
+            "string": "tést"
+        }
+        with app.app_context():
+            response = api.output_msgpack(data, 200)
+        self.assertEqual(response.mimetype, api.MSGPACK_MIMETYPE)
+
+        environ = EnvironBuilder(
+            method="POST",
+            data=response.data,
+            content_type=api.MSGPACK_MIMETYPE
+        ).get_environ()
+        self.assertEqual(api.ApiRequest(environ).get_json(), {
+            "now": "2020-01-01T12:30:15",
+            "unique_id": str(unique_id),
+            "list": [1, "test"],
+            "string": "tést"
+        })
+
     def test_serialize_orm_array(self):
         person = Person(
             id=uuid.uuid4(),
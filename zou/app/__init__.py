@@ -6,7 +6,6 @@ from flask import Flask, jsonify
 from flask_restful import current_app
 from flask_jwt_extended import JWTManager
 from flask_principal import Principal, identity_changed, Identity
-from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_mail import Mail
 from jwt import ExpiredSignatureError
@@ -19,7 +18,7 @@ from .services.exception import (
     WrongIdFormatException,
     WrongParameterException,
 )
-from .utils import fs, logs
+from .utils import fs, logs, read_replica
 
 from zou.app.utils import cache
 
@@ -36,7 +35,8 @@ if not app.config["FILE_TREE_FOLDER"]:
 if not app.config["PREVIEW_FOLDER"]:
     app.config["PREVIEW_FOLDER"] = os.path.join(app.instance_path, "previews")
 
-db = SQLAlchemy(app)
+db = read_replica.RoutingSQLAlchemy(app)
+read_replica.configure(app, db)
 migrate = Migrate(app, db)  # DB schema migration features
 
 app.secret_key = app.config["SECRET_KEY"]
@@ -53,6 +53,11 @@ def shutdown_session(exception=None):
     db.session.remove()
 
 
+@app.teardown_request
+def clear_request_cache(exception=None):
+    cache.clear_request_cache()
+
+
 @app.errorhandler(404)
 def page_not_found(error):
     return jsonify(error=True, message=str(error)), 404
@@ -126,4 +131,23 @@ def load_api():
     configure_auth()
 
 
+def warm_cache():
+    """
+    Fill the cache with reference data when the application boots. Failures
+    are only logged: the cache is filled lazily anyway.
+    """
+    from zou.app.services import cache_service
+
+    try:
+        with app.app_context():
+            cache_service.warm_cache()
+    except Exception:
+        app.logger.error("Cache warming failed.", exc_info=1)
+    finally:
+        db.session.remove()
+
+
 load_api()
+
+if config.MEMOIZE_WARM_ON_BOOT:
+    warm_cache()
@@ -2,6 +2,7 @@ import os
 import sys
 
 from zou.app.utils import events, api as api_utils
+from zou.app.services import stats_service
 
 from flask import Blueprint
 
@@ -30,8 +31,10 @@ def configure(app):
     system.
     """
     app.url_map.strict_slashes = False
+    app.request_class = api_utils.ApiRequest
     configure_api_routes(app)
     register_event_handlers(app)
+    events.configure(app)
     load_plugins(app)
     return app
 
@@ -65,7 +68,12 @@ def register_event_handlers(app):
     """
     Load code from event handlers folder. Then it registers in the event manager
     each event handler listed in the __init_.py.
+    Handlers that maintain task stats are always registered.
     """
+    events.register_all(
+        {event_name: stats_service for event_name in stats_service.EVENTS},
+        app,
+    )
     sys.path.insert(0, app.config["EVENT_HANDLERS_FOLDER"])
     try:
         import event_handlers
@@ -2,7 +2,7 @@ from flask import request
 from flask_restful import Resource, reqparse
 from flask_jwt_extended import jwt_required
 
-from zou.app.utils import query
+from zou.app.utils import api as api_utils, columnar, query
 from zou.app.mixin import ArgsMixin
 from zou.app.services import (
     assets_service,
@@ -69,16 +69,42 @@ class AssetsAndTasksResource(Resource):
         Adds project name and asset type name and all related tasks.
         If episode_id is given as parameter, it returns assets not linked
         to an episode and assets linked to given episode.
+        The columnar format can be requested for large listings.
         """
         criterions = query.get_query_criterions_from_request(request)
         page = query.get_page_from_request(request)
         user_service.check_project_access(criterions.get("project_id", None))
-        assets = assets_service.get_assets_and_tasks(criterions, page)
+        if query.is_columnar_format_requested(request):
+            listing = assets_service.get_assets_and_tasks_columnar(
+                criterions, page
+            )
+            if "episode_id" in criterions:
+                criterions["episode_id"] = None
+                listing = columnar.merge_listings(
+                    [
+                        listing,
+                        assets_service.get_assets_and_tasks_columnar(
+                            criterions, page
+                        ),
+                    ]
+                )
+            return listing
+
+        selected_fields = query.get_fields_from_request(request)
+        assets = assets_service.get_assets_and_tasks(
+            criterions, page, selected_fields
+        )
         if "episode_id" in criterions:
             criterions["episode_id"] = None
-            assets += assets_service.get_assets_and_tasks(criterions, page)
+            assets += assets_service.get_assets_and_tasks(
+                criterions, page, selected_fields
+            )
+        assets = query.select_fields_from_request(request, assets)
 
-        return assets
+        if api_utils.is_json_streaming_enabled():
+            return api_utils.stream_json_list(assets)
+        else:
+            return assets
 
 
 class AssetTypeResource(Resource):
@@ -111,6 +137,17 @@ class ProjectAssetTypesResource(Resource):
         return assets_service.get_asset_types_for_project(project_id)
 
 
+class ProjectAssetTypeStatsResource(Resource):
+    @jwt_required
+    def get(self, project_id):
+        """
+        Retrieve number of tasks by status, task_types and asset types
+        for given project.
+        """
+        user_service.check_project_access(project_id)
+        return assets_service.get_asset_type_stats_for_project(project_id)
+
+
 class ShotAssetTypesResource(Resource):
     @jwt_required
     def get(self, shot_id):
@@ -131,7 +131,9 @@ class AuthenticatedResource(Resource):
     @jwt_required
     def get(self):
         try:
-            person = persons_service.get_person_by_email(get_jwt_identity())
+            person = dict(
+                persons_service.get_person_by_email(get_jwt_identity())
+            )
             del person["password"]
             organisation = persons_service.get_organisation()
             return {
@@ -181,7 +183,7 @@ class LoginResource(Resource):
     def post(self):
         (email, password) = self.get_arguments()
         try:
-            user = auth_service.check_auth(app, email, password)
+            user = dict(auth_service.check_auth(app, email, password))
             del user["password"]
 
             if auth_service.is_default_password(app, password):
@@ -23,7 +23,11 @@ from .news import NewssResource, NewsResource
 from .person import PersonResource, PersonsResource
 from .preview_file import PreviewFilesResource, PreviewFileResource
 from .playlist import PlaylistsResource, PlaylistResource
-from .project import ProjectResource, ProjectsResource
+from .project import (
+    ProjectDeletionJobResource,
+    ProjectResource,
+    ProjectsResource,
+)
 from .project_status import ProjectStatusResource, ProjectStatussResource
 from .schedule_item import ScheduleItemsResource, ScheduleItemResource
 from .subscription import SubscriptionsResource, SubscriptionResource
@@ -41,6 +45,7 @@ routes = [
     ("/data/persons/<instance_id>", PersonResource),
     ("/data/projects", ProjectsResource),
     ("/data/projects/<instance_id>", ProjectResource),
+    ("/data/projects/deletion-jobs/<job_id>", ProjectDeletionJobResource),
     ("/data/project-status", ProjectStatussResource),
     ("/data/project-status/<instance_id>", ProjectStatusResource),
     ("/data/entity-types", EntityTypesResource),
@@ -1,3 +1,4 @@
+import itertools
 import math
 import json
 import sqlalchemy.orm as orm
@@ -8,20 +9,131 @@ from flask_jwt_extended import jwt_required
 
 from sqlalchemy.exc import IntegrityError, StatementError
 
-from zou.app.utils import permissions, events
-from zou.app.services.exception import ArgumentsException
+from zou.app.utils import (
+    api as api_utils,
+    events,
+    fields as fields_utils,
+    permissions,
+    query as query_utils,
+)
+from zou.app.services.exception import (
+    ArgumentsException,
+    WrongParameterException,
+)
 
 
 class BaseModelsResource(Resource):
     def __init__(self, model):
         Resource.__init__(self)
         self.model = model
+        self.fields = None
+
+    def serialize_entries(self, entries, relations=False):
+        if self.fields is not None:
+            return self.serialize_rows(entries)
+        return self.model.serialize_list(
+            entries,
+            relations=relations,
+            native=api_utils.is_native_json_enabled(),
+        )
+
+    def serialize_rows(self, rows):
+        """
+        Serialize rows of a query restricted to the requested fields.
+        """
+        obj_type = self.model.__name__
+        result = []
+        for row in rows:
+            obj_dict = fields_utils.serialize_dict(row._asdict())
+            obj_dict["type"] = obj_type
+            result.append(obj_dict)
+        return result
+
+    def get_readable_columns(self):
+        """
+        Return the names of the columns that can be requested through the
+        fields parameter.
+        """
+        return [column.name for column in self.model.__table__.columns]
+
+    def get_fields(self, with_cursor=False):
+        """
+        Return the columns requested through the fields parameter or None if
+        the full entries are required. The id is always included, the update
+        date too when the cursor pagination is used.
+        """
+        fields = query_utils.get_fields_from_request(request)
+        if fields is None:
+            return None
+
+        readable_columns = self.get_readable_columns()
+        for field in fields:
+            if field not in readable_columns:
+                raise WrongParameterException(
+                    "%s is not a valid field." % field
+                )
+        required_fields = ["id", "updated_at"] if with_cursor else ["id"]
+        for field in reversed(required_fields):
+            if field not in fields:
+                fields.insert(0, field)
+        return fields
+
+    def apply_fields(self, query):
+        """
+        Restrict the columns selected by the query to the requested fields,
+        so only them are read from the database and serialized.
+        """
+        if self.fields is None:
+            return query
+        else:
+            return query.with_entities(
+                *[getattr(self.model, field) for field in self.fields]
+            )
 
     def all_entries(self, query=None, relations=False):
         if query is None:
             query = self.model.query
 
-        return self.model.serialize_list(query.all(), relations=relations)
+        return self.serialize_entries(query.all(), relations=relations)
+
+    def iter_entries(self, query=None, relations=False):
+        """
+        Serialize entries while they are fetched from the database, batch by
+        batch. That way, only one batch is held in memory at a time.
+        """
+        if query is None:
+            query = self.model.query
+
+        batch_size = current_app.config["JSON_STREAMING_BATCH_SIZE"]
+        batch = []
+        for instance in query.yield_per(batch_size):
+            batch.append(instance)
+            if len(batch) >= batch_size:
+                for entry in self.serialize_entries(batch, relations):
+                    yield entry
+                batch = []
+        for entry in self.serialize_entries(batch, relations):
+            yield entry
+
+    def entries_response(self, query=None, relations=False):
+        """
+        Return all entries. When JSON streaming is enabled, entries are
+        streamed as a chunked JSON array, unless the resource customizes
+        the way entries are listed.
+        """
+        is_streamable = (
+            type(self).all_entries is BaseModelsResource.all_entries
+        )
+        if is_streamable and api_utils.is_json_streaming_enabled():
+            entries = self.iter_entries(query, relations=relations)
+            # Fetch the first entry now to run the query while errors can
+            # still be turned into a proper response.
+            first_entries = list(itertools.islice(entries, 1))
+            return api_utils.stream_json_list(
+                itertools.chain(first_entries, entries)
+            )
+        else:
+            return self.all_entries(query, relations=relations)
 
     def paginated_entries(self, query, page, relations=False):
         total = query.count()
@@ -54,6 +166,22 @@ class BaseModelsResource(Resource):
             }
         return result
 
+    def cursor_entries(self, query, cursor, relations=False, total_mode=None):
+        """
+        Return the page of entries located after given cursor, with the
+        cursor of the next page. Total is given only if total_mode is
+        "exact" or "estimate".
+        """
+        return query_utils.get_cursor_results(
+            query,
+            self.model,
+            cursor,
+            total_mode=total_mode,
+            serialize=lambda entries: self.serialize_entries(
+                entries, relations=relations
+            ),
+        )
+
     def build_filters(self, options):
         many_join_filter = []
         in_filter = []
@@ -62,7 +190,11 @@ class BaseModelsResource(Resource):
 
         column_names = [column.name for column in self.model.__table__.columns]
         for key, value in options.items():
-            if key not in ["page", "relations"] and key in column_names:
+            if (
+                key
+                not in ["page", "cursor", "total", "fields", "relations"]
+                and key in column_names
+            ):
                 field_key = getattr(self.model, key)
                 expr = field_key.property
 
@@ -133,20 +265,30 @@ class BaseModelsResource(Resource):
             query = self.model.query
             query = self.add_project_permission_filter(query)
             if not request.args:
-                return self.all_entries(query)
+                return self.entries_response(query)
             else:
                 options = request.args
                 query = self.apply_filters(options)
                 page = int(options.get("page", "-1"))
+                cursor = options.get("cursor", None)
                 relations = options.get("relations", "false") == "true"
                 is_paginated = page > -1
-
-                if is_paginated:
+                self.fields = self.get_fields(with_cursor=cursor is not None)
+                query = self.apply_fields(query)
+
+                if cursor is not None:
+                    return self.cursor_entries(
+                        query,
+                        cursor,
+                        relations=relations,
+                        total_mode=options.get("total", None),
+                    )
+                elif is_paginated:
                     return self.paginated_entries(
                         query, page, relations=relations
                     )
                 else:
-                    return self.all_entries(query, relations=relations)
+                    return self.entries_response(query, relations=relations)
         except StatementError as exception:
             if hasattr(exception, "message"):
                 return (
@@ -236,6 +378,64 @@ class BaseModelResource(Resource):
     def clean_get_result(self, data):
         return data
 
+    def get_readable_columns(self):
+        """
+        Return the names of the columns that can be requested through the
+        fields parameter.
+        """
+        return [column.name for column in self.model.__table__.columns]
+
+    def get_permission_columns(self):
+        """
+        Return the columns always read when fields are requested: the id and
+        the foreign keys, permission checks rely on them.
+        """
+        return [
+            column.name
+            for column in self.model.__table__.columns
+            if column.primary_key or len(column.foreign_keys) > 0
+        ]
+
+    def is_projection_supported(self):
+        """
+        Tell if requested fields can be read directly from the database.
+        Resources that customize the serialization of their entry need the
+        full entry.
+        """
+        resource_type = type(self)
+        return (
+            resource_type.serialize_instance
+            is BaseModelResource.serialize_instance
+            and resource_type.clean_get_result
+            is BaseModelResource.clean_get_result
+        )
+
+    def get_projected_entry(self, instance_id, fields):
+        """
+        Read only given fields of the entry and the columns required by the
+        permission checks.
+        """
+        readable_columns = self.get_readable_columns()
+        for field in fields:
+            if field not in readable_columns:
+                raise WrongParameterException(
+                    "%s is not a valid field." % field
+                )
+        columns = list(fields)
+        for column in self.get_permission_columns():
+            if column not in columns:
+                columns.append(column)
+        row = (
+            self.model.query.filter(self.model.id == instance_id)
+            .with_entities(
+                *[getattr(self.model, column) for column in columns]
+            )
+            .first()
+        )
+        if row is None:
+            abort(404)
+        return fields_utils.serialize_dict(row._asdict())
+
     @jwt_required
     def get(self, instance_id):
         """
@@ -243,10 +443,17 @@ class BaseModelResource(Resource):
         object.
         """
         try:
-            instance = self.get_model_or_404(instance_id)
-            result = self.serialize_instance(instance)
-            self.check_read_permissions(result)
-            result = self.clean_get_result(result)
+            fields = query_utils.get_fields_from_request(request)
+            if fields is not None and self.is_projection_supported():
+                result = self.get_projected_entry(instance_id, fields)
+                self.check_read_permissions(result)
+            else:
+                instance = self.get_model_or_404(instance_id)
+                result = self.serialize_instance(instance)
+                self.check_read_permissions(result)
+                result = self.clean_get_result(result)
+            if fields is not None:
+                result = query_utils.select_fields(result, fields)
 
         except StatementError as exception:
             current_app.logger.error(str(exception), exc_info=1)
@@ -280,7 +487,7 @@ class BaseModelResource(Resource):
             data = self.update_data(data, instance_id)
             instance.update(data)
             instance_dict = instance.serialize()
-            self.emit_update_event(instance_dict)
+            self.emit_update_event(instance_dict, instance.last_changes)
             self.post_update(instance_dict)
             return instance_dict, 200
 
@@ -326,10 +533,13 @@ class BaseModelResource(Resource):
 
         return "", 204
 
-    def emit_update_event(self, instance_dict):
+    def emit_update_event(self, instance_dict, changes=None):
         return events.emit(
             "%s:update" % self.model.__tablename__.replace("_", "-"),
-            {"%s_id" % self.model.__tablename__: instance_dict["id"]},
+            dict(
+                {"%s_id" % self.model.__tablename__: instance_dict["id"]},
+                **events.get_changes_data(changes)
+            ),
         )
 
     def emit_delete_event(self, instance_dict):
@@ -26,7 +26,7 @@ class EntityEventMixin(object):
             type_name = "episode"
         return type_name
 
-    def emit_event(self, event_name, entity_dict):
+    def emit_event(self, event_name, entity_dict, changes=None):
         instance_id = entity_dict["id"]
         type_name = self.get_type_name(entity_dict)
         if event_name in ["update", "delete"]:
@@ -36,10 +36,13 @@ class EntityEventMixin(object):
                 assets_service.clear_asset_cache(instance_id)
         events.emit(
             "%s:%s" % (type_name, event_name),
-            {
-                "%s_id" % type_name: instance_id,
-                "project_id": entity_dict["project_id"],
-            },
+            dict(
+                {
+                    "%s_id" % type_name: instance_id,
+                    "project_id": entity_dict["project_id"],
+                },
+                **events.get_changes_data(changes)
+            ),
         )
 
 
@@ -108,7 +111,7 @@ class EntityResource(BaseModelResource, EntityEventMixin):
 
             if shots_service.is_shot(entity_dict):
                 self.save_version_if_needed(entity_dict, previous_version)
-            self.emit_update_event(entity_dict)
+            self.emit_update_event(entity_dict, entity.last_changes)
             return entity_dict, 200
 
         except StatementError as exception:
@@ -145,8 +148,8 @@ class EntityResource(BaseModelResource, EntityEventMixin):
             )
         return version
 
-    def emit_update_event(self, entity_dict):
-        self.emit_event("update", entity_dict)
+    def emit_update_event(self, entity_dict, changes=None):
+        self.emit_event("update", entity_dict, changes)
 
     def emit_delete_event(self, entity_dict):
         self.emit_event("delete", entity_dict)
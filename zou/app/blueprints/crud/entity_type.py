@@ -27,8 +27,14 @@ class EntityTypeResource(BaseModelResource):
     def check_read_permissions(self, instance):
         return True
 
-    def emit_update_event(self, instance_dict):
-        events.emit("asset-type:update", {"asset_type_id": instance_dict["id"]})
+    def emit_update_event(self, instance_dict, changes=None):
+        events.emit(
+            "asset-type:update",
+            dict(
+                {"asset_type_id": instance_dict["id"]},
+                **events.get_changes_data(changes)
+            ),
+        )
 
     def emit_delete_event(self, instance_dict):
         events.emit("asset-type:delete", {"asset_type_id": instance_dict["id"]})
@@ -10,21 +10,36 @@ from .base import BaseModelsResource, BaseModelResource
 from zou.app.mixin import ArgsMixin
 
 
+def filter_readable_columns(columns):
+    """
+    Remove from given columns the ones the current user can't request
+    through the fields parameter.
+    """
+    hidden_columns = ["password"]
+    if not permissions.has_manager_permissions():
+        hidden_columns += ["phone", "email"]
+    return [column for column in columns if column not in hidden_columns]
+
+
 class PersonsResource(BaseModelsResource):
     def __init__(self):
         BaseModelsResource.__init__(self, Person)
 
-    def all_entries(self, query=None, relations=False):
-        if query is None:
-            query = self.model.query
+    def get_readable_columns(self):
+        return filter_readable_columns(
+            BaseModelsResource.get_readable_columns(self)
+        )
 
-        if permissions.has_manager_permissions():
+    def serialize_entries(self, entries, relations=False):
+        if self.fields is not None:
+            return self.serialize_rows(entries)
+        elif permissions.has_manager_permissions():
             if request.args.get("with_pass_hash") == "true":
-                return [person.serialize() for person in query.all()]
+                return [person.serialize() for person in entries]
             else:
-                return [person.serialize_safe() for person in query.all()]
+                return [person.serialize_safe() for person in entries]
         else:
-            return [person.serialize_without_info() for person in query.all()]
+            return [person.serialize_without_info() for person in entries]
 
     def post(self):
         abort(405)
@@ -60,6 +75,15 @@ class PersonResource(BaseModelResource, ArgsMixin):
         else:
             raise permissions.PermissionDenied
 
+    def get_readable_columns(self):
+        return filter_readable_columns(
+            BaseModelResource.get_readable_columns(self)
+        )
+
+    def is_projection_supported(self):
+        # Private columns are not readable, see get_readable_columns.
+        return True
+
     def serialize_instance(self, instance):
         if permissions.has_manager_permissions():
             return instance.serialize_safe()
@@ -1,6 +1,8 @@
+from flask import abort
 from flask_jwt_extended import jwt_required
-from flask_restful import reqparse
+from flask_restful import Resource, reqparse
 
+from zou.app import config
 from zou.app.models.project import Project
 from zou.app.models.project_status import ProjectStatus
 from zou.app.services import (
@@ -9,6 +11,7 @@ from zou.app.services import (
     shots_service,
     user_service,
 )
+from zou.app.stores import queue_store
 from zou.app.utils import permissions, fields
 
 from .base import BaseModelResource, BaseModelsResource
@@ -87,8 +90,33 @@ class ProjectResource(BaseModelResource):
         else:
             if args["force"] == True:
                 self.check_delete_permissions(project_dict)
+                if config.ENABLE_JOB_QUEUE:
+                    job = queue_store.job_queue.enqueue(
+                        deletion_service.remove_project_job,
+                        args=(instance_id,),
+                        job_timeout=7200,
+                    )
+                    self.post_delete(project_dict)
+                    return {"job": "running", "job_id": job.id}, 202
                 deletion_service.remove_project(instance_id)
             else:
                 project.delete()
             self.post_delete(project_dict)
             return "", 204
+
+
+class ProjectDeletionJobResource(Resource):
+    """
+    Return the status and the progress of a project deletion running in the
+    job queue.
+    """
+
+    @jwt_required
+    def get(self, job_id):
+        permissions.check_admin_permissions()
+        job = None
+        if config.ENABLE_JOB_QUEUE:
+            job = deletion_service.get_remove_project_job(job_id)
+        if job is None:
+            abort(404)
+        return job
@@ -1,4 +1,5 @@
 from zou.app.models.time_spent import TimeSpent
+from zou.app.services import time_spents_service
 
 from .base import BaseModelsResource, BaseModelResource
 
@@ -7,7 +8,28 @@ class TimeSpentsResource(BaseModelsResource):
     def __init__(self):
         BaseModelsResource.__init__(self, TimeSpent)
 
+    def post_creation(self, instance):
+        time_spents_service.update_monthly_time_spent(
+            instance.person_id, instance.date
+        )
+        return instance.serialize()
+
 
 class TimeSpentResource(BaseModelResource):
     def __init__(self):
         BaseModelResource.__init__(self, TimeSpent)
+
+    def update_data(self, data, instance_id):
+        self.previous_time_spent = TimeSpent.get(instance_id).serialize()
+        return BaseModelResource.update_data(self, data, instance_id)
+
+    def post_update(self, instance_dict):
+        for time_spent in [self.previous_time_spent, instance_dict]:
+            time_spents_service.update_monthly_time_spent(
+                time_spent["person_id"], time_spent["date"]
+            )
+
+    def post_delete(self, instance_dict):
+        time_spents_service.update_monthly_time_spent(
+            instance_dict["person_id"], instance_dict["date"]
+        )
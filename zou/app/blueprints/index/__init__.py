@@ -6,7 +6,10 @@ from flask import Blueprint
 from zou.app.utils.api import configure_api_from_blueprint
 
 from .resources import (
+    CacheStatsResource,
+    EventHandlersStatsResource,
     IndexResource,
+    InfluxCacheStatsResource,
     InfluxStatusResource,
     StatusResource,
     StatsResource,
@@ -19,6 +22,9 @@ routes = [
     ("/status/influx", InfluxStatusResource),
     ("/status.txt", TxtStatusResource),
     ("/stats", StatsResource),
+    ("/stats/cache", CacheStatsResource),
+    ("/stats/cache/influx", InfluxCacheStatsResource),
+    ("/stats/event-handlers", EventHandlersStatsResource),
 ]
 
 blueprint = Blueprint("index", "index")
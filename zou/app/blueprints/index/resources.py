@@ -8,7 +8,7 @@ from flask_restful import Resource
 from zou import __version__
 
 from zou.app import app, config
-from zou.app.utils import permissions
+from zou.app.utils import cache, handler_pool, permissions
 from zou.app.services import projects_service, stats_service
 
 from flask_jwt_extended import jwt_required
@@ -107,3 +107,65 @@ class StatsResource(Resource):
         if not permissions.has_admin_permissions():
             abort(403)
         return stats_service.get_main_stats()
+
+
+class CacheStatsResource(Resource):
+
+    @jwt_required
+    def get(self):
+        if not permissions.has_admin_permissions():
+            abort(403)
+        return {
+            "local": cache.get_local_cache_stats(),
+            "functions": cache.get_function_stats(),
+        }
+
+
+class EventHandlersStatsResource(Resource):
+    """
+    Counters of event handler runs and load of the event handler pool.
+    """
+
+    @jwt_required
+    def get(self):
+        if not permissions.has_admin_permissions():
+            abort(403)
+        return handler_pool.get_stats()
+
+
+class InfluxCacheStatsResource(Resource):
+    """
+    Counters of memoized functions in Influx line protocol.
+    """
+
+    @jwt_required
+    def get(self):
+        if not permissions.has_admin_permissions():
+            abort(403)
+
+        timestamp = int(datetime.timestamp(datetime.now()) * 1000000000)
+        lines = []
+        function_stats = cache.get_function_stats()
+        for namespace, stats in sorted(function_stats.items()):
+            fields = ",".join(
+                [
+                    "calls=%di" % stats["calls"],
+                    "hits=%di" % stats["hits"],
+                    "misses=%di" % stats["misses"],
+                    "hit_rate=%f" % stats["hit_rate"],
+                    "average_call_time=%f" % stats["average_call_time"],
+                    "average_compute_time=%f"
+                    % stats["average_compute_time"],
+                    "average_payload_size=%di"
+                    % stats["average_payload_size"],
+                ]
+            )
+            name = (
+                namespace.replace(",", "\\,")
+                .replace("=", "\\=")
+                .replace(" ", "\\ ")
+            )
+            lines.append(
+                "memoize,function=%s %s %d" % (name, fields, timestamp)
+            )
+        return Response("\n".join(lines) + "\n", mimetype="text")
@@ -1,6 +1,6 @@
 import datetime
 
-from flask import abort
+from flask import abort, request
 from flask_restful import Resource, reqparse
 from flask_jwt_extended import jwt_required
 
@@ -178,6 +178,17 @@ class PersonDayTimeSpentsResource(Resource):
             abort(404)
 
 
+def get_table_filters():
+    """
+    Return the project and department filters of time spent tables, given
+    as query parameters.
+    """
+    return {
+        "project_id": request.args.get("project_id", None),
+        "department_id": request.args.get("department_id", None),
+    }
+
+
 class TimeSpentYearResource(Resource):
     """
     Return a table giving time spent by user and by month for given year.
@@ -186,7 +197,7 @@ class TimeSpentYearResource(Resource):
     @jwt_required
     def get(self):
         permissions.check_admin_permissions()
-        return time_spents_service.get_year_table()
+        return time_spents_service.get_year_table(**get_table_filters())
 
 
 class TimeSpentMonthResource(Resource):
@@ -198,7 +209,9 @@ class TimeSpentMonthResource(Resource):
     @jwt_required
     def get(self, year, month):
         permissions.check_admin_permissions()
-        return time_spents_service.get_day_table(year, month)
+        return time_spents_service.get_day_table(
+            year, month, **get_table_filters()
+        )
 
 
 class TimeSpentYearsResource(Resource):
@@ -209,7 +222,7 @@ class TimeSpentYearsResource(Resource):
     @jwt_required
     def get(self):
         permissions.check_admin_permissions()
-        return time_spents_service.get_year_table()
+        return time_spents_service.get_year_table(**get_table_filters())
 
 
 class TimeSpentMonthsResource(Resource):
@@ -220,7 +233,9 @@ class TimeSpentMonthsResource(Resource):
     @jwt_required
     def get(self, year):
         permissions.check_admin_permissions()
-        return time_spents_service.get_month_table(year)
+        return time_spents_service.get_month_table(
+            year, **get_table_filters()
+        )
 
 
 class TimeSpentWeekResource(Resource):
@@ -231,7 +246,9 @@ class TimeSpentWeekResource(Resource):
     @jwt_required
     def get(self, year):
         permissions.check_admin_permissions()
-        return time_spents_service.get_week_table(year)
+        return time_spents_service.get_week_table(
+            year, **get_table_filters()
+        )
 
 
 class InvitePersonResource(Resource):
@@ -23,6 +23,7 @@ from .resources import (
     ProjectSequencesResource,
     ProjectEpisodesResource,
     ProjectEpisodeStatsResource,
+    ProjectSequenceStatsResource,
     EpisodeResource,
     EpisodesResource,
     EpisodeAndTasksResource,
@@ -74,6 +75,10 @@ routes = [
     ("/data/projects/<project_id>/sequences", ProjectSequencesResource),
     ("/data/projects/<project_id>/episodes", ProjectEpisodesResource),
     ("/data/projects/<project_id>/episodes/stats", ProjectEpisodeStatsResource),
+    (
+        "/data/projects/<project_id>/sequences/stats",
+        ProjectSequenceStatsResource,
+    ),
 ]
 
 
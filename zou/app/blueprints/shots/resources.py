@@ -14,7 +14,7 @@ from zou.app.services import (
 )
 
 from zou.app.mixin import ArgsMixin
-from zou.app.utils import query
+from zou.app.utils import api as api_utils, query
 
 from zou.app.services.exception import ModelWithRelationsDeletionException
 
@@ -182,11 +182,22 @@ class ShotsAndTasksResource(Resource):
     def get(self):
         """
         Retrieve all shots, adds project name and asset type name and all
-        related tasks.
+        related tasks. The columnar format can be requested for large
+        listings.
         """
         criterions = query.get_query_criterions_from_request(request)
         user_service.check_project_access(criterions.get("project_id", None))
-        return shots_service.get_shots_and_tasks(criterions)
+        if query.is_columnar_format_requested(request):
+            return shots_service.get_shots_and_tasks_columnar(criterions)
+
+        shots = shots_service.get_shots_and_tasks(
+            criterions, query.get_fields_from_request(request)
+        )
+        shots = query.select_fields_from_request(request, shots)
+        if api_utils.is_json_streaming_enabled():
+            return api_utils.stream_json_list(shots)
+        else:
+            return shots
 
 
 class SceneAndTasksResource(Resource):
@@ -199,7 +210,10 @@ class SceneAndTasksResource(Resource):
         criterions = query.get_query_criterions_from_request(request)
         user_service.check_project_access(criterions.get("project_id", None))
         criterions["entity_type_id"] = shots_service.get_scene_type()["id"]
-        return entities_service.get_entities_and_tasks(criterions)
+        entities = entities_service.get_entities_and_tasks(
+            criterions, query.get_fields_from_request(request)
+        )
+        return query.select_fields_from_request(request, entities)
 
 
 class SequenceAndTasksResource(Resource):
@@ -212,7 +226,10 @@ class SequenceAndTasksResource(Resource):
         criterions = query.get_query_criterions_from_request(request)
         user_service.check_project_access(criterions.get("project_id", None))
         criterions["entity_type_id"] = shots_service.get_sequence_type()["id"]
-        return entities_service.get_entities_and_tasks(criterions)
+        entities = entities_service.get_entities_and_tasks(
+            criterions, query.get_fields_from_request(request)
+        )
+        return query.select_fields_from_request(request, entities)
 
 
 class EpisodeAndTasksResource(Resource):
@@ -225,7 +242,10 @@ class EpisodeAndTasksResource(Resource):
         criterions = query.get_query_criterions_from_request(request)
         user_service.check_project_access(criterions.get("project_id", None))
         criterions["entity_type_id"] = shots_service.get_episode_type()["id"]
-        return entities_service.get_entities_and_tasks(criterions)
+        entities = entities_service.get_entities_and_tasks(
+            criterions, query.get_fields_from_request(request)
+        )
+        return query.select_fields_from_request(request, entities)
 
 
 class ProjectShotsResource(Resource):
@@ -332,6 +352,18 @@ class ProjectEpisodeStatsResource(Resource):
         return shots_service.get_episode_stats_for_project(project_id)
 
 
+class ProjectSequenceStatsResource(Resource):
+    @jwt_required
+    def get(self, project_id):
+        """
+        Retrieve number of tasks by status, task_types and sequences
+        for given project.
+        """
+        projects_service.get_project(project_id)
+        user_service.check_project_access(project_id)
+        return shots_service.get_sequence_stats_for_project(project_id)
+
+
 class EpisodeResource(Resource, ArgsMixin):
     @jwt_required
     def get(self, episode_id):
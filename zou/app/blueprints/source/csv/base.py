@@ -7,7 +7,7 @@ from flask_restful import Resource
 from flask_jwt_extended import jwt_required
 
 from zou.app import app
-from zou.app.utils import permissions
+from zou.app.utils import cache, permissions
 from zou.app.services import user_service, projects_service
 
 
@@ -103,6 +103,7 @@ class BaseCsvProjectImportResource(BaseCsvImportResource):
             for row in reader:
                 row = self.import_row(row, project_id)
                 result.append(row)
+        cache.invalidate_project(project_id)
         return result
 
     def check_project_permissions(self, project_id):
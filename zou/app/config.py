@@ -20,8 +20,33 @@ AUTH_TOKEN_BLACKLIST_KV_INDEX = 0
 MEMOIZE_DB_INDEX = 1
 KV_EVENTS_DB_INDEX = 2
 KV_JOB_DB_INDEX = 3
+KV_READ_REPLICA_DB_INDEX = 4
+
+MEMOIZE_LOCAL_CACHE = (
+    os.getenv("MEMOIZE_LOCAL_CACHE", "False").lower() == "true"
+)
+MEMOIZE_LOCAL_CACHE_SIZE = int(os.getenv("MEMOIZE_LOCAL_CACHE_SIZE", 2000))
+MEMOIZE_LOCAL_CACHE_TIMEOUT = int(os.getenv("MEMOIZE_LOCAL_CACHE_TIMEOUT", 10))
+MEMOIZE_LOCK_TIMEOUT = int(os.getenv("MEMOIZE_LOCK_TIMEOUT", 10))
+MEMOIZE_LOCK_WAIT = float(os.getenv("MEMOIZE_LOCK_WAIT", 2))
+MEMOIZE_STATS = os.getenv("MEMOIZE_STATS", "True").lower() == "true"
+MEMOIZE_STATS_FLUSH_INTERVAL = int(
+    os.getenv("MEMOIZE_STATS_FLUSH_INTERVAL", 10)
+)
+MEMOIZE_WARM_ON_BOOT = (
+    os.getenv("MEMOIZE_WARM_ON_BOOT", "False").lower() == "true"
+)
 
 ENABLE_JOB_QUEUE = os.getenv("ENABLE_JOB_QUEUE", "False").lower() == "true"
+EVENT_OUTBOX_FLUSH_SIZE = int(os.getenv("EVENT_OUTBOX_FLUSH_SIZE", 100))
+EVENT_HANDLERS_POOL_SIZE = int(os.getenv("EVENT_HANDLERS_POOL_SIZE", 0))
+EVENT_HANDLERS_QUEUE_SIZE = int(os.getenv("EVENT_HANDLERS_QUEUE_SIZE", 1000))
+EVENT_HANDLERS_TIMEOUT = float(os.getenv("EVENT_HANDLERS_TIMEOUT", 60))
+EVENT_COALESCE_WINDOW = float(os.getenv("EVENT_COALESCE_WINDOW", 0))
+EVENT_COALESCE_MAX_EVENTS = int(os.getenv("EVENT_COALESCE_MAX_EVENTS", 1000))
+EVENT_COALESCE_BATCH_SIZE = int(os.getenv("EVENT_COALESCE_BATCH_SIZE", 0))
+EVENT_COALESCE_MAX_IDS = int(os.getenv("EVENT_COALESCE_MAX_IDS", 200))
+EVENT_CHANGES_MAX_SIZE = int(os.getenv("EVENT_CHANGES_MAX_SIZE", 2048))
 
 JWT_BLACKLIST_ENABLED = True
 JWT_BLACKLIST_TOKEN_CHECKS = ["access", "refresh"]
@@ -33,6 +58,9 @@ JWT_COOKIE_CSRF_PROTECT = False
 JWT_SESSION_COOKIE = False
 
 RESTFUL_JSON = {"ensure_ascii": False}
+JSON_ENCODER = os.getenv("JSON_ENCODER", "json")  # json or orjson
+JSON_STREAMING = os.getenv("JSON_STREAMING", "False").lower() == "true"
+JSON_STREAMING_BATCH_SIZE = int(os.getenv("JSON_STREAMING_BATCH_SIZE", 500))
 DATABASE = {
     "drivername": os.getenv("DB_DRIVER", "postgresql"),
     "host": os.getenv("DB_HOST", "localhost"),
@@ -48,6 +76,27 @@ SQLALCHEMY_ENGINE_OPTIONS = {
     "max_overflow": os.getenv("DB_MAX_OVERFLOW", 60),
 }
 
+# Read only queries of GET requests are sent to the read replica when its
+# host is set. Users are pinned to the primary database for
+# READ_REPLICA_PIN_DURATION seconds after they wrote something. The replica is
+# not used when it lags more than READ_REPLICA_MAX_LAG seconds behind.
+DATABASE_REPLICA = dict(
+    DATABASE,
+    host=os.getenv("DB_REPLICA_HOST", ""),
+    port=os.getenv("DB_REPLICA_PORT", DATABASE["port"]),
+)
+if DATABASE_REPLICA["host"]:
+    SQLALCHEMY_BINDS = {
+        "replica": str(dbhelpers.get_db_uri(DATABASE_REPLICA))
+    }
+else:
+    SQLALCHEMY_BINDS = None
+READ_REPLICA_PIN_DURATION = int(os.getenv("READ_REPLICA_PIN_DURATION", 10))
+READ_REPLICA_MAX_LAG = float(os.getenv("READ_REPLICA_MAX_LAG", 5))
+READ_REPLICA_CHECK_INTERVAL = int(
+    os.getenv("READ_REPLICA_CHECK_INTERVAL", 5)
+)
+
 NB_RECORDS_PER_PAGE = 100
 
 DONE_TASK_STATUS = "Done"
@@ -80,6 +129,7 @@ TMP_DIR = os.getenv("TMP_DIR", os.path.join(os.sep, "tmp", "zou"))
 
 EVENT_STREAM_HOST = os.getenv("EVENT_STREAM_HOST", "localhost")
 EVENT_STREAM_PORT = os.getenv("EVENT_STREAM_PORT", 5001)
+EVENT_STREAM_ROOMS = os.getenv("EVENT_STREAM_ROOMS", "True").lower() == "true"
 
 FS_BACKEND = os.getenv("FS_BACKEND", "local")
 FS_ROOT = PREVIEW_FOLDER
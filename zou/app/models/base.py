@@ -1,12 +1,39 @@
 import datetime
+import itertools
 
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy_utils import UUIDType
 from zou.app import db
-from zou.app.utils import fields
+from zou.app.utils import cache, fields
+
+
+# Number of entries written by each statement of bulk imports.
+IMPORT_CHUNK_SIZE = 1000
+
+
+def get_row_keys(row):
+    return tuple(sorted(row.keys()))
 
 
 class BaseMixin(object):
 
+    # Kind used to tag memoized results that depend on entries of this model.
+    # Changes on models without kind don't invalidate tagged results.
+    cache_tag_kind = None
+
+    # Many to many relations written by bulk imports. Keys are fields of the
+    # imported data, values are the association table, its column linked to
+    # this model and its column linked to the other model.
+    import_links = {}
+
+    # Fields whose values are never sent with the changes of update events.
+    private_fields = ()
+
+    # Changes made by the last call to update, see get_changes.
+    last_changes = {}
+
     id = db.Column(
         UUIDType(binary=False), primary_key=True, default=fields.gen_uuid
     )
@@ -25,6 +52,16 @@ class BaseMixin(object):
         """
         return "<%s %s>" % (type(self).__name__, self.name)
 
+    def get_cache_tags(self):
+        """
+        Return the tags of the memoized results to invalidate when this entry
+        is modified.
+        """
+        if self.cache_tag_kind is None or self.id is None:
+            return []
+        else:
+            return [cache.tag(self.cache_tag_kind, self.id)]
+
     @classmethod
     def query(cls):
         """
@@ -72,7 +109,6 @@ class BaseMixin(object):
             db.session.commit()
         except:
             db.session.rollback()
-            db.session.remove()
             raise
         return instance
 
@@ -125,11 +161,118 @@ class BaseMixin(object):
     @classmethod
     def create_from_import_list(cls, data_list):
         """
-        Create a list of instances of the model based on data that comes from
-        the Zou API.
+        Create or update a list of instances of the model based on data that
+        comes from the Zou API. Entries are written in bulk, chunk by chunk,
+        and each chunk is commited once. When a chunk can't be written that
+        way (like when an entry breaks a constraint), its entries are
+        imported one by one.
+        """
+        for index in range(0, len(data_list), IMPORT_CHUNK_SIZE):
+            chunk = data_list[index : index + IMPORT_CHUNK_SIZE]
+            try:
+                cls.upsert_import_chunk(chunk)
+            except DBAPIError:
+                db.session.rollback()
+                for data in chunk:
+                    cls.create_from_import(data)
+
+    @classmethod
+    def prepare_import_data(cls, data):
+        """
+        Return the column values of an entry based on data that comes from
+        the Zou API. Fields that are not columns are ignored.
         """
-        for data in data_list:
-            cls.create_from_import(data)
+        columns = cls.__table__.columns
+        return {key: value for key, value in data.items() if key in columns}
+
+    @classmethod
+    def prefetch_import_data(cls, chunk):
+        """
+        Return the data that the entries of given chunk refer to, read at once
+        for the whole chunk. They are given as keyword arguments to
+        prepare_import_data.
+        """
+        return {}
+
+    @classmethod
+    def upsert_import_chunk(cls, chunk):
+        """
+        Write given entries with INSERT ... ON CONFLICT (id) DO UPDATE
+        statements, then replace their many to many links. Given data is not
+        modified.
+        """
+        rows = {}
+        links = {field: {} for field in cls.import_links}
+        prefetched_data = cls.prefetch_import_data(chunk)
+        for data in chunk:
+            data = dict(data)
+            for field in cls.import_links:
+                linked_ids = data.pop(field, None)
+                if linked_ids is not None:
+                    links[field][data["id"]] = linked_ids
+            row = cls.prepare_import_data(data, **prefetched_data)
+            rows[row["id"]] = row
+
+        table = cls.__table__
+        for keys, group in itertools.groupby(
+            sorted(rows.values(), key=get_row_keys), get_row_keys
+        ):
+            statement = insert(table).values(list(group))
+            updated_columns = {
+                key: statement.excluded[key] for key in keys if key != "id"
+            }
+            if len(updated_columns) > 0:
+                statement = statement.on_conflict_do_update(
+                    index_elements=[table.c.id], set_=updated_columns
+                )
+            else:
+                statement = statement.on_conflict_do_nothing()
+            db.session.execute(statement)
+
+        for field, linked_ids_map in links.items():
+            cls.replace_import_links(field, linked_ids_map)
+
+        if cls.cache_tag_kind is not None:
+            tags = db.session.info.setdefault("cache_tags", set())
+            for row in rows.values():
+                tags.update(cls(**row).get_cache_tags())
+        db.session.commit()
+
+    @classmethod
+    def replace_import_links(cls, field, linked_ids_map):
+        """
+        Replace the links of the association table related to given field.
+        Keys of the map are ids of entries of this model, values are the
+        linked ids. Links to missing entries are ignored.
+        """
+        if len(linked_ids_map) == 0:
+            return
+
+        (table, column_name, other_column_name) = cls.import_links[field]
+        column = table.columns[column_name]
+        other_column = table.columns[other_column_name]
+        db.session.execute(
+            table.delete().where(column.in_(list(linked_ids_map.keys())))
+        )
+
+        (foreign_key,) = other_column.foreign_keys
+        target_ids = set(itertools.chain(*linked_ids_map.values()))
+        existing_ids = set(
+            str(target_id)
+            for (target_id,) in db.session.execute(
+                select([foreign_key.column]).where(
+                    foreign_key.column.in_(list(target_ids))
+                )
+            )
+        )
+        rows = [
+            {column_name: entry_id, other_column_name: linked_id}
+            for entry_id, linked_ids in linked_ids_map.items()
+            for linked_id in set(linked_ids)
+            if linked_id in existing_ids
+        ]
+        if len(rows) > 0:
+            db.session.execute(table.insert().values(rows))
 
     @classmethod
     def delete_from_import(cls, instance_id):
@@ -156,7 +299,6 @@ class BaseMixin(object):
             db.session.commit()
         except:
             db.session.rollback()
-            db.session.remove()
             raise
 
     def delete(self):
@@ -169,7 +311,6 @@ class BaseMixin(object):
             db.session.commit()
         except:
             db.session.rollback()
-            db.session.remove()
             raise
 
     def delete_no_commit(self):
@@ -180,18 +321,63 @@ class BaseMixin(object):
         db.session.delete(self)
         return True
 
+    def get_changes(self, keys):
+        """
+        Return the columns among given keys whose value was modified since
+        the entry was loaded, with their new value serialized. Private fields
+        are skipped.
+        """
+        state = inspect(self)
+        column_keys = state.mapper.column_attrs.keys()
+        changes = {}
+        for key in keys:
+            if (
+                key in column_keys
+                and key not in self.private_fields
+                and state.attrs[key].history.has_changes()
+            ):
+                changes[key] = fields.serialize_value(getattr(self, key))
+        return changes
+
     def update(self, data):
         """
         Shorthand to update an entry via the database session based on current
-        instance fields.
+        instance fields. Modified fields are kept in last_changes.
         """
         try:
             self.updated_at = datetime.datetime.now()
             for key, value in data.items():
                 setattr(self, key, value)
+            self.last_changes = self.get_changes(data.keys())
             db.session.add(self)
             db.session.commit()
         except:
             db.session.rollback()
-            db.session.remove()
             raise
+
+
+@event.listens_for(db.session, "after_flush")
+def collect_cache_tags(session, flush_context):
+    """
+    Store the tags of the modified entries until the transaction is commited.
+    """
+    tags = session.info.setdefault("cache_tags", set())
+    instances = itertools.chain(session.new, session.dirty, session.deleted)
+    for instance in instances:
+        if isinstance(instance, BaseMixin):
+            tags.update(instance.get_cache_tags())
+
+
+@event.listens_for(db.session, "after_commit")
+def invalidate_cache_tags(session):
+    """
+    Once changes are commited, drop the memoized results depending on them.
+    """
+    tags = session.info.pop("cache_tags", None)
+    if tags:
+        cache.invalidate_tags(*tags)
+
+
+@event.listens_for(db.session, "after_rollback")
+def discard_cache_tags(session):
+    session.info.pop("cache_tags", None)
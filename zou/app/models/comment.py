@@ -49,6 +49,11 @@ class Comment(db.Model, BaseMixin, SerializerMixin):
     means that the comment relates to this preview in the context of the task.
     """
 
+    import_links = {
+        "previews": (preview_link_table, "comment", "preview_file"),
+        "mentions": (mentions_table, "comment", "person"),
+    }
+
     shotgun_id = db.Column(db.Integer)
 
     object_id = db.Column(UUIDType(binary=False), nullable=False, index=True)
@@ -3,7 +3,7 @@ from sqlalchemy_utils import UUIDType
 from zou.app import db
 from zou.app.models.serializer import SerializerMixin
 from zou.app.models.base import BaseMixin
-from zou.app.utils import fields
+from zou.app.utils import cache, fields
 
 from sqlalchemy.dialects.postgresql import JSONB
 
@@ -46,6 +46,15 @@ class EntityLink(db.Model, BaseMixin, SerializerMixin):
             entity_link.update(data)
             return entity_link
 
+    @classmethod
+    def create_from_import_list(cls, data_list):
+        """
+        Links are matched on the entities they link rather than on their id,
+        so they are imported one by one.
+        """
+        for data in data_list:
+            cls.create_from_import(data)
+
 
 class Entity(db.Model, BaseMixin, SerializerMixin):
     """
@@ -54,6 +63,11 @@ class Entity(db.Model, BaseMixin, SerializerMixin):
     tasks and files.
     """
 
+    cache_tag_kind = "entity"
+    import_links = {
+        "entities_out": (EntityLink.__table__, "entity_in_id", "entity_out_id")
+    }
+
     id = db.Column(
         UUIDType(binary=False), primary_key=True, default=fields.gen_uuid
     )
@@ -118,6 +132,13 @@ class Entity(db.Model, BaseMixin, SerializerMixin):
         ),
     )
 
+    def get_cache_tags(self):
+        """
+        An entity change affects the listings of its project.
+        """
+        tags = BaseMixin.get_cache_tags(self)
+        return tags + cache.get_project_content_tags(self.project_id)
+
     def set_entities_out(self, entity_ids):
         self.entities_out = []
         for entity_id in entity_ids:
@@ -144,7 +165,52 @@ class Entity(db.Model, BaseMixin, SerializerMixin):
         return previous_entity
 
     @classmethod
-    def sanitize_import_data(self, data):
+    def prefetch_import_data(cls, chunk):
+        """
+        Read at once the preview files and the entity types the entries of
+        given chunk refer to.
+        """
+        from zou.app.models.preview_file import PreviewFile
+        from zou.app.models.entity_type import EntityType
+
+        preview_file_ids = set(
+            data["preview_file_id"]
+            for data in chunk
+            if data.get("preview_file_id", None)
+        )
+        preview_files = {}
+        if len(preview_file_ids) > 0:
+            preview_files = {
+                str(preview_file.id): preview_file
+                for preview_file in PreviewFile.query.filter(
+                    PreviewFile.id.in_(preview_file_ids)
+                )
+            }
+        entity_types = {
+            entity_type.name: entity_type
+            for entity_type in EntityType.query.filter(
+                EntityType.name.in_(["Shot", "Sequence", "Episode"])
+            )
+        }
+        return {"preview_files": preview_files, "entity_types": entity_types}
+
+    @classmethod
+    def prepare_import_data(cls, data, preview_files=None, entity_types=None):
+        (data, _) = cls.sanitize_import_data(
+            data, preview_files, entity_types
+        )
+        return super(Entity, cls).prepare_import_data(data)
+
+    @classmethod
+    def sanitize_import_data(
+        self, data, preview_files=None, entity_types=None
+    ):
+        """
+        Turn data that comes from the Zou API into column values. Preview
+        files and entity types are read from given dicts (see
+        prefetch_import_data) when they are given, from the database
+        otherwise.
+        """
         from zou.app.models.preview_file import PreviewFile
         from zou.app.models.entity_type import EntityType
 
@@ -169,7 +235,10 @@ class Entity(db.Model, BaseMixin, SerializerMixin):
             and data["preview_file_id"] is not None
             and len(data["preview_file_id"]) > 0
         ):
-            preview_file = PreviewFile.get(data["preview_file_id"])
+            if preview_files is None:
+                preview_file = PreviewFile.get(data["preview_file_id"])
+            else:
+                preview_file = preview_files.get(data["preview_file_id"], None)
             if preview_file is None:
                 del data["preview_file_id"]
         elif "preview_file_id" in data:
@@ -200,7 +269,10 @@ class Entity(db.Model, BaseMixin, SerializerMixin):
                 del data[field]
 
         if model_type in ["Shot", "Sequence", "Episode"]:
-            entity_type = EntityType.get_by(name=model_type)
+            if entity_types is None:
+                entity_type = EntityType.get_by(name=model_type)
+            else:
+                entity_type = entity_types[model_type]
             data["entity_type_id"] = entity_type.id
 
         return (data, entity_ids)
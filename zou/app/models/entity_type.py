@@ -9,4 +9,6 @@ class EntityType(db.Model, BaseMixin, SerializerMixin):
     entity is a shot, sequence, episode or layout scene.
     """
 
+    cache_tag_kind = "entity_type"
+
     name = db.Column(db.String(30), unique=True, nullable=False, index=True)
@@ -0,0 +1,26 @@
+from sqlalchemy_utils import UUIDType
+from zou.app import db
+from zou.app.models.serializer import SerializerMixin
+from zou.app.models.base import BaseMixin
+
+
+class MonthlyTimeSpent(db.Model, BaseMixin, SerializerMixin):
+    """
+    Sum of the time spent by someone during a month. Sums are derived from
+    time spents: they are refreshed when time spents change and they can be
+    rebuilt from scratch.
+    """
+
+    year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
+    duration = db.Column(db.Integer, nullable=False, default=0)
+
+    person_id = db.Column(
+        UUIDType(binary=False), db.ForeignKey("person.id"), index=True
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "person_id", "year", "month", name="monthly_time_spent_uc"
+        ),
+    )
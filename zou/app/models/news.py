@@ -37,8 +37,8 @@ class News(db.Model, BaseMixin, SerializerMixin):
     )
 
     @classmethod
-    def create_from_import(cls, data):
-        data = {
+    def prepare_import_data(cls, data):
+        return {
             "id": data["id"],
             "updated_at": data["created_at"],
             "created_at": data["created_at"],
@@ -48,6 +48,10 @@ class News(db.Model, BaseMixin, SerializerMixin):
             "preview_file_id": data["preview_file_id"],
             "task_id": data["task_id"],
         }
+
+    @classmethod
+    def create_from_import(cls, data):
+        data = cls.prepare_import_data(data)
         previous_data = cls.get(data["id"])
         if previous_data is None:
             return cls.create(**data)
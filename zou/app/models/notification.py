@@ -65,6 +65,11 @@ class Notification(db.Model, BaseMixin, SerializerMixin):
         obj_dict["type"] = obj_type or type(self).__name__
         return obj_dict
 
+    @classmethod
+    def prepare_import_data(cls, data):
+        data["type"] = data.pop("notification_type", "")
+        return super(Notification, cls).prepare_import_data(data)
+
     @classmethod
     def create_from_import(cls, data):
         notification_type = ""
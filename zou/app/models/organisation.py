@@ -9,6 +9,8 @@ class Organisation(db.Model, BaseMixin, SerializerMixin):
     Model to represent current organisation settings.
     """
 
+    private_fields = ("chat_token_slack",)
+
     name = db.Column(db.String(80), unique=True, nullable=False)
     hours_by_day = db.Column(db.Integer(), default=8, nullable=False)
     has_avatar = db.Column(db.Boolean(), default=False)
@@ -25,6 +25,15 @@ class Person(db.Model, BaseMixin, SerializerMixin):
     Describe a member of the studio (and an API user).
     """
 
+    cache_tag_kind = "person"
+    private_fields = (
+        "password",
+        "email",
+        "phone",
+        "desktop_login",
+        "notifications_slack_userid",
+    )
+
     first_name = db.Column(db.String(80), nullable=False)
     last_name = db.Column(db.String(80), nullable=False)
     email = db.Column(EmailType, unique=True)
@@ -76,6 +85,12 @@ class Person(db.Model, BaseMixin, SerializerMixin):
         del data["email"]
         return data
 
+    @classmethod
+    def prepare_import_data(cls, data):
+        if isinstance(data.get("password", None), str):
+            data["password"] = data["password"].encode()
+        return super(Person, cls).prepare_import_data(data)
+
     @classmethod
     def create_from_import(cls, person):
         del person["type"]
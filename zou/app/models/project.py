@@ -22,6 +22,11 @@ class Project(db.Model, BaseMixin, SerializerMixin):
     Describes a CG production the studio works on.
     """
 
+    cache_tag_kind = "project"
+    import_links = {
+        "team": (ProjectPersonLink.__table__, "project_id", "person_id")
+    }
+
     name = db.Column(db.String(80), nullable=False, unique=True, index=True)
     code = db.Column(db.String(80))
     description = db.Column(db.String(200))
@@ -1,7 +1,140 @@
+import datetime
+import uuid
+
 import sqlalchemy.orm as orm
 
+from sqlalchemy import event
 from sqlalchemy.inspection import inspect
-from zou.app.utils.fields import serialize_value
+from zou.app.utils.fields import (
+    serialize_dict,
+    serialize_list,
+    serialize_orm_arrays,
+    serialize_value,
+)
+
+
+# Conversions of values whose type is known from the column definition. They
+# give the same result as serialize_value for values of exactly that type.
+COLUMN_CONVERTERS = {
+    datetime.datetime: lambda value: value.replace(microsecond=0).isoformat(),
+    datetime.date: lambda value: value.isoformat(),
+    uuid.UUID: str,
+    dict: serialize_dict,
+    list: serialize_list,
+}
+IDENTITY_TYPES = (str, int, bool, float)
+# Types encoded natively by fast JSON encoders (see utils.api).
+NATIVE_TYPES = (uuid.UUID, datetime.datetime, datetime.date)
+
+serializers = {}
+
+
+def get_column_python_type(column_property):
+    try:
+        return column_property.columns[0].type.python_type
+    except (AttributeError, IndexError, NotImplementedError):
+        return None
+
+
+def build_column_converter(column_property, native=False):
+    """
+    Build the function that turns a value of given column into a JSON
+    serializable value. Values of an unexpected type (like ids given as
+    strings to a new instance) are handled by serialize_value. In native mode,
+    UUIDs and dates are left as is.
+    """
+    python_type = get_column_python_type(column_property)
+    if python_type in IDENTITY_TYPES or (
+        native and python_type in NATIVE_TYPES
+    ):
+
+        def convert_identity(value):
+            if value is None or value.__class__ is python_type:
+                return value
+            return serialize_value(value)
+
+        return convert_identity
+
+    convert = COLUMN_CONVERTERS.get(python_type, None)
+    if convert is None:
+        return serialize_value
+
+    def convert_typed(value):
+        if value.__class__ is python_type:
+            return convert(value)
+        elif value is None:
+            return None
+        return serialize_value(value)
+
+    return convert_typed
+
+
+def convert_collection(value):
+    if value.__class__ is orm.collections.InstrumentedList:
+        return serialize_orm_arrays(value)
+    return serialize_value(value)
+
+
+def is_collection(relationship_property):
+    return (
+        relationship_property.uselist
+        and relationship_property.lazy != "dynamic"
+        and relationship_property.collection_class in (None, list)
+    )
+
+
+def build_serializer(model_class, native=False):
+    """
+    Inspect given model class once to list its attributes, in the same order
+    as the instance inspection, with their conversion function. Collections
+    (joins) are serialized only when relations are required. Attributes of
+    unknown kind are checked at runtime.
+    """
+    fields = []
+    fields_with_relations = []
+    mapper = inspect(model_class)
+    for key in orm.attributes.manager_of_class(model_class).keys():
+        attribute = mapper.attrs.get(key, None)
+        if isinstance(attribute, orm.ColumnProperty):
+            convert = build_column_converter(attribute, native)
+            fields.append((key, convert))
+            fields_with_relations.append((key, convert))
+        elif isinstance(attribute, orm.RelationshipProperty):
+            if is_collection(attribute):
+                fields_with_relations.append((key, convert_collection))
+            else:
+                fields.append((key, serialize_value))
+                fields_with_relations.append((key, serialize_value))
+        else:
+            fields.append((key, None))
+            fields_with_relations.append((key, serialize_value))
+    fields = tuple(fields)
+    fields_with_relations = tuple(fields_with_relations)
+
+    def serialize_instance(instance, relations=False):
+        instance_dict = instance.__dict__
+        obj_dict = {}
+        for key, convert in fields_with_relations if relations else fields:
+            if key in instance_dict:
+                value = instance_dict[key]
+            else:
+                value = getattr(instance, key)
+            if convert is not None:
+                obj_dict[key] = convert(value)
+            elif not isinstance(value, orm.collections.InstrumentedList):
+                obj_dict[key] = serialize_value(value)
+        return obj_dict
+
+    return serialize_instance
+
+
+@event.listens_for(orm.Mapper, "after_configured")
+def reset_serializers():
+    """
+    Mapper configuration can add attributes to models (backrefs), so
+    serializers are built again after it.
+    """
+    serializers.clear()
 
 
 class SerializerMixin(object):
@@ -12,24 +145,48 @@ class SerializerMixin(object):
     def is_join(self, attr):
         return isinstance(getattr(self, attr), orm.collections.InstrumentedList)
 
+    @classmethod
+    def get_serializer(cls, native=False):
+        """
+        Return the serializer of the model class. It is built once.
+        """
+        serializer = serializers.get((cls, native), None)
+        if serializer is None:
+            serializer = build_serializer(cls, native)
+            serializers[(cls, native)] = serializer
+        return serializer
+
     def serialize(self, obj_type=None, relations=False):
-        attrs = inspect(self).attrs.keys()
-        if relations:
-            obj_dict = {
-                attr: serialize_value(getattr(self, attr)) for attr in attrs
-            }
-        else:
-            obj_dict = {
-                attr: serialize_value(getattr(self, attr))
-                for attr in attrs
-                if not self.is_join(attr)
-            }
+        obj_dict = self.get_serializer()(self, relations)
         obj_dict["type"] = obj_type or type(self).__name__
         return obj_dict
 
     @staticmethod
-    def serialize_list(models, obj_type=None, relations=False):
-        return [
-            model.serialize(obj_type=obj_type, relations=relations)
-            for model in models
-        ]
+    def serialize_list(models, obj_type=None, relations=False, native=False):
+        """
+        Serialize given models. Serializers of models that don't override the
+        serialize method are called directly. With *native*, UUIDs and dates
+        are not converted: use it only for data sent as is to a fast JSON
+        encoder.
+        """
+        result = []
+        model_class = None
+        serializer = None
+        model_type = None
+        for model in models:
+            if model.__class__ is not model_class:
+                model_class = model.__class__
+                model_type = obj_type or model_class.__name__
+                if model_class.serialize is SerializerMixin.serialize:
+                    serializer = model_class.get_serializer(native)
+                else:
+                    serializer = None
+            if serializer is None:
+                result.append(
+                    model.serialize(obj_type=obj_type, relations=relations)
+                )
+            else:
+                obj_dict = serializer(model, relations)
+                obj_dict["type"] = model_type
+                result.append(obj_dict)
+        return result
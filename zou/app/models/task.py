@@ -3,6 +3,7 @@ from sqlalchemy.dialects.postgresql import JSONB
 from zou.app import db
 from zou.app.models.serializer import SerializerMixin
 from zou.app.models.base import BaseMixin
+from zou.app.utils import cache
 
 
 assignees_table = db.Table(
@@ -29,6 +30,9 @@ class Task(db.Model, BaseMixin, SerializerMixin):
     duration, start date and end date.
     """
 
+    cache_tag_kind = "task"
+    import_links = {"assignees": (assignees_table, "task", "person")}
+
     name = db.Column(db.String(80), nullable=False)
     description = db.Column(db.String(200))
 
@@ -69,6 +73,15 @@ class Task(db.Model, BaseMixin, SerializerMixin):
         ),
     )
 
+    def get_cache_tags(self):
+        """
+        A task change affects its entity and the listings of its project.
+        """
+        tags = BaseMixin.get_cache_tags(self)
+        if self.entity_id is not None:
+            tags.append(cache.tag("entity", self.entity_id))
+        return tags + cache.get_project_content_tags(self.project_id)
+
     def assignees_as_string(self):
         return ", ".join([x.full_name() for x in self.assignees])
 
@@ -0,0 +1,35 @@
+from sqlalchemy_utils import UUIDType
+from zou.app import db
+from zou.app.models.serializer import SerializerMixin
+from zou.app.models.base import BaseMixin
+
+
+class TaskStats(db.Model, BaseMixin, SerializerMixin):
+    """
+    Number of tasks and sum of frames by task type and task status for a
+    group of entities of a project. A group is an episode, a sequence or an
+    asset type. Stats are derived from tasks: they are refreshed when tasks
+    change and they can be rebuilt from scratch.
+    """
+
+    group_type = db.Column(db.String(20), nullable=False)
+    group_id = db.Column(UUIDType(binary=False), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    frames = db.Column(db.Integer, nullable=False, default=0)
+
+    project_id = db.Column(
+        UUIDType(binary=False), db.ForeignKey("project.id"), index=True
+    )
+    task_type_id = db.Column(UUIDType(binary=False), nullable=False)
+    task_status_id = db.Column(UUIDType(binary=False), nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "project_id",
+            "group_type",
+            "group_id",
+            "task_type_id",
+            "task_status_id",
+            name="task_stats_uc",
+        ),
+    )
@@ -9,6 +9,8 @@ class TaskStatus(db.Model, BaseMixin, SerializerMixin):
     preview file linked to relate comment.
     """
 
+    cache_tag_kind = "task_status"
+
     name = db.Column(db.String(40), nullable=False)
     short_name = db.Column(
         db.String(10), unique=True, nullable=False, index=True
@@ -10,6 +10,8 @@ class TaskType(db.Model, BaseMixin, SerializerMixin):
     Categorize tasks in domain areas: modeling, animation, etc.
     """
 
+    cache_tag_kind = "task_type"
+
     name = db.Column(db.String(40), nullable=False)
     short_name = db.Column(db.String(20))
     color = db.Column(db.String(7), default="#FFFFFF")
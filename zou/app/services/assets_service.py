@@ -1,6 +1,6 @@
 from sqlalchemy.exc import StatementError
 
-from zou.app.utils import events, fields, cache
+from zou.app.utils import cache, columnar, events, fields
 from zou.app.utils import query as query_utils
 
 from zou.app.models.entity import Entity
@@ -13,6 +13,7 @@ from zou.app.models.task import assignees_table
 from zou.app.services import (
     base_service,
     deletion_service,
+    entities_service,
     projects_service,
     shots_service,
 )
@@ -24,10 +25,88 @@ from zou.app.services.exception import (
 )
 
 
+ASSET_COLUMNS = [
+    "id",
+    "name",
+    "description",
+    "canceled",
+    "data",
+    "asset_type_id",
+    "asset_type_name",
+    "preview_file_id",
+    "episode_id",
+]
+ASSET_ID_COLUMNS = ["id", "asset_type_id", "preview_file_id", "episode_id"]
+
+# Listing fields computed from another entity column.
+ASSET_FIELD_COLUMNS = {
+    "asset_type_id": "entity_type_id",
+    "episode_id": "source_id",
+}
+
+
 def clear_asset_cache(asset_id):
-    cache.cache.delete_memoized(get_asset, asset_id)
-    cache.cache.delete_memoized(get_asset_with_relations, asset_id)
-    cache.cache.delete_memoized(get_full_asset, asset_id)
+    cache.invalidate_tags(cache.tag("entity", asset_id))
+
+
+def get_asset_cache_tags(asset, *args):
+    return [cache.tag("entity", asset["id"])]
+
+
+def get_full_asset_cache_tags(asset, *args):
+    """
+    Return tags for the asset, its asset type and its project.
+    """
+    return [
+        cache.tag("entity", asset["id"]),
+        cache.tag("entity_type", asset["asset_type_id"]),
+        cache.tag("project", asset["project_id"]),
+    ]
+
+
+def get_assets_and_tasks_cache_tags(
+    assets, criterions={}, page=1, selected_fields=None
+):
+    """
+    Listings filtered on a project depend on every change made on the
+    entities and tasks of this project. Listings of a given asset depend only
+    on that asset and its asset type.
+    """
+    if "project_id" in criterions:
+        tags = [cache.tag("project_content", criterions["project_id"])]
+    elif "id" in criterions:
+        tags = [cache.tag("entity", criterions["id"])]
+    else:
+        tags = cache.get_project_content_tags(None)
+
+    asset_type_ids = set(asset["asset_type_id"] for asset in assets)
+    return tags + [
+        cache.tag("entity_type", asset_type_id)
+        for asset_type_id in asset_type_ids
+    ]
+
+
+def get_assets_and_tasks_columnar_cache_tags(listing, criterions={}, page=1):
+    """
+    Same tags as the regular listing, computed from the id columns.
+    """
+    assets = [
+        {"asset_type_id": asset_type_id}
+        for asset_type_id in columnar.get_ids(
+            listing, "entities", "asset_type_id"
+        )
+    ]
+    return get_assets_and_tasks_cache_tags(assets, criterions, page)
+
+
+def get_assets_and_tasks_project_id(
+    criterions={}, page=1, selected_fields=None
+):
+    """
+    Listings filtered on a project are bound to this project: they are
+    dropped at once after bulk operations on it.
+    """
+    return criterions.get("project_id", None)
 
 
 def clear_asset_type_cache():
@@ -113,20 +192,32 @@ def get_full_assets(criterions={}):
     return assets
 
 
-def get_assets_and_tasks(criterions={}, page=1):
+def build_assets_and_tasks_query(criterions={}, selected_fields=None):
     """
-    Get all assets for given criterions with related tasks for each asset.
+    Build the query listing assets with their tasks and assignees. There is
+    one row per asset, task and assignee. When fields are selected, the asset
+    columns they don't require are not read and tasks are joined only if
+    they are selected. The asset type is always read: listings are tagged
+    with it.
     """
-    asset_map = {}
-    task_map = {}
-
+    if selected_fields is not None:
+        selected_fields = list(selected_fields) + ["asset_type_id"]
     query = (
-        Entity.query.filter(build_asset_type_filter())
+        Entity.query.with_entities(
+            entities_service.build_listing_bundle(
+                "asset", selected_fields, ASSET_FIELD_COLUMNS
+            )
+        )
+        .select_from(Entity)
+        .filter(build_asset_type_filter())
         .join(EntityType)
-        .outerjoin(Task)
-        .outerjoin(assignees_table)
-        .add_columns(
-            EntityType.name,
+    )
+    if entities_service.is_tasks_field_required(selected_fields):
+        query = query.outerjoin(Task, Task.entity_id == Entity.id).outerjoin(
+            assignees_table
+        )
+    task_columns = entities_service.build_task_columns(
+        [
             Task.id,
             Task.task_type_id,
             Task.task_status_id,
@@ -140,8 +231,11 @@ def get_assets_and_tasks(criterions={}, page=1):
             Task.due_date,
             Task.last_comment_date,
             assignees_table.columns.person,
-        )
-        .order_by(EntityType.name, Entity.name)
+        ],
+        selected_fields,
+    )
+    query = query.add_columns(EntityType.name, *task_columns).order_by(
+        EntityType.name, Entity.name
     )
 
     if "id" in criterions:
@@ -153,6 +247,23 @@ def get_assets_and_tasks(criterions={}, page=1):
     if "episode_id" in criterions:
         query = query.filter(Entity.source_id == criterions["episode_id"])
 
+    return query
+
+
+@cache.memoize_function(
+    1200,
+    tags=get_assets_and_tasks_cache_tags,
+    project=get_assets_and_tasks_project_id,
+)
+def get_assets_and_tasks(criterions={}, page=1, selected_fields=None):
+    """
+    Get all assets for given criterions with related tasks for each asset.
+    When fields are selected, only the columns they require are read: the
+    values of the other fields are not relevant.
+    """
+    asset_map = {}
+    task_map = {}
+
     for (
         asset,
         entity_type_name,
@@ -169,7 +280,7 @@ def get_assets_and_tasks(criterions={}, page=1):
         task_due_date,
         task_last_comment_date,
         person_id,
-    ) in query.all():
+    ) in build_assets_and_tasks_query(criterions, selected_fields).all():
 
         if asset.source_id is None:
             source_id = ""
@@ -222,6 +333,89 @@ def get_assets_and_tasks(criterions={}, page=1):
     return list(asset_map.values())
 
 
+@cache.memoize_function(
+    1200,
+    tags=get_assets_and_tasks_columnar_cache_tags,
+    project=get_assets_and_tasks_project_id,
+)
+def get_assets_and_tasks_columnar(criterions={}, page=1):
+    """
+    Get the same data as get_assets_and_tasks in the columnar format (see
+    utils.columnar). Columns are filled directly from the query rows.
+    """
+    listing = columnar.new_listing("Asset", ASSET_COLUMNS, ASSET_ID_COLUMNS)
+    intern_id = columnar.build_id_interner(listing)
+    assets = listing["entities"]
+    tasks = listing["tasks"]
+    asset_ids = set()
+    task_indexes = {}
+
+    for (
+        asset,
+        entity_type_name,
+        task_id,
+        task_type_id,
+        task_status_id,
+        task_priority,
+        task_estimation,
+        task_duration,
+        task_retake_count,
+        task_real_start_date,
+        task_end_date,
+        task_start_date,
+        task_due_date,
+        task_last_comment_date,
+        person_id,
+    ) in build_assets_and_tasks_query(criterions).all():
+        if asset.id not in asset_ids:
+            asset_ids.add(asset.id)
+            columnar.append_row(
+                assets,
+                ASSET_COLUMNS,
+                (
+                    intern_id(asset.id),
+                    asset.name,
+                    asset.description,
+                    asset.canceled,
+                    fields.serialize_value(asset.data),
+                    intern_id(asset.entity_type_id),
+                    entity_type_name,
+                    intern_id(asset.preview_file_id),
+                    intern_id(asset.source_id),
+                ),
+            )
+
+        if task_id is not None:
+            if task_id not in task_indexes:
+                task_indexes[task_id] = len(task_indexes)
+                columnar.append_row(
+                    tasks,
+                    columnar.TASK_COLUMNS,
+                    (
+                        intern_id(task_id),
+                        intern_id(asset.id),
+                        intern_id(task_status_id),
+                        intern_id(task_type_id),
+                        task_priority or 0,
+                        task_estimation,
+                        task_duration,
+                        task_retake_count,
+                        fields.serialize_value(task_real_start_date),
+                        fields.serialize_value(task_end_date),
+                        fields.serialize_value(task_start_date),
+                        fields.serialize_value(task_due_date),
+                        fields.serialize_value(task_last_comment_date),
+                        [],
+                    ),
+                )
+
+            if person_id:
+                task_index = task_indexes[task_id]
+                tasks["assignees"][task_index].append(intern_id(person_id))
+
+    return listing
+
+
 @cache.memoize_function(240)
 def get_asset_types(criterions={}):
     """
@@ -249,6 +443,18 @@ def get_asset_types_for_project(project_id):
     return EntityType.serialize_list(result, obj_type="AssetType")
 
 
+def get_asset_type_stats_for_project(project_id):
+    """
+    Retrieve number of tasks by status, task_types and asset types
+    for given project. Numbers are read from stored task stats.
+    """
+    from zou.app.services import stats_service
+
+    return shots_service.build_stats_results(
+        stats_service.get_stats(project_id, "asset_type")
+    )
+
+
 def get_asset_types_for_shot(shot_id):
     """
     Retrieve all asset types related to asset casted in a given shot.
@@ -280,7 +486,7 @@ def get_asset_raw(entity_id):
     return entity
 
 
-@cache.memoize_function(10)
+@cache.memoize_function(10, tags=get_asset_cache_tags)
 def get_asset(entity_id):
     """
     Return a given asset as a dict.
@@ -288,7 +494,7 @@ def get_asset(entity_id):
     return get_asset_raw(entity_id).serialize(obj_type="Asset")
 
 
-@cache.memoize_function(30)
+@cache.memoize_function(30, tags=get_asset_cache_tags)
 def get_asset_with_relations(entity_id):
     """
     Return a given asset as a dict.
@@ -315,7 +521,7 @@ def get_raw_asset_by_shotgun_id(shotgun_id):
     return get_asset_raw(asset["id"])
 
 
-@cache.memoize_function(3)
+@cache.memoize_function(1200, tags=get_full_asset_cache_tags)
 def get_full_asset(asset_id):
     """
     Return asset matching given id with additional information (project name,
@@ -497,9 +703,9 @@ def remove_asset(asset_id, force=False):
         from zou.app.services import tasks_service
 
         tasks = Task.query.filter_by(entity_id=asset_id).all()
-        for task in tasks:
-            deletion_service.remove_task(task.id, force=True)
-            tasks_service.clear_task_cache(str(task.id))
+        task_ids = deletion_service.remove_tasks([task.id for task in tasks])
+        for task_id in task_ids:
+            tasks_service.clear_task_cache(task_id)
         asset.delete()
         clear_asset_cache(str(asset_id))
         events.emit("asset:delete", {"asset_id": asset_id})
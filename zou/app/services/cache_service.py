@@ -0,0 +1,81 @@
+from zou.app.models.entity_type import EntityType
+from zou.app.models.person import Person
+from zou.app.models.project import Project
+from zou.app.models.project_status import ProjectStatus
+from zou.app.models.task_status import TaskStatus
+from zou.app.models.task_type import TaskType
+
+from zou.app.services import (
+    assets_service,
+    custom_actions_service,
+    entities_service,
+    persons_service,
+    projects_service,
+    shots_service,
+    tasks_service,
+)
+
+
+def load_reference_data():
+    """
+    Load all reference entries and open projects with one query per table.
+    Loaded instances are kept in the identity map of the database session
+    while the result is referenced. That way, getters retrieving them by id
+    don't query the database again.
+    """
+    projects = projects_service.open_projects()
+    project_ids = [project["id"] for project in projects]
+    return {
+        "entity_types": EntityType.get_all(),
+        "persons": Person.get_all(),
+        "project_statuses": ProjectStatus.get_all(),
+        "projects": Project.query.filter(Project.id.in_(project_ids)).all(),
+        "task_statuses": TaskStatus.get_all(),
+        "task_types": TaskType.get_all(),
+    }
+
+
+def warm_cache():
+    """
+    Fill the cache with reference data (task types, task statuses, asset
+    types, entity types, persons, custom actions) and open projects. It
+    avoids the cold misses paid by the first requests after a restart or a
+    cache flush. Return the number of warmed entries per kind.
+    """
+    reference_data = load_reference_data()
+
+    tasks_service.get_task_types()
+    tasks_service.get_task_statuses()
+    tasks_service.get_done_status()
+    tasks_service.get_wip_status()
+    tasks_service.get_to_review_status()
+    tasks_service.get_todo_status()
+    for task_type in reference_data["task_types"]:
+        tasks_service.get_task_type(str(task_type.id))
+    for task_status in reference_data["task_statuses"]:
+        tasks_service.get_task_status(str(task_status.id))
+
+    assets_service.get_asset_types()
+    shots_service.get_episode_type()
+    shots_service.get_sequence_type()
+    shots_service.get_shot_type()
+    shots_service.get_scene_type()
+    shots_service.get_camera_type()
+    for entity_type in reference_data["entity_types"]:
+        entities_service.get_entity_type(str(entity_type.id))
+
+    projects_service.get_project_statuses()
+    projects_service.get_open_status()
+    projects_service.get_closed_status()
+    for project in reference_data["projects"]:
+        projects_service.get_project(str(project.id))
+
+    custom_actions_service.get_custom_actions()
+    persons_service.get_persons()
+    persons_service.get_active_persons()
+    for person in reference_data["persons"]:
+        persons_service.get_person(str(person.id))
+
+    return {
+        kind: len(instances) for kind, instances in reference_data.items()
+    }
@@ -1,6 +1,8 @@
+from sqlalchemy import or_, select
 from sqlalchemy.exc import IntegrityError
 
-from zou.app.models.comment import Comment
+from zou.app import config, db
+from zou.app.models.comment import Comment, mentions_table, preview_link_table
 from zou.app.models.desktop_login_log import DesktopLoginLog
 from zou.app.models.entity import Entity, EntityLink, EntityVersion
 from zou.app.models.event import ApiEvent
@@ -8,6 +10,7 @@ from zou.app.models.metadata_descriptor import MetadataDescriptor
 from zou.app.models.login_log import LoginLog
 from zou.app.models.notification import Notification
 from zou.app.models.milestone import Milestone
+from zou.app.models.monthly_time_spent import MonthlyTimeSpent
 from zou.app.models.news import News
 from zou.app.models.output_file import OutputFile
 from zou.app.models.person import Person
@@ -17,14 +20,16 @@ from zou.app.models.project import Project
 from zou.app.models.schedule_item import ScheduleItem
 from zou.app.models.search_filter import SearchFilter
 from zou.app.models.subscription import Subscription
-from zou.app.models.task import Task
+from zou.app.models.task import Task, assignees_table
+from zou.app.models.task_stats import TaskStats
 from zou.app.models.task_status import TaskStatus
 from zou.app.models.time_spent import TimeSpent
 from zou.app.models.working_file import WorkingFile
 
-from zou.app.utils import events
-from zou.app.stores import file_store
+from zou.app.utils import cache, events
+from zou.app.stores import file_store, queue_store
 
+from zou.app.services import projects_service, time_spents_service
 from zou.app.services.exception import (
     CommentNotFoundException,
     ModelWithRelationsDeletionException,
@@ -66,49 +71,138 @@ def remove_task(task_id, force=False):
     related. This will lead to the deletion of all of them.
     """
     task = Task.get(task_id)
+    task_dict = task.serialize()
     if force:
-        working_files = WorkingFile.query.filter_by(task_id=task_id)
-        for working_file in working_files:
-            output_files = OutputFile.query.filter_by(
-                source_file_id=working_file.id
-            )
-            for output_file in output_files:
-                output_file.delete()
-            working_file.delete()
-
-        comments = Comment.query.filter_by(object_id=task_id)
-        for comment in comments:
-            notifications = Notification.query.filter_by(comment_id=comment.id)
-            for notification in notifications:
-                notification.delete()
-            news_list = News.query.filter_by(comment_id=comment.id)
-            for news in news_list:
-                news.delete()
-            comment.delete()
-
-        subscriptions = Subscription.query.filter_by(task_id=task_id)
-        for subscription in subscriptions:
-            subscription.delete()
-
-        preview_files = PreviewFile.query.filter_by(task_id=task_id)
-        for preview_file in preview_files:
-            remove_preview_file(preview_file)
+        preview_files = delete_tasks([task.id])
+        Task.commit()
+        clear_project_content_cache([task_dict["project_id"]])
+        clear_preview_files_later(preview_files)
+    else:
+        task.delete()
+    emit_task_delete_event(task_dict)
+    return task_dict
 
-        time_spents = TimeSpent.query.filter_by(task_id=task_id)
-        for time_spent in time_spents:
-            time_spent.delete()
 
-        notifications = Notification.query.filter_by(task_id=task_id)
-        for notification in notifications:
-            notification.delete()
+def remove_tasks(task_ids):
+    """
+    Remove fully given tasks and all data related to them in a single
+    transaction. Files of their previews are removed afterwards.
+    """
+    tasks = Task.query.filter(Task.id.in_(task_ids)).all()
+    task_dicts = Task.serialize_list(tasks)
+    if len(task_dicts) > 0:
+        preview_files = delete_tasks([task.id for task in tasks])
+        Task.commit()
+        clear_project_content_cache(
+            [task_dict["project_id"] for task_dict in task_dicts]
+        )
+        clear_preview_files_later(preview_files)
+        for task_dict in task_dicts:
+            emit_task_delete_event(task_dict)
+    return [task_dict["id"] for task_dict in task_dicts]
 
-        news_list = News.query.filter_by(task_id=task.id)
-        for news in news_list:
-            news.delete()
 
-    task.delete()
-    events.emit("task:delete", {"task_id": task_id})
-    return task.serialize()
+def clear_project_content_cache(project_ids):
+    """
+    Drop the cached listings of entities and tasks of given projects. Tasks
+    deleted in bulk don't go through the cache hooks of the model.
+    """
+    tags = set()
+    for project_id in project_ids:
+        tags.update(cache.get_project_content_tags(project_id))
+    cache.invalidate_tags(*tags)
+
+
+def emit_task_delete_event(task_dict):
+    events.emit(
+        "task:delete",
+        {
+            "task_id": task_dict["id"],
+            "entity_id": task_dict["entity_id"],
+            "project_id": task_dict["project_id"],
+        },
+    )
+
+
+def delete_tasks(task_ids):
+    """
+    Delete given tasks and all data related to them with one statement per
+    table. Task ids can be a list or a select statement. Changes are not
+    committed. Return the id and the extension of deleted preview files, to
+    remove their files once the deletion is committed.
+    """
+    comment_ids = select([Comment.id]).where(Comment.object_id.in_(task_ids))
+    preview_files = [
+        (str(preview_file_id), extension)
+        for (preview_file_id, extension) in PreviewFile.query.filter(
+            PreviewFile.task_id.in_(task_ids)
+        ).with_entities(PreviewFile.id, PreviewFile.extension)
+    ]
+    preview_file_ids = select([PreviewFile.id]).where(
+        PreviewFile.task_id.in_(task_ids)
+    )
+    working_file_ids = select([WorkingFile.id]).where(
+        WorkingFile.task_id.in_(task_ids)
+    )
+    output_file_ids = select([OutputFile.id]).where(
+        OutputFile.source_file_id.in_(working_file_ids)
+    )
+    time_spent_months = time_spents_service.get_time_spent_months(
+        TimeSpent.task_id.in_(task_ids)
+    )
+
+    # Detach previews and files from entries that are not deleted.
+    for (model, column) in [
+        (Entity, Entity.preview_file_id),
+        (News, News.preview_file_id),
+        (Comment, Comment.preview_file_id),
+    ]:
+        model.query.filter(column.in_(preview_file_ids)).update(
+            {column: None}, synchronize_session=False
+        )
+    PreviewFile.query.filter(
+        PreviewFile.source_file_id.in_(output_file_ids)
+    ).update({PreviewFile.source_file_id: None}, synchronize_session=False)
+
+    db.session.execute(
+        preview_link_table.delete().where(
+            or_(
+                preview_link_table.c.comment.in_(comment_ids),
+                preview_link_table.c.preview_file.in_(preview_file_ids),
+            )
+        )
+    )
+    db.session.execute(
+        mentions_table.delete().where(
+            mentions_table.c.comment.in_(comment_ids)
+        )
+    )
+    for (model, condition) in [
+        (
+            Notification,
+            or_(
+                Notification.task_id.in_(task_ids),
+                Notification.comment_id.in_(comment_ids),
+            ),
+        ),
+        (
+            News,
+            or_(News.task_id.in_(task_ids), News.comment_id.in_(comment_ids)),
+        ),
+        (Comment, Comment.object_id.in_(task_ids)),
+        (Subscription, Subscription.task_id.in_(task_ids)),
+        (TimeSpent, TimeSpent.task_id.in_(task_ids)),
+        (PreviewFile, PreviewFile.task_id.in_(task_ids)),
+        (OutputFile, OutputFile.source_file_id.in_(working_file_ids)),
+        (WorkingFile, WorkingFile.task_id.in_(task_ids)),
+    ]:
+        model.query.filter(condition).delete(synchronize_session=False)
+    db.session.execute(
+        assignees_table.delete().where(assignees_table.c.task.in_(task_ids))
+    )
+    Task.query.filter(Task.id.in_(task_ids)).delete(synchronize_session=False)
+    time_spents_service.refresh_monthly_time_spents(time_spent_months)
+    return preview_files
 
 
 def remove_preview_file_by_id(preview_file_id):
@@ -131,12 +225,7 @@ def remove_preview_file(preview_file):
     if news is not None:
         news.update({"preview_file_id": None})
 
-    if preview_file.extension == "png":
-        clear_picture_files(preview_file.id)
-    elif preview_file.extension == "mp4":
-        clear_movie_files(preview_file.id)
-    else:
-        clear_generic_files(preview_file.id)
+    clear_preview_file_files(preview_file.id, preview_file.extension)
 
     preview_file.comments = []
     preview_file.save()
@@ -144,6 +233,46 @@ def remove_preview_file(preview_file):
     return preview_file.serialize()
 
 
+def clear_preview_file_files(preview_file_id, extension):
+    """
+    Remove all files related to given preview file.
+    """
+    if extension == "png":
+        clear_picture_files(preview_file_id)
+    elif extension == "mp4":
+        clear_movie_files(preview_file_id)
+    else:
+        clear_generic_files(preview_file_id)
+
+
+def clear_preview_files(preview_files):
+    """
+    Remove all files related to given preview files, listed as (id,
+    extension) tuples. This function is aimed at being runned as a job in a
+    job queue.
+    """
+    from zou.app import app
+
+    with app.app_context():
+        for (preview_file_id, extension) in preview_files:
+            clear_preview_file_files(preview_file_id, extension)
+
+
+def clear_preview_files_later(preview_files):
+    """
+    Remove files of given preview files through the job queue if it is
+    activated, right away otherwise.
+    """
+    if len(preview_files) == 0:
+        return
+    elif config.ENABLE_JOB_QUEUE:
+        queue_store.job_queue.enqueue(
+            clear_preview_files, args=(preview_files,)
+        )
+    else:
+        clear_preview_files(preview_files)
+
+
 def clear_picture_files(preview_file_id):
     """
     Remove all files related to given preview file, supposing the original file
@@ -195,52 +324,121 @@ def remove_tasks_for_project_and_task_type(project_id, task_type_id):
     tasks = Task.query.filter_by(
         project_id=project_id, task_type_id=task_type_id
     )
-    task_ids = []
-    for task in tasks:
-        remove_task(task.id, force=True)
-        task_ids.append(str(task.id))
-    return task_ids
+    return remove_tasks([task.id for task in tasks])
+
+
+def remove_project(project_id, progress=None):
+    """
+    Remove given project and all data related to it. Playlists are removed
+    first, then everything else is deleted with one statement per table in a
+    single transaction. If a progress function is given, it is called after
+    each step with the name of the step, the number of steps done and the
+    number of steps.
+    """
+    task_ids = select([Task.id]).where(Task.project_id == project_id)
+    entity_ids = select([Entity.id]).where(Entity.project_id == project_id)
+    preview_files = []
+    steps = [
+        ("playlist", lambda: remove_project_playlists(project_id)),
+        ("task", lambda: preview_files.extend(delete_tasks(task_ids))),
+        (
+            "entity link",
+            lambda: EntityLink.query.filter(
+                or_(
+                    EntityLink.entity_in_id.in_(entity_ids),
+                    EntityLink.entity_out_id.in_(entity_ids),
+                )
+            ).delete(synchronize_session=False),
+        ),
+        (
+            "entity version",
+            lambda: EntityVersion.query.filter(
+                EntityVersion.entity_id.in_(entity_ids)
+            ).delete(synchronize_session=False),
+        ),
+    ]
+    for model in [
+        Entity,
+        MetadataDescriptor,
+        Milestone,
+        ScheduleItem,
+        SearchFilter,
+        TaskStats,
+    ]:
+        steps.append(
+            (
+                model.__tablename__.replace("_", " "),
+                lambda model=model: model.query.filter_by(
+                    project_id=project_id
+                ).delete(synchronize_session=False),
+            )
+        )
+    steps.append(("project", lambda: Project.get(project_id).delete()))
+
+    for (index, (name, step)) in enumerate(steps):
+        step()
+        if progress is not None:
+            progress(name, index + 1, len(steps))
+    clear_preview_files_later(preview_files)
+    cache.invalidate_project(project_id)
+    return project_id
 
 
-def remove_project(project_id):
+def remove_project_playlists(project_id):
     from zou.app.services import playlists_service
 
-    tasks = Task.query.filter_by(project_id=project_id)
-    for task in tasks:
-        remove_task(task.id, force=True)
-
-    query = EntityLink.query.join(
-        Entity, EntityLink.entity_in_id == Entity.id
-    ).filter(Entity.project_id == project_id)
-    for link in query:
-        link.delete_no_commit()
-    EntityLink.commit()
-
-    query = EntityVersion.query.join(
-        Entity, EntityVersion.entity_id == Entity.id
-    ).filter(Entity.project_id == project_id)
-    for version in query:
-        version.delete_no_commit()
-    EntityLink.commit()
-
-    playlists = Playlist.query.filter_by(project_id=project_id)
-    for playlist in playlists:
+    for playlist in Playlist.query.filter_by(project_id=project_id):
         playlists_service.remove_playlist(playlist.id)
 
-    Entity.delete_all_by(project_id=project_id)
-    MetadataDescriptor.delete_all_by(project_id=project_id)
-    Milestone.delete_all_by(project_id=project_id)
-    ScheduleItem.delete_all_by(project_id=project_id)
-    SearchFilter.delete_all_by(project_id=project_id)
-
-    for news in News.query.join(Task).filter_by(project_id=project_id).all():
-        news.delete_no_commit()
-    News.commit()
-    project = Project.get(project_id)
-    project.delete()
+
+def remove_project_job(project_id):
+    """
+    Remove given project. This function is aimed at being runned as a job in
+    a job queue: the progress is stored in the job metadata (see
+    get_remove_project_job).
+    """
+    from rq import get_current_job
+    from zou.app import app
+
+    job = get_current_job()
+
+    def save_progress(step, done, total):
+        app.logger.info(
+            "Project %s deletion: %s entries removed (%s/%s)"
+            % (project_id, step, done, total)
+        )
+        if job is not None:
+            job.meta["progress"] = {"step": step, "done": done, "total": total}
+            job.save_meta()
+
+    with app.app_context():
+        remove_project(project_id, progress=save_progress)
+        projects_service.clear_project_cache(project_id)
     return project_id
 
 
+def get_remove_project_job(job_id):
+    """
+    Return the status and the progress of given project deletion job, None if
+    the job doesn't exist.
+    """
+    from rq.exceptions import NoSuchJobError
+    from rq.job import Job
+
+    try:
+        job = Job.fetch(job_id, connection=queue_store.queue_store)
+    except NoSuchJobError:
+        return None
+    if job.func_name != "%s.remove_project_job" % __name__:
+        return None
+    return {
+        "job_id": job.id,
+        "project_id": job.args[0],
+        "status": job.get_status(),
+        "progress": job.meta.get("progress", None),
+    }
+
+
 def remove_person(person_id, force=True):
     person = Person.get(person_id)
     if force:
@@ -253,6 +451,7 @@ def remove_person(person_id, force=True):
         LoginLog.delete_all_by(person_id=person_id)
         Subscription.delete_all_by(person_id=person_id)
         TimeSpent.delete_all_by(person_id=person_id)
+        MonthlyTimeSpent.delete_all_by(person_id=person_id)
         for project in Project.query.filter(Project.team.contains(person)):
             project.team = [
                 member for member in project.team if str(member.id) != person_id
@@ -1,3 +1,6 @@
+from sqlalchemy import null
+from sqlalchemy.orm import Bundle
+
 from zou.app.services import base_service
 from zou.app.utils import cache, events, fields
 
@@ -14,6 +17,28 @@ from zou.app.services.exception import (
 )
 
 
+# Entity columns read by the listings with tasks.
+LISTING_COLUMNS = [
+    "id",
+    "name",
+    "description",
+    "canceled",
+    "nb_frames",
+    "data",
+    "entity_type_id",
+    "parent_id",
+    "source_id",
+    "preview_file_id",
+]
+
+# Listing fields computed from an entity column.
+LISTING_FIELD_COLUMNS = {
+    "fps": "data",
+    "frame_in": "data",
+    "frame_out": "data",
+}
+
+
 def clear_entity_type_cache(entity_type_id):
     cache.cache.delete_memoized(get_entity_type, entity_type_id)
     cache.cache.delete_memoized(get_entity_type_by_name)
@@ -49,7 +74,9 @@ def get_entity_raw(entity_id):
     return base_service.get_instance(Entity, entity_id, EntityNotFoundException)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(
+    120, tags=lambda entity, *args: [cache.tag("entity", entity["id"])]
+)
 def get_entity(entity_id):
     """
     Return an entity type matching given id, as a dict. Raises an exception if
@@ -115,22 +142,84 @@ def get_entity_links_for_project(project_id):
     return Entity.serialize_list(result)
 
 
-def get_entities_and_tasks(criterions={}):
+def get_listing_columns(
+    selected_fields=None, field_columns=LISTING_FIELD_COLUMNS
+):
+    """
+    Return the names of the entity columns required to build given fields of
+    a listing (all of them when no field is selected). *field_columns* maps the
+    fields computed from a column to that column. The id is always required.
+    """
+    if selected_fields is None:
+        return list(LISTING_COLUMNS)
+    columns = ["id"]
+    for field in selected_fields:
+        column = field_columns.get(field, field)
+        if column in LISTING_COLUMNS and column not in columns:
+            columns.append(column)
+    return columns
+
+
+def build_listing_bundle(
+    name, selected_fields=None, field_columns=LISTING_FIELD_COLUMNS
+):
+    """
+    Return the entity columns of a listing as a bundle. Columns that given
+    fields don't require are replaced by NULL, so they are not read from the
+    database.
+    """
+    required_columns = get_listing_columns(selected_fields, field_columns)
+    columns = []
+    for column_name in LISTING_COLUMNS:
+        if column_name in required_columns:
+            columns.append(getattr(Entity, column_name))
+        else:
+            columns.append(null().label(column_name))
+    return Bundle(name, *columns)
+
+
+def is_tasks_field_required(selected_fields=None):
+    return selected_fields is None or "tasks" in selected_fields
+
+
+def build_task_columns(columns, selected_fields=None):
+    """
+    Return given task columns or, when tasks are not among given fields, as
+    many NULL columns. Then the tasks don't need to be joined.
+    """
+    if is_tasks_field_required(selected_fields):
+        return columns
+    return [
+        null().label("task_column_%s" % index)
+        for index in range(len(columns))
+    ]
+
+
+def get_entities_and_tasks(criterions={}, selected_fields=None):
     """
     Get all entities for given criterions with related tasks for each entity.
+    When fields are given, only the columns they require are read.
     """
     entity_map = {}
     task_map = {}
 
-    query = (
-        Entity.query.outerjoin(Task, Task.entity_id == Entity.id)
-        .outerjoin(assignees_table)
-        .add_columns(
-            Task.id,
-            Task.task_type_id,
-            Task.task_status_id,
-            Task.priority,
-            assignees_table.columns.person,
+    query = Entity.query.with_entities(
+        build_listing_bundle("entity", selected_fields)
+    ).select_from(Entity)
+    if is_tasks_field_required(selected_fields):
+        query = query.outerjoin(Task, Task.entity_id == Entity.id).outerjoin(
+            assignees_table
+        )
+    query = query.add_columns(
+        *build_task_columns(
+            [
+                Task.id,
+                Task.task_type_id,
+                Task.task_status_id,
+                Task.priority,
+                assignees_table.columns.person,
+            ],
+            selected_fields,
         )
     )
 
@@ -152,19 +241,19 @@ def get_entities_and_tasks(criterions={}):
     ) in query.all():
         entity_id = str(entity.id)
 
-        entity.data = entity.data or {}
+        data = entity.data or {}
 
         if entity_id not in entity_map:
             entity_map[entity_id] = {
                 "id": str(entity.id),
                 "name": entity.name,
                 "description": entity.description,
-                "frame_in": entity.data.get("frame_in", None),
-                "frame_out": entity.data.get("frame_out", None),
-                "fps": entity.data.get("fps", None),
+                "frame_in": data.get("frame_in", None),
+                "frame_out": data.get("frame_out", None),
+                "fps": data.get("fps", None),
                 "preview_file_id": str(entity.preview_file_id or ""),
                 "canceled": entity.canceled,
-                "data": fields.serialize_value(entity.data),
+                "data": fields.serialize_value(data),
                 "tasks": [],
             }
 
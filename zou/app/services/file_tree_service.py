@@ -5,6 +5,7 @@ import json
 from slugify import slugify
 
 from zou.app import app
+from zou.app.utils import read_replica
 
 from zou.app.models.entity import Entity
 from zou.app.models.entity_type import EntityType
@@ -30,6 +31,7 @@ from zou.app.services.exception import (
 ALLOWED_FIELDS = ["short_name", "name", "number"]
 
 
+@read_replica.use_read_replica
 def get_working_file_path(
     task,
     mode="working",
@@ -65,6 +67,7 @@ def get_working_file_path(
     return join_path(folder, file_name, sep)
 
 
+@read_replica.use_read_replica
 def get_output_file_path(
     entity,
     mode="output",
@@ -179,6 +182,7 @@ def get_instance_file_name(
     return u"%s" % file_name
 
 
+@read_replica.use_read_replica
 def get_working_folder_path(
     task,
     mode="working",
@@ -209,6 +213,7 @@ def get_working_folder_path(
     return join_path(root_path, folder_path, "")
 
 
+@read_replica.use_read_replica
 def get_output_folder_path(
     entity,
     mode="output",
@@ -242,6 +247,7 @@ def get_output_folder_path(
     return join_path(root_path, folder_path, "")
 
 
+@read_replica.use_read_replica
 def get_instance_folder_path(
     asset_instance,
     temporal_entity,
@@ -684,6 +690,7 @@ class PathTokens(object):
     TASK = "Task"
 
 
+@read_replica.use_read_replica
 def get_shot_task_from_path(file_path, project, mode="working", sep="/"):
     template_elements = get_shot_template_folders(project, mode, sep)
     elements = get_path_folders(project, file_path, mode, sep)
@@ -712,6 +719,7 @@ def get_shot_task_from_path(file_path, project, mode="working", sep="/"):
     return task.serialize()
 
 
+@read_replica.use_read_replica
 def get_asset_task_from_path(file_path, project, mode="working", sep="/"):
     template_elements = get_asset_template_folders(project, mode, sep)
     elements = get_path_folders(project, file_path, mode, sep)
@@ -588,7 +588,7 @@ def get_preview_file_raw(preview_file_id):
     return preview_file
 
 
-@cache.memoize_function(240)
+@cache.memoize_function(240, request_scope=True)
 def get_preview_file(preview_file_id):
     """
     Get preview file as dict.
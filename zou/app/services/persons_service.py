@@ -27,7 +27,7 @@ def clear_person_cache():
     cache.cache.delete_memoized(get_persons)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, single_flight=True, early_refresh=1)
 def get_persons():
     """
     Return all person stored in database.
@@ -66,7 +66,11 @@ def get_person_raw(person_id):
     return person
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(
+    120,
+    tags=lambda person, *args: [cache.tag("person", person["id"])],
+    request_scope=True,
+)
 def get_person(person_id):
     """
     Return given person as a dictionary.
@@ -103,7 +107,7 @@ def get_person_by_email_raw(email):
     return person
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, request_scope=True)
 def get_person_by_email(email):
     """
     Return person that matches given email as a dictionary.
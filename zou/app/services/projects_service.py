@@ -19,13 +19,16 @@ from sqlalchemy.orm.exc import ObjectDeletedError
 
 
 def clear_project_cache(project_id):
-    cache.cache.delete_memoized(get_project, project_id)
-    cache.cache.delete_memoized(get_project_with_relations, project_id)
+    cache.invalidate_tags(cache.tag("project", project_id))
     cache.cache.delete_memoized(get_project_by_name)
     cache.cache.delete_memoized(open_projects)
 
 
-@cache.memoize_function(120)
+def get_project_cache_tags(project, *args):
+    return [cache.tag("project", project["id"])]
+
+
+@cache.memoize_function(120, single_flight=True, early_refresh=1)
 def open_projects(name=None):
     """
     Return all open projects. Allow to filter projects by name.
@@ -182,7 +185,9 @@ def get_project_raw(project_id):
     return project
 
 
-@cache.memoize_function(240)
+@cache.memoize_function(
+    240, tags=get_project_cache_tags, request_scope=True
+)
 def get_project(project_id):
     """
     Get project matching given id, as a dict. Raises an exception if project is
@@ -191,7 +196,9 @@ def get_project(project_id):
     return get_project_raw(project_id).serialize()
 
 
-@cache.memoize_function(240)
+@cache.memoize_function(
+    240, tags=get_project_cache_tags, request_scope=True
+)
 def get_project_with_relations(project_id):
     """
     Get project matching given id, as a dict. Raises an exception if project is
@@ -225,6 +232,16 @@ def update_project(project_id, data):
     return project.serialize()
 
 
+def get_project_ids_for_team_member(person_id):
+    """
+    Return ids of projects of which given person is part of the team.
+    """
+    query = Project.query.filter(
+        Project.team.any(Person.id == person_id)
+    ).with_entities(Project.id)
+    return [str(project_id) for (project_id,) in query.all()]
+
+
 def add_team_member(project_id, person_id):
     """
     Add a a person listed in database to the the project team.
@@ -1,10 +1,15 @@
 import re
 
-from sqlalchemy import func
 from sqlalchemy.orm import aliased
 from sqlalchemy.exc import IntegrityError, StatementError
 
-from zou.app.utils import events, fields, cache, query as query_utils
+from zou.app.utils import (
+    cache,
+    columnar,
+    events,
+    fields,
+    query as query_utils,
+)
 
 from zou.app.models.entity import Entity, EntityVersion
 from zou.app.models.playlist import Playlist
@@ -13,7 +18,6 @@ from zou.app.models.schedule_item import ScheduleItem
 from zou.app.models.subscription import Subscription
 from zou.app.models.task import Task
 from zou.app.models.task import assignees_table
-from zou.app.models.task_status import TaskStatus
 
 from zou.app.services import (
     deletion_service,
@@ -30,10 +34,106 @@ from zou.app.services.exception import (
 )
 
 
+SHOT_COLUMNS = [
+    "id",
+    "name",
+    "description",
+    "canceled",
+    "nb_frames",
+    "fps",
+    "frame_in",
+    "frame_out",
+    "data",
+    "entity_type_id",
+    "parent_id",
+    "source_id",
+    "preview_file_id",
+    "project_id",
+    "project_name",
+    "episode_id",
+    "episode_name",
+    "sequence_id",
+    "sequence_name",
+]
+SHOT_ID_COLUMNS = [
+    "id",
+    "entity_type_id",
+    "parent_id",
+    "source_id",
+    "preview_file_id",
+    "project_id",
+    "episode_id",
+    "sequence_id",
+]
+
+
 def clear_shot_cache(shot_id):
-    cache.cache.delete_memoized(get_shot, shot_id)
-    cache.cache.delete_memoized(get_shot_with_relations, shot_id)
-    cache.cache.delete_memoized(get_full_shot, shot_id)
+    cache.invalidate_tags(cache.tag("entity", shot_id))
+
+
+def get_shot_cache_tags(shot, *args):
+    return [cache.tag("entity", shot["id"])]
+
+
+def get_full_shot_cache_tags(shot, *args):
+    """
+    Return tags for the shot, its parents and its project.
+    """
+    tags = [
+        cache.tag("entity", shot["id"]),
+        cache.tag("entity", shot["sequence_id"]),
+        cache.tag("project", shot["project_id"]),
+    ]
+    if shot["episode_id"] != "None":
+        tags.append(cache.tag("entity", shot["episode_id"]))
+    return tags
+
+
+def get_shots_and_tasks_cache_tags(shots, criterions={}, selected_fields=None):
+    """
+    Listings filtered on a project depend on every change made on the
+    entities and tasks of this project. Listings of a given shot depend only
+    on that shot and its parents.
+    """
+    if "project_id" in criterions:
+        project_id = criterions["project_id"]
+        return [
+            cache.tag("project_content", project_id),
+            cache.tag("project", project_id),
+        ]
+    elif "id" in criterions:
+        tags = [cache.tag("entity", criterions["id"])]
+        for shot in shots:
+            tags += get_full_shot_cache_tags(shot)
+        return tags
+    else:
+        project_ids = set(shot["project_id"] for shot in shots)
+        return cache.get_project_content_tags(None) + [
+            cache.tag("project", project_id) for project_id in project_ids
+        ]
+
+
+def get_shots_and_tasks_columnar_cache_tags(listing, criterions={}):
+    """
+    Same tags as the regular listing, computed from the id columns.
+    """
+    columns = ["id", "sequence_id", "episode_id", "project_id"]
+    id_columns = [
+        columnar.get_ids(listing, "entities", column) for column in columns
+    ]
+    shots = [
+        dict(zip(columns, [str(shot_id) for shot_id in shot_ids]))
+        for shot_ids in zip(*id_columns)
+    ]
+    return get_shots_and_tasks_cache_tags(shots, criterions)
+
+
+def get_shots_and_tasks_project_id(criterions={}, selected_fields=None):
+    """
+    Listings filtered on a project are bound to this project: they are
+    dropped at once after bulk operations on it.
+    """
+    return criterions.get("project_id", None)
 
 
 def get_temporal_entity_type_by_name(name):
@@ -174,28 +274,32 @@ def get_episode_map(criterions={}):
     return episode_map
 
 
-def get_shots_and_tasks(criterions={}):
+def build_shots_and_tasks_query(criterions={}, selected_fields=None):
     """
-    Get all shots for given criterions with related tasks for each shot.
+    Build the query listing shots with their tasks and assignees. There is
+    one row per shot, task and assignee. When fields are selected, the shot
+    columns they don't require are not read and tasks are joined only if
+    they are selected.
     """
     shot_type = get_shot_type()
-    shot_map = {}
-    task_map = {}
-
     Sequence = aliased(Entity, name="sequence")
     Episode = aliased(Entity, name="episode")
 
     query = (
-        Entity.query.join(Project)
+        Entity.query.with_entities(
+            entities_service.build_listing_bundle("shot", selected_fields)
+        )
+        .select_from(Entity)
+        .join(Project)
         .join(Sequence, Sequence.id == Entity.parent_id)
         .outerjoin(Episode, Episode.id == Sequence.parent_id)
-        .outerjoin(Task, Task.entity_id == Entity.id)
-        .outerjoin(assignees_table)
-        .add_columns(
-            Episode.name,
-            Episode.id,
-            Sequence.name,
-            Sequence.id,
+    )
+    if entities_service.is_tasks_field_required(selected_fields):
+        query = query.outerjoin(Task, Task.entity_id == Entity.id).outerjoin(
+            assignees_table
+        )
+    task_columns = entities_service.build_task_columns(
+        [
             Task.id,
             Task.task_type_id,
             Task.task_status_id,
@@ -209,11 +313,13 @@ def get_shots_and_tasks(criterions={}):
             Task.due_date,
             Task.last_comment_date,
             assignees_table.columns.person,
-            Project.id,
-            Project.name,
-        )
-        .filter(Entity.entity_type_id == shot_type["id"])
+        ],
+        selected_fields,
     )
+    query = query.add_columns(
+        Episode.name, Episode.id, Sequence.name, Sequence.id, *task_columns
+    ).add_columns(Project.id, Project.name)
+    query = query.filter(Entity.entity_type_id == shot_type["id"])
     if "id" in criterions:
         query = query.filter(Entity.id == criterions["id"])
 
@@ -223,6 +329,23 @@ def get_shots_and_tasks(criterions={}):
     if "episode_id" in criterions:
         query = query.filter(Sequence.parent_id == criterions["episode_id"])
 
+    return query
+
+
+@cache.memoize_function(
+    1200,
+    tags=get_shots_and_tasks_cache_tags,
+    project=get_shots_and_tasks_project_id,
+)
+def get_shots_and_tasks(criterions={}, selected_fields=None):
+    """
+    Get all shots for given criterions with related tasks for each shot.
+    When fields are selected, only the columns they require are read: the
+    values of the other fields are not relevant.
+    """
+    shot_map = {}
+    task_map = {}
+
     for (
         shot,
         episode_name,
@@ -244,23 +367,23 @@ def get_shots_and_tasks(criterions={}):
         person_id,
         project_id,
         project_name,
-    ) in query.all():
+    ) in build_shots_and_tasks_query(criterions, selected_fields).all():
         shot_id = str(shot.id)
 
-        shot.data = shot.data or {}
+        data = shot.data or {}
 
         if shot_id not in shot_map:
 
             shot_map[shot_id] = {
                 "canceled": shot.canceled,
-                "data": fields.serialize_value(shot.data),
+                "data": fields.serialize_value(data),
                 "description": shot.description,
                 "entity_type_id": str(shot.entity_type_id),
                 "episode_id": str(episode_id),
                 "episode_name": episode_name or "",
-                "fps": shot.data.get("fps", None),
-                "frame_in": shot.data.get("frame_in", None),
-                "frame_out": shot.data.get("frame_out", None),
+                "fps": data.get("fps", None),
+                "frame_in": data.get("frame_in", None),
+                "frame_out": data.get("frame_out", None),
                 "id": str(shot.id),
                 "name": shot.name,
                 "nb_frames": shot.nb_frames,
@@ -307,6 +430,105 @@ def get_shots_and_tasks(criterions={}):
     return list(shot_map.values())
 
 
+@cache.memoize_function(
+    1200,
+    tags=get_shots_and_tasks_columnar_cache_tags,
+    project=get_shots_and_tasks_project_id,
+)
+def get_shots_and_tasks_columnar(criterions={}):
+    """
+    Get the same data as get_shots_and_tasks in the columnar format (see
+    utils.columnar). Columns are filled directly from the query rows.
+    """
+    listing = columnar.new_listing("Shot", SHOT_COLUMNS, SHOT_ID_COLUMNS)
+    intern_id = columnar.build_id_interner(listing)
+    shots = listing["entities"]
+    tasks = listing["tasks"]
+    shot_ids = set()
+    task_indexes = {}
+
+    for (
+        shot,
+        episode_name,
+        episode_id,
+        sequence_name,
+        sequence_id,
+        task_id,
+        task_type_id,
+        task_status_id,
+        task_priority,
+        task_estimation,
+        task_duration,
+        task_retake_count,
+        task_real_start_date,
+        task_end_date,
+        task_start_date,
+        task_due_date,
+        task_last_comment_date,
+        person_id,
+        project_id,
+        project_name,
+    ) in build_shots_and_tasks_query(criterions).all():
+        if shot.id not in shot_ids:
+            shot_ids.add(shot.id)
+            data = shot.data or {}
+            columnar.append_row(
+                shots,
+                SHOT_COLUMNS,
+                (
+                    intern_id(shot.id),
+                    shot.name,
+                    shot.description,
+                    shot.canceled,
+                    shot.nb_frames,
+                    data.get("fps", None),
+                    data.get("frame_in", None),
+                    data.get("frame_out", None),
+                    fields.serialize_value(data),
+                    intern_id(shot.entity_type_id),
+                    intern_id(shot.parent_id),
+                    intern_id(shot.source_id),
+                    intern_id(shot.preview_file_id),
+                    intern_id(project_id),
+                    project_name,
+                    intern_id(episode_id),
+                    episode_name or "",
+                    intern_id(sequence_id),
+                    sequence_name,
+                ),
+            )
+
+        if task_id is not None:
+            if task_id not in task_indexes:
+                task_indexes[task_id] = len(task_indexes)
+                columnar.append_row(
+                    tasks,
+                    columnar.TASK_COLUMNS,
+                    (
+                        intern_id(task_id),
+                        intern_id(shot.id),
+                        intern_id(task_status_id),
+                        intern_id(task_type_id),
+                        task_priority or 0,
+                        task_estimation,
+                        task_duration,
+                        task_retake_count,
+                        fields.serialize_value(task_real_start_date),
+                        fields.serialize_value(task_end_date),
+                        fields.serialize_value(task_start_date),
+                        fields.serialize_value(task_due_date),
+                        fields.serialize_value(task_last_comment_date),
+                        [],
+                    ),
+                )
+
+            if person_id:
+                task_index = task_indexes[task_id]
+                tasks["assignees"][task_index].append(intern_id(person_id))
+
+    return listing
+
+
 def get_shot_raw(shot_id):
     """
     Return given shot as an active record.
@@ -323,7 +545,7 @@ def get_shot_raw(shot_id):
     return shot
 
 
-@cache.memoize_function(30)
+@cache.memoize_function(30, tags=get_shot_cache_tags)
 def get_shot(shot_id):
     """
     Return given shot as a dictionary.
@@ -331,7 +553,7 @@ def get_shot(shot_id):
     return get_shot_raw(shot_id).serialize(obj_type="Shot")
 
 
-@cache.memoize_function(30)
+@cache.memoize_function(30, tags=get_shot_cache_tags)
 def get_shot_with_relations(shot_id):
     """
     Return given shot as a dictionary.
@@ -339,7 +561,7 @@ def get_shot_with_relations(shot_id):
     return get_shot_raw(shot_id).serialize(obj_type="Shot", relations=True)
 
 
-@cache.memoize_function(3)
+@cache.memoize_function(1200, tags=get_full_shot_cache_tags)
 def get_full_shot(shot_id):
     """
     Return given shot as a dictionary with extra data like project and
@@ -707,9 +929,9 @@ def remove_shot(shot_id, force=False):
         from zou.app.services import tasks_service
 
         tasks = Task.query.filter_by(entity_id=shot_id).all()
-        for task in tasks:
-            deletion_service.remove_task(task.id, force=True)
-            tasks_service.clear_task_cache(str(task.id))
+        task_ids = deletion_service.remove_tasks([task.id for task in tasks])
+        for task_id in task_ids:
+            tasks_service.clear_task_cache(task_id)
 
         EntityVersion.delete_all_by(entity_id=shot_id)
         Subscription.delete_all_by(entity_id=shot_id)
@@ -892,39 +1114,33 @@ def update_shot(shot_id, data_dict):
 def get_episode_stats_for_project(project_id):
     """
     Retrieve number of tasks by status, task_types and episodes
-    for given project.
+    for given project. Numbers are read from stored task stats.
     """
-    Sequence = aliased(Entity, name="sequence")
-    Episode = aliased(Entity, name="episode")
-    query = (
-        Task.query.with_entities(
-            Task.project_id,
-            Episode.id,
-            Task.task_type_id,
-            Task.task_status_id,
-            TaskStatus.short_name,
-            TaskStatus.color,
-        )
-        .filter(Task.project_id == project_id)
-        .join(Project, Project.id == Task.project_id)
-        .join(TaskStatus, TaskStatus.id == Task.task_status_id)
-        .join(Entity, Entity.id == Task.entity_id)
-        .join(Sequence, Sequence.id == Entity.parent_id)
-        .join(Episode, Episode.id == Sequence.parent_id)
-        .group_by(
-            Task.project_id,
-            Episode.id,
-            Task.task_type_id,
-            Task.task_status_id,
-            TaskStatus.short_name,
-            TaskStatus.color,
-        )
-        .add_columns(func.count(Task.id))
-        .add_columns(func.sum(Entity.nb_frames))
+    from zou.app.services import stats_service
+
+    return build_stats_results(
+        stats_service.get_stats(project_id, "episode")
     )
 
+
+def get_sequence_stats_for_project(project_id):
+    """
+    Retrieve number of tasks by status, task_types and sequences
+    for given project. Numbers are read from stored task stats.
+    """
+    from zou.app.services import stats_service
+
+    return build_stats_results(
+        stats_service.get_stats(project_id, "sequence")
+    )
+
+
+def build_stats_results(stats):
+    """
+    Aggregate stats rows by group, task type and task status.
+    """
     results = {}
-    for data in query.all():
+    for data in stats:
         add_entry_to_stats(results, *data)
         add_entry_to_all_stats(results, *data)
     return results
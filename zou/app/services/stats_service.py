@@ -1,5 +1,31 @@
-from zou.app.models.preview_file import PreviewFile
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+
+from zou.app import db
 from zou.app.models.comment import Comment
+from zou.app.models.entity import Entity
+from zou.app.models.preview_file import PreviewFile
+from zou.app.models.project import Project
+from zou.app.models.task import Task
+from zou.app.models.task_stats import TaskStats
+from zou.app.models.task_status import TaskStatus
+
+from zou.app.services import assets_service, shots_service
+
+
+GROUP_TYPES = ["episode", "sequence", "asset_type"]
+
+# Events after which stats are refreshed (see handle_event).
+EVENTS = [
+    "task:new",
+    "task:update",
+    "task:delete",
+    "task:start",
+    "task:to-review",
+    "shot:update",
+    "asset:update",
+]
 
 
 def get_main_stats():
@@ -13,3 +39,245 @@ def get_main_stats():
         "number_of_comments":
             Comment.query.count()
     }
+
+
+def build_stats_query(project_id, group_type):
+    """
+    Return a query that counts tasks and sums frames of given project by
+    group, task type and task status, with the column of the group id.
+    """
+    Sequence = aliased(Entity, name="sequence")
+    Episode = aliased(Entity, name="episode")
+    if group_type == "episode":
+        group_column = Episode.id
+    elif group_type == "sequence":
+        group_column = Sequence.id
+    else:
+        group_column = Entity.entity_type_id
+
+    query = (
+        Task.query.with_entities(
+            group_column,
+            Task.task_type_id,
+            Task.task_status_id,
+            func.count(Task.id),
+            func.sum(Entity.nb_frames),
+        )
+        .filter(Task.project_id == project_id)
+        .join(Entity, Entity.id == Task.entity_id)
+    )
+    if group_type == "episode":
+        query = query.join(Sequence, Sequence.id == Entity.parent_id).join(
+            Episode, Episode.id == Sequence.parent_id
+        )
+    elif group_type == "sequence":
+        shot_type = shots_service.get_shot_type()
+        query = query.join(Sequence, Sequence.id == Entity.parent_id).filter(
+            Entity.entity_type_id == shot_type["id"]
+        )
+    else:
+        query = query.filter(assets_service.build_asset_type_filter())
+    query = query.group_by(
+        group_column, Task.task_type_id, Task.task_status_id
+    )
+    return (query, group_column)
+
+
+def compute_stats(project_id, group_type, group_ids=None):
+    """
+    Compute stats of given project from its tasks. If group ids are given,
+    only stats of these groups are computed.
+    """
+    (query, group_column) = build_stats_query(project_id, group_type)
+    if group_ids is not None:
+        query = query.filter(group_column.in_(group_ids))
+    return [
+        {
+            "project_id": project_id,
+            "group_type": group_type,
+            "group_id": group_id,
+            "task_type_id": task_type_id,
+            "task_status_id": task_status_id,
+            "count": count,
+            "frames": frames or 0,
+        }
+        for (
+            group_id,
+            task_type_id,
+            task_status_id,
+            count,
+            frames,
+        ) in query.all()
+    ]
+
+
+def replace_stats(project_id, group_type, rows, group_ids=None):
+    """
+    Replace stored stats of given project and group type by given rows. If
+    group ids are given, only stats of these groups are replaced.
+    """
+    query = TaskStats.query.filter_by(
+        project_id=project_id, group_type=group_type
+    )
+    if group_ids is not None:
+        query = query.filter(TaskStats.group_id.in_(group_ids))
+    try:
+        query.delete(synchronize_session=False)
+        if len(rows) > 0:
+            db.session.execute(TaskStats.__table__.insert(), rows)
+        TaskStats.commit()
+    except IntegrityError:
+        # Stats of the same groups were written by a concurrent refresh.
+        db.session.rollback()
+
+
+def is_project_stats_built(project_id):
+    return (
+        TaskStats.query.filter_by(project_id=project_id).first() is not None
+    )
+
+
+def rebuild_project_stats(project_id):
+    """
+    Compute again all stats of given project.
+    """
+    for group_type in GROUP_TYPES:
+        replace_stats(
+            project_id, group_type, compute_stats(project_id, group_type)
+        )
+
+
+def rebuild_stats():
+    """
+    Compute again stats of all projects. Return the number of projects.
+    """
+    project_ids = [project.id for project in Project.query.all()]
+    for project_id in project_ids:
+        rebuild_project_stats(project_id)
+    return len(project_ids)
+
+
+def get_entity_groups(entity):
+    """
+    Return the (group type, group id) tuples of the groups given entity
+    belongs to.
+    """
+    temporal_type_ids = assets_service.get_temporal_type_ids()
+    if str(entity.entity_type_id) not in temporal_type_ids:
+        return [("asset_type", entity.entity_type_id)]
+
+    groups = []
+    if entity.parent_id is not None:
+        shot_type = shots_service.get_shot_type()
+        if str(entity.entity_type_id) == shot_type["id"]:
+            groups.append(("sequence", entity.parent_id))
+        sequence = Entity.get(entity.parent_id)
+        if sequence is not None and sequence.parent_id is not None:
+            groups.append(("episode", sequence.parent_id))
+    return groups
+
+
+def refresh_entity_stats(entity_id):
+    """
+    Compute again the stats of the groups given entity belongs to. Only
+    tasks of these groups are read.
+    """
+    entity = Entity.get(entity_id)
+    if entity is None:
+        return
+    if not is_project_stats_built(entity.project_id):
+        return rebuild_project_stats(entity.project_id)
+
+    for (group_type, group_id) in get_entity_groups(entity):
+        rows = compute_stats(entity.project_id, group_type, [group_id])
+        replace_stats(entity.project_id, group_type, rows, [group_id])
+
+
+def get_event_target(data):
+    """
+    Return what must be refreshed after given event: ("project", project id)
+    or ("entity", entity id). Changes on shots and assets can move their
+    tasks from a group to another (new parent, new asset type, new number of
+    frames), so all stats of their project are computed again.
+    """
+    if "shot_id" in data or "asset_id" in data:
+        project_id = data.get("project_id", None)
+        if project_id is None:
+            entity = Entity.get(data.get("shot_id", data.get("asset_id")))
+            if entity is not None:
+                project_id = entity.project_id
+        if project_id is not None:
+            return ("project", str(project_id))
+        return None
+
+    entity_id = data.get("entity_id", None)
+    if entity_id is None and data.get("task_id", None) is not None:
+        task = Task.get(data["task_id"])
+        if task is not None:
+            entity_id = task.entity_id
+    if entity_id is not None and Entity.get(entity_id) is not None:
+        return ("entity", str(entity_id))
+    elif data.get("project_id", None) is not None:
+        return ("project", str(data["project_id"]))
+    return None
+
+
+def handle_event(data):
+    """
+    Refresh stats after a task change.
+    """
+    handle_events([{"data": data}])
+
+
+def handle_events(events):
+    """
+    Refresh stats after a batch of task changes. Each project and each
+    entity is refreshed once, entities of rebuilt projects are skipped.
+    """
+    targets = []
+    for event in events:
+        target = get_event_target(event["data"])
+        if target is not None and target not in targets:
+            targets.append(target)
+
+    project_ids = set(
+        [target_id for (kind, target_id) in targets if kind == "project"]
+    )
+    for project_id in project_ids:
+        rebuild_project_stats(project_id)
+    for (kind, entity_id) in targets:
+        if kind == "entity":
+            entity = Entity.get(entity_id)
+            if (
+                entity is not None
+                and str(entity.project_id) not in project_ids
+            ):
+                refresh_entity_stats(entity_id)
+
+
+def get_stats(project_id, group_type):
+    """
+    Return stored stats of given project for given group type, with the name
+    and the color of task statuses. Stats of projects never computed are
+    built first.
+    """
+    if not is_project_stats_built(project_id):
+        rebuild_project_stats(project_id)
+    return (
+        TaskStats.query.join(
+            TaskStatus, TaskStatus.id == TaskStats.task_status_id
+        )
+        .filter(TaskStats.project_id == project_id)
+        .filter(TaskStats.group_type == group_type)
+        .with_entities(
+            TaskStats.project_id,
+            TaskStats.group_id,
+            TaskStats.task_type_id,
+            TaskStats.task_status_id,
+            TaskStatus.short_name,
+            TaskStatus.color,
+            TaskStats.count,
+            TaskStats.frames,
+        )
+        .all()
+    )
@@ -31,10 +31,14 @@ from zou.app.models.task_status import TaskStatus
 from zou.app.models.task_type import TaskType
 from zou.app.models.time_spent import TimeSpent
 
-from zou.app.services import deletion_service, tasks_service
+from zou.app.services import (
+    deletion_service,
+    tasks_service,
+    time_spents_service,
+)
 from zou.app.stores import file_store
 from flask_fs.backends.local import LocalBackend
-from zou.app.utils import events
+from zou.app.utils import cache, events
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -247,6 +251,7 @@ def run_project_data_sync(project=None):
             sync_project_entries(project, path, model)
         sync_entity_thumbnails(project, "assets")
         sync_entity_thumbnails(project, "shots")
+        cache.invalidate_project(project["id"])
         logger.info("Sync of %s complete." % project["name"])
 
 
@@ -324,11 +329,49 @@ def sync_event(event):
             event_name = "descriptor"
     instance_id = event["data"]["%s_id" % event_name.replace("-", "_")]
 
+    months = get_time_spent_months(model, [instance_id])
     if action in ["update", "new"]:
         instance = gazu.client.fetch_one(path, instance_id)
         model.create_from_import(instance)
     elif action in ["delete"]:
         model.delete_from_import(instance_id)
+    refresh_time_spent_months(model, [instance_id], months)
+
+
+def get_time_spent_months(model, instance_ids):
+    """
+    Return the months, as (person id, year, month) tuples, of the stored time
+    spents with given ids. Nothing is returned for other models.
+    """
+    if model is not TimeSpent or len(instance_ids) == 0:
+        return []
+    return time_spents_service.get_time_spent_months(
+        TimeSpent.id.in_(instance_ids)
+    )
+
+
+def refresh_time_spent_months(model, instance_ids, months):
+    """
+    Once time spents are synced, compute again the monthly sums of given
+    months (the months of the time spents before the sync) and of the months
+    of the synced time spents.
+    """
+    if model is not TimeSpent:
+        return
+    months = set(months) | set(get_time_spent_months(model, instance_ids))
+    time_spents_service.refresh_monthly_time_spents(list(months))
+    TimeSpent.commit()
+
+
+def import_entries(model, instances):
+    """
+    Import given instances of given model. Monthly sums of time spents are
+    kept up to date.
+    """
+    instance_ids = [instance["id"] for instance in instances]
+    months = get_time_spent_months(model, instance_ids)
+    model.create_from_import_list(instances)
+    refresh_time_spent_months(model, instance_ids, months)
 
 
 def sync_entries(model_name, model, project=None):
@@ -355,16 +398,15 @@ def sync_entries(model_name, model, project=None):
             instances = gazu.client.fetch_all(model_name)
         model.create_from_import_list(instances)
     else:
-        page = 1
-        init = True
-        results = {"nb_pages": 2}
-        while init or results["nb_pages"] >= page:
+        cursor = ""
+        while cursor is not None:
             results = gazu.client.fetch_all(
-                "%s?relations=true&page=%d" % (model_name, page)
+                "%s?relations=true&cursor=%s" % (model_name, cursor)
             )
+            if isinstance(results, list):  # Target doesn't support cursors.
+                results = {"data": results, "next_cursor": None}
             instances += results["data"]
-            page += 1
-            init = False
+            cursor = results["next_cursor"]
             model.create_from_import_list(results["data"])
 
     logger.info("%s %s synced." % (len(instances), model_name))
@@ -391,7 +433,7 @@ def sync_project_entries(project, model_name, model):
         results = gazu.client.fetch_all(path)
         instances += results
         try:
-            model.create_from_import_list(instances)
+            import_entries(model, instances)
         except sqlalchemy.exc.IntegrityError:
             logger.error("An error occured", exc_info=1)
 
@@ -517,8 +559,10 @@ def create_entry(model_name, event_name, model, event_type):
         model_id_field_name = event_name.replace("-", "_") + "_id"
         model_id = data[model_id_field_name]
         try:
+            months = get_time_spent_months(model, [model_id])
             instance = gazu.client.fetch_one(model_name, model_id)
             model.create_from_import(instance)
+            refresh_time_spent_months(model, [model_id], months)
             forward_base_event(event_name, event_type, data)
             if event_type == "new":
                 logger.info("Creation: %s %s" % (event_name, model_id))
@@ -546,7 +590,9 @@ def delete_entry(model_name, event_name, model):
             comment = deletion_service.remove_comment(model_id)
             tasks_service.reset_task_data(comment["object_id"])
         else:
+            months = get_time_spent_months(model, [model_id])
             model.delete_all_by(id=model_id)
+            refresh_time_spent_months(model, [], months)
         forward_base_event(event_name, "delete", data)
         logger.info("Deletion: %s %s" % (model_name, model_id))
 
@@ -41,6 +41,7 @@ from zou.app.services import (
     projects_service,
     shots_service,
     entities_service,
+    time_spents_service,
 )
 
 
@@ -54,9 +55,32 @@ def clear_task_type_cache(task_type_id):
 
 
 def clear_task_cache(task_id):
-    cache.cache.delete_memoized(get_task, task_id)
-    cache.cache.delete_memoized(get_task_with_relations, task_id)
-    cache.cache.delete_memoized(get_full_task, task_id)
+    cache.invalidate_tags(cache.tag("task", task_id))
+
+
+def get_task_cache_tags(task, *args):
+    return [cache.tag("task", task["id"])]
+
+
+def get_full_task_cache_tags(task, *args):
+    """
+    Return tags for all the entries embedded in given full task.
+    """
+    tags = [
+        cache.tag("task", task["id"]),
+        cache.tag("project", task["project_id"]),
+        cache.tag("task_type", task["task_type_id"]),
+        cache.tag("task_status", task["task_status_id"]),
+        cache.tag("entity", task["entity_id"]),
+        cache.tag("entity_type", task["entity"]["entity_type_id"]),
+    ]
+    for key in ["sequence", "episode"]:
+        if key in task:
+            tags.append(cache.tag("entity", task[key]["id"]))
+    for person_id in task["assignees"] + [task["assigner_id"]]:
+        if person_id is not None:
+            tags.append(cache.tag("person", person_id))
+    return tags
 
 
 @cache.memoize_function(120)
@@ -64,7 +88,7 @@ def clear_comment_cache(comment_id):
     cache.cache.delete_memoized(get_comment, comment_id)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, single_flight=True, early_refresh=1)
 def get_task_types():
     return fields.serialize_models(TaskType.get_all())
 
@@ -105,7 +129,7 @@ def get_task_status_raw(task_status_id):
     )
 
 
-@cache.memoize_function(1200)
+@cache.memoize_function(1200, request_scope=True)
 def get_task_status(task_status_id):
     """
     Get task status matching given id  as a dictionary.
@@ -152,7 +176,7 @@ def get_task_type_raw(task_type_id):
     return task_type
 
 
-@cache.memoize_function(1200)
+@cache.memoize_function(1200, request_scope=True)
 def get_task_type(task_type_id):
     """
     Get task type matching given id as a dictionary.
@@ -175,7 +199,7 @@ def get_task_raw(task_id):
     return task
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=get_task_cache_tags, request_scope=True)
 def get_task(task_id):
     """
     Get task matching given id as a dictionary.
@@ -183,7 +207,7 @@ def get_task(task_id):
     return get_task_raw(task_id).serialize()
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, tags=get_task_cache_tags)
 def get_task_with_relations(task_id):
     """
     Get task matching given id as a dictionary.
@@ -749,7 +773,13 @@ def update_task(task_id, data):
 
     task.update(data)
     clear_task_cache(task_id)
-    events.emit("task:update", {"task_id": task_id})
+    events.emit(
+        "task:update",
+        dict(
+            {"task_id": task_id, "project_id": str(task.project_id)},
+            **events.get_changes_data(task.last_changes)
+        ),
+    )
     return task.serialize()
 
 
@@ -855,6 +885,7 @@ def create_or_update_time_spent(task_id, person_id, date, duration, add=False):
             task_id=task_id, person_id=person_id, date=date, duration=duration
         )
         events.emit("time-spent:new", {"time_spent_id": str(time_spent.id)})
+    time_spents_service.update_monthly_time_spent(person_id, date)
 
     task = Task.get(task_id)
     task.duration = 0
@@ -1058,7 +1089,7 @@ def get_tasks_for_project(project_id, page=0):
     return query_utils.get_paginated_results(query, page, relations=True)
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(1200, tags=get_full_task_cache_tags)
 def get_full_task(task_id):
     task = get_task_with_relations(task_id)
     task_type = get_task_type(task["task_type_id"])
@@ -1102,6 +1133,7 @@ def get_full_task(task_id):
 def reset_tasks_data(project_id):
     for task in Task.get_all_by(project_id=project_id):
         reset_task_data(str(task.id))
+    cache.invalidate_project(project_id)
 
 
 def reset_task_data(task_id):
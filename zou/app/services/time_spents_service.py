@@ -3,12 +3,16 @@ import isoweek
 
 from dateutil import relativedelta
 
-from sqlalchemy import func
+from sqlalchemy import extract, func, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import DataError
 from sqlalchemy.orm import aliased
 
+from zou.app import db
+from zou.app.models.monthly_time_spent import MonthlyTimeSpent
 from zou.app.models.project import Project
 from zou.app.models.task import Task
+from zou.app.models.task_type import TaskType
 from zou.app.models.time_spent import TimeSpent
 from zou.app.models.entity import Entity
 from zou.app.models.entity_type import EntityType
@@ -18,94 +22,229 @@ from zou.app.utils import fields
 from zou.app.services.exception import WrongDateFormatException
 
 
-def get_year_table():
+def get_year_table(project_id=None, department_id=None):
     """
-    Return a table giving time spent by user and by month for given year.
+    Return a table giving time spent by user and by year.
     """
-    return get_yearly_table(None, detail_level="year")
+    return get_yearly_table(
+        None,
+        detail_level="year",
+        project_id=project_id,
+        department_id=department_id,
+    )
 
 
-def get_month_table(year):
+def get_month_table(year, project_id=None, department_id=None):
     """
     Return a table giving time spent by user and by month for given year.
     """
-    return get_yearly_table(year)
+    return get_yearly_table(
+        year, project_id=project_id, department_id=department_id
+    )
 
 
-def get_week_table(year):
+def get_week_table(year, project_id=None, department_id=None):
     """
     Return a table giving time spent by user and by week for given year.
     """
-    return get_yearly_table(year, "week")
+    return get_yearly_table(
+        year, "week", project_id=project_id, department_id=department_id
+    )
 
 
-def get_day_table(year, month):
+def get_day_table(year, month, project_id=None, department_id=None):
     """
     Return a table giving time spent by user and by day for given year and
     month.
     """
-    time_spents = get_time_spents_for_month(year, month)
-    return get_table_from_time_spents(time_spents, "day")
+    date = datetime.datetime(int(year), int(month), 1)
+    next_month = date + relativedelta.relativedelta(months=1)
+    query = (
+        build_time_spents_query(project_id, department_id)
+        .filter(TimeSpent.date >= date.strftime("%Y-%m-%d"))
+        .filter(TimeSpent.date < next_month.strftime("%Y-%m-%d"))
+    )
+    return get_table_from_query(
+        query,
+        extract("day", TimeSpent.date),
+        TimeSpent.person_id,
+        TimeSpent.duration,
+    )
 
 
-def get_yearly_table(year=None, detail_level="month"):
+def get_yearly_table(
+    year=None, detail_level="month", project_id=None, department_id=None
+):
     """
     Return a table giving time spent by user and by week or month for given
     year. Week or month detail level can be selected through *detail_level*
-    argument.
+    argument. Sums are computed by the database. Tables by year or by month
+    that are not filtered on a project or a department are read from
+    monthly sums.
     """
-    time_spents = get_time_spents_for_year(year=year)
-    return get_table_from_time_spents(time_spents, detail_level)
+    if (
+        detail_level in ["year", "month"]
+        and project_id is None
+        and department_id is None
+    ):
+        query = MonthlyTimeSpent.query
+        if year is not None:
+            query = query.filter(MonthlyTimeSpent.year == int(year))
+        return get_table_from_query(
+            query,
+            getattr(MonthlyTimeSpent, detail_level),
+            MonthlyTimeSpent.person_id,
+            MonthlyTimeSpent.duration,
+        )
+    else:
+        query = build_time_spents_query(project_id, department_id)
+        if year is not None:
+            query = query.filter(
+                TimeSpent.date.between("%s-01-01" % year, "%s-12-31" % year)
+            )
+        return get_table_from_query(
+            query,
+            extract(detail_level, TimeSpent.date),
+            TimeSpent.person_id,
+            TimeSpent.duration,
+        )
 
 
-def get_time_spents_for_year(year=None):
+def build_time_spents_query(project_id=None, department_id=None):
     """
-    Return all time spents for given year.
+    Return a query on time spents, filtered on given project and department
+    if they are set.
     """
-    if year is None:
-        return TimeSpent.query.all()
-    else:
-        return TimeSpent.query.filter(
-            TimeSpent.date.between("%s-01-01" % year, "%s-12-31" % year)
-        ).all()
+    query = TimeSpent.query
+    if project_id is not None or department_id is not None:
+        query = query.join(Task, Task.id == TimeSpent.task_id)
+    if project_id is not None:
+        query = query.filter(Task.project_id == project_id)
+    if department_id is not None:
+        query = query.join(TaskType, TaskType.id == Task.task_type_id).filter(
+            TaskType.department_id == department_id
+        )
+    return query
 
 
-def get_time_spents_for_month(year, month):
+def get_table_from_query(query, unit, person_id, duration):
     """
-    Return all time spents for given month.
+    Buid a time spent table by summing durations of given query by unit
+    (year, month, week or day number) and by person.
     """
-    date = datetime.datetime(int(year), int(month), 1)
-    next_month = date + relativedelta.relativedelta(months=1)
-    return (
-        TimeSpent.query.filter(TimeSpent.date >= date.strftime("%Y-%m-%d"))
-        .filter(TimeSpent.date < next_month.strftime("%Y-%m-%d"))
+    result = {}
+    entries = (
+        query.with_entities(unit, person_id, func.sum(duration))
+        .group_by(unit, person_id)
         .all()
     )
+    for (unit_value, person_id_value, duration_sum) in entries:
+        unit_key = str(int(unit_value))
+        if unit_key not in result:
+            result[unit_key] = {}
+        result[unit_key][str(person_id_value)] = int(duration_sum)
+    return result
 
 
-def get_table_from_time_spents(time_spents, detail_level="month"):
+def get_time_spent_months(*args):
     """
-    Buid a time spent table based on given time spents and given level
-    of detail (week, day or month).
+    Return the months of time spents matching given query filter (args) as
+    (person id, year, month) tuples.
     """
-    result = {}
-    for time_spent in time_spents:
-        if detail_level is "week":
-            unit = str(time_spent.date.isocalendar()[1])
-        elif detail_level is "day":
-            unit = str(time_spent.date.day)
-        elif detail_level is "year":
-            unit = str(time_spent.date.year)
-        else:
-            unit = str(time_spent.date.month)
-
-        person_id = str(time_spent.person_id)
-        if unit not in result:
-            result[unit] = {}
-        if person_id not in result[unit]:
-            result[unit][person_id] = 0
-        result[unit][person_id] += time_spent.duration
-    return result
+    query = TimeSpent.query.with_entities(
+        TimeSpent.person_id,
+        extract("year", TimeSpent.date),
+        extract("month", TimeSpent.date),
+    ).distinct()
+    for arg in args:
+        query = query.filter(arg)
+    return [
+        (str(person_id), int(year), int(month))
+        for (person_id, year, month) in query.all()
+    ]
+
+
+def refresh_monthly_time_spents(months):
+    """
+    Compute again the monthly sums of time spents for given months, listed
+    as (person id, year, month) tuples. Changes are not committed.
+    """
+    if len(months) == 0:
+        return
+
+    MonthlyTimeSpent.query.filter(
+        tuple_(
+            MonthlyTimeSpent.person_id,
+            MonthlyTimeSpent.year,
+            MonthlyTimeSpent.month,
+        ).in_(months)
+    ).delete(synchronize_session=False)
+
+    person_ids = set([person_id for (person_id, _, _) in months])
+    year = extract("year", TimeSpent.date)
+    month = extract("month", TimeSpent.date)
+    query = (
+        build_monthly_time_spents_query()
+        .filter(TimeSpent.person_id.in_(person_ids))
+        .filter(tuple_(TimeSpent.person_id, year, month).in_(months))
+    )
+    insert_monthly_time_spents(query)
+
+
+def update_monthly_time_spent(person_id, date):
+    """
+    Compute again the sum of time spents of given person for the month of
+    given date (a date or a string) and commit it.
+    """
+    if person_id is None:
+        return
+    if isinstance(date, str):
+        date = fields.get_date_object(date[:10])
+    refresh_monthly_time_spents([(str(person_id), date.year, date.month)])
+    MonthlyTimeSpent.commit()
+
+
+def rebuild_monthly_time_spents():
+    """
+    Compute again all monthly sums of time spents from scratch. Return the
+    number of sums.
+    """
+    MonthlyTimeSpent.query.delete(synchronize_session=False)
+    count = insert_monthly_time_spents(build_monthly_time_spents_query())
+    MonthlyTimeSpent.commit()
+    return count
+
+
+def build_monthly_time_spents_query():
+    year = extract("year", TimeSpent.date)
+    month = extract("month", TimeSpent.date)
+    return TimeSpent.query.with_entities(
+        TimeSpent.person_id, year, month, func.sum(TimeSpent.duration)
+    ).group_by(TimeSpent.person_id, year, month)
+
+
+def insert_monthly_time_spents(query):
+    """
+    Store the monthly sums returned by given query. Sums written meanwhile by
+    a concurrent refresh of the same months are overwritten.
+    """
+    rows = [
+        {
+            "person_id": person_id,
+            "year": int(year),
+            "month": int(month),
+            "duration": int(duration),
+        }
+        for (person_id, year, month, duration) in query.all()
+    ]
+    if len(rows) > 0:
+        statement = insert(MonthlyTimeSpent.__table__)
+        statement = statement.on_conflict_do_update(
+            constraint="monthly_time_spent_uc",
+            set_={"duration": statement.excluded.duration},
+        )
+        db.session.execute(statement, rows)
+    return len(rows)
 
 
 def get_time_spents(person_id, date):
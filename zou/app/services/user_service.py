@@ -1,6 +1,11 @@
 from sqlalchemy.orm import aliased
 
-from zou.app.models.comment import Comment
+from zou.app import db
+from zou.app.models.comment import (
+    Comment,
+    mentions_table,
+    preview_link_table,
+)
 from zou.app.models.entity import Entity
 from zou.app.models.entity_type import EntityType
 from zou.app.models.notification import Notification
@@ -354,7 +359,7 @@ def check_playlist_access(playlist):
     return True
 
 
-@cache.memoize_function(120)
+@cache.memoize_function(120, single_flight=True, early_refresh=1)
 def get_filters():
     """
     Retrieve search filters used by current user. It groups them by
@@ -441,6 +446,38 @@ def get_notification(notification_id):
     return notifications[0]
 
 
+def get_comments_preview_file_ids(comment_ids):
+    """
+    Return a dict where keys are given comment ids and values are the id of
+    the first preview file linked to each comment.
+    """
+    result = {}
+    if len(comment_ids) == 0:
+        return result
+    links = db.session.query(
+        preview_link_table.c.comment, preview_link_table.c.preview_file
+    ).filter(preview_link_table.c.comment.in_(comment_ids))
+    for (comment_id, preview_file_id) in links:
+        result.setdefault(comment_id, preview_file_id)
+    return result
+
+
+def get_comments_mentions(comment_ids):
+    """
+    Return a dict where keys are given comment ids and values are the ids of
+    the persons mentioned in each comment.
+    """
+    result = {}
+    if len(comment_ids) == 0:
+        return result
+    links = db.session.query(
+        mentions_table.c.comment, mentions_table.c.person
+    ).filter(mentions_table.c.comment.in_(comment_ids))
+    for (comment_id, person_id) in links:
+        result.setdefault(comment_id, []).append(person_id)
+    return result
+
+
 def get_last_notifications(notification_id=None):
     """
     Return last 100 user notifications.
@@ -467,6 +504,16 @@ def get_last_notifications(notification_id=None):
         query = query.filter(Notification.id == notification_id)
 
     notifications = query.limit(100).all()
+    full_entity_names = names_service.get_full_entity_names(
+        [row.entity_id for row in notifications]
+    )
+    comment_ids = [
+        row[0].comment_id
+        for row in notifications
+        if row[0].comment_id is not None
+    ]
+    comment_preview_file_ids = get_comments_preview_file_ids(comment_ids)
+    comment_mentions = get_comments_mentions(comment_ids)
 
     for (
         notification,
@@ -478,16 +525,14 @@ def get_last_notifications(notification_id=None):
         comment_text,
         task_entity_id,
     ) in notifications:
-        (full_entity_name, episode_id) = names_service.get_full_entity_name(
-            task_entity_id
-        )
+        (full_entity_name, episode_id) = full_entity_names[
+            str(task_entity_id)
+        ]
         preview_file_id = None
         mentions = []
         if comment_id is not None:
-            comment = Comment.get(comment_id)
-            if len(comment.previews) > 0:
-                preview_file_id = comment.previews[0].id
-            mentions = comment.mentions or []
+            preview_file_id = comment_preview_file_ids.get(comment_id, None)
+            mentions = comment_mentions.get(comment_id, [])
 
         result.append(
             fields.serialize_dict(
@@ -1,4 +1,27 @@
+"""
+Publication of events to the event stream through Redis.
+
+Update events can be coalesced: when EVENT_COALESCE_WINDOW is greater than
+0, `<model>:update` events are kept during that number of seconds and
+repeated events for the same entry are merged. Other events are published
+right away, after the pending update of the entry they are about.
+When EVENT_COALESCE_BATCH_SIZE is greater than 0, pending updates of a model
+for a project are published as a single `<model>:update-batch` event with the
+list of entry ids (`<model>_ids`) once they reach that number.
+Pending updates are published when the process exits. Processes that may
+exit before the end of the window without running exit handlers (like job
+queue workers) flush them explicitly.
+
+When EVENT_STREAM_ROOMS is enabled, events are sent to rooms of the event
+stream: notifications go to the room of their recipient, events related to a
+project go to the room of the project and to the room of administrators.
+Other events are sent to everyone.
+"""
+import atexit
 import redis
+import threading
+
+from collections import OrderedDict
 
 from flask_socketio import SocketIO
 
@@ -11,10 +34,166 @@ redis_url = "redis://%s:%s/%s" % (host, port, redis_db)
 
 socketio = None
 
+ADMINS_ROOM = "admins"
+
+pending_updates = OrderedDict()
+pending_lock = threading.Lock()
+flush_timer = None
+
 
 def publish(event, data):
-    if socketio is not None:
+    if socketio is None:
+        return
+    elif config.EVENT_COALESCE_WINDOW <= 0:
+        send(event, data)
+    elif is_coalesced(event, data):
+        add_pending_update(event, data)
+    else:
+        update = pop_pending_update(event, data)
+        if update is not None:
+            send(*update)
+        send(event, data)
+
+
+def send(event, data):
+    rooms = get_rooms(event, data)
+    if rooms is None:
         socketio.emit(event, data, namespace="/events")
+    else:
+        for room in rooms:
+            socketio.emit(event, data, namespace="/events", room=room)
+
+
+def get_person_room(person_id):
+    return "person:%s" % person_id
+
+
+def get_project_room(project_id):
+    return "project:%s" % project_id
+
+
+def get_rooms(event, data):
+    """
+    Return the rooms given event is sent to, None if it is sent to everyone.
+    """
+    if not config.EVENT_STREAM_ROOMS:
+        return None
+    elif (
+        event.startswith("notification:")
+        and data.get("person_id", None) is not None
+    ):
+        return [get_person_room(data["person_id"])]
+    elif data.get("project_id", None) is not None:
+        return [get_project_room(data["project_id"]), ADMINS_ROOM]
+    else:
+        return None
+
+
+def get_id_field(event):
+    """
+    Return the field that stores the id of the entry given event is about:
+    `task_id` for `task:update`.
+    """
+    model_name = event.split(":")[0]
+    return "%s_id" % model_name.replace("-", "_")
+
+
+def is_coalesced(event, data):
+    return event.endswith(":update") and get_id_field(event) in data
+
+
+def add_pending_update(event, data):
+    """
+    Keep given update event until the end of the window. If an update is
+    already pending for the same entry, data are merged. Changes are merged
+    too, unless one of the updates doesn't describe its changes.
+    """
+    global flush_timer
+
+    key = (event, data[get_id_field(event)])
+    with pending_lock:
+        if key in pending_updates:
+            pending_data = pending_updates[key]
+            merged_data = dict(pending_data, **data)
+            if "changes" in pending_data and "changes" in data:
+                merged_data["changes"] = dict(
+                    pending_data["changes"], **data["changes"]
+                )
+            else:
+                merged_data.pop("changes", None)
+            pending_updates[key] = merged_data
+        else:
+            pending_updates[key] = dict(data)
+        if flush_timer is None:
+            flush_timer = threading.Timer(config.EVENT_COALESCE_WINDOW, flush)
+            flush_timer.daemon = True
+            flush_timer.start()
+        is_full = len(pending_updates) >= config.EVENT_COALESCE_MAX_EVENTS
+    if is_full:
+        flush()
+
+
+def pop_pending_update(event, data):
+    """
+    Return the pending update of the entry given event is about, if any, and
+    remove it from pending updates.
+    """
+    model_name = event.split(":")[0]
+    update_event = "%s:update" % model_name
+    entry_id = data.get(get_id_field(event), None)
+    with pending_lock:
+        data = pending_updates.pop((update_event, entry_id), None)
+    if data is None:
+        return None
+    else:
+        return (update_event, data)
+
+
+def flush():
+    """
+    Publish pending updates.
+    """
+    global pending_updates, flush_timer
+
+    with pending_lock:
+        updates = pending_updates
+        pending_updates = OrderedDict()
+        if flush_timer is not None:
+            flush_timer.cancel()
+            flush_timer = None
+    for (event, data) in coalesce(updates):
+        send(event, data)
+
+
+atexit.register(flush)
+
+
+def coalesce(updates):
+    """
+    Return the events to publish for given pending updates. Updates of a
+    model for a project are grouped in batch events when they are numerous
+    enough, batches contain EVENT_COALESCE_MAX_IDS ids at most.
+    """
+    groups = OrderedDict()
+    for ((event, entry_id), data) in updates.items():
+        key = (event, data.get("project_id", None))
+        groups.setdefault(key, []).append(data)
+
+    events = []
+    batch_size = config.EVENT_COALESCE_BATCH_SIZE
+    max_ids = config.EVENT_COALESCE_MAX_IDS
+    for ((event, project_id), group) in groups.items():
+        if batch_size > 0 and len(group) >= batch_size:
+            id_field = get_id_field(event)
+            ids = [data[id_field] for data in group]
+            for index in range(0, len(ids), max_ids):
+                batch = {"%ss" % id_field: ids[index : index + max_ids]}
+                if project_id is not None:
+                    batch["project_id"] = project_id
+                events.append(("%s-batch" % event, batch))
+        else:
+            events += [(event, data) for data in group]
+    return events
 
 
 def init():
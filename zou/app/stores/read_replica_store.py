@@ -0,0 +1,40 @@
+import sys
+import redis
+
+from zou.app import config
+
+
+try:
+    pins_store = redis.StrictRedis(
+        host=config.KEY_VALUE_STORE["host"],
+        port=config.KEY_VALUE_STORE["port"],
+        db=config.KV_READ_REPLICA_DB_INDEX,
+        decode_responses=True,
+    )
+    pins_store.get("test")
+except redis.ConnectionError:
+    try:
+        import fakeredis
+
+        pins_store = fakeredis.FakeStrictRedis()
+    except:
+        print("Cannot access to the required Redis instance")
+        sys.exit(1)
+
+
+def pin(key, ttl):
+    """
+    Pin given key (a user identity) to the primary database for ttl seconds.
+    """
+    return pins_store.set(key.encode("utf-8"), "true", ex=ttl)
+
+
+def is_pinned(key):
+    """
+    Tell if given key is pinned to the primary database.
+    """
+    return pins_store.get(key.encode("utf-8")) is not None
+
+
+def unpin(key):
+    return pins_store.delete(key.encode("utf-8"))
@@ -1,5 +1,209 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from flask import (
+    Request,
+    Response,
+    current_app,
+    has_request_context,
+    make_response,
+    request,
+    stream_with_context,
+)
 from flask_restful import Api, output_json
 
+from zou.app import config
+from zou.app.utils import fields
+
+
+STREAM_BUFFER_SIZE = 65536
+MSGPACK_MIMETYPE = "application/msgpack"
+
+
+def serialize_unknown_value(value):
+    """
+    Fallback of the fast JSON encoder for types it doesn't support natively.
+    """
+    result = fields.serialize_value(value)
+    if result is value:
+        raise TypeError(
+            "Object of type %s is not JSON serializable" % type(value).__name__
+        )
+    return result
+
+
+def get_orjson_option():
+    return orjson.OPT_NON_STR_KEYS | orjson.OPT_OMIT_MICROSECONDS
+
+
+def output_orjson(data, code, headers=None):
+    """
+    Encode response data with orjson. It is much faster than the standard
+    library on large payloads and it encodes UUIDs and dates natively.
+    Microseconds are omitted, like with fields.serialize_value.
+    """
+    option = get_orjson_option()
+    if current_app.debug:
+        option |= orjson.OPT_INDENT_2
+    dumped = orjson.dumps(data, default=serialize_unknown_value, option=option)
+    response = make_response(dumped + b"\n", code)
+    response.headers.extend(headers or {})
+    return response
+
+
+def output_msgpack(data, code, headers=None):
+    """
+    Encode response data with msgpack. Values are the same as in JSON
+    responses: UUIDs and dates are sent as strings. Extension types would
+    make payloads smaller but encoding and decoding them is much slower.
+    """
+    dumped = msgpack.packb(
+        data, default=serialize_unknown_value, use_bin_type=True
+    )
+    response = make_response(dumped, code)
+    response.headers.extend(headers or {})
+    response.headers["Content-Type"] = MSGPACK_MIMETYPE
+    return response
+
+
+def deserialize_msgpack_value(value):
+    """
+    Turn decoded msgpack values into the values the JSON parser would give:
+    timestamps sent by clients become ISO formatted dates.
+    """
+    if isinstance(value, msgpack.Timestamp):
+        return value.to_datetime().replace(tzinfo=None).isoformat()
+    elif isinstance(value, dict):
+        return {
+            key: deserialize_msgpack_value(item) for key, item in value.items()
+        }
+    elif isinstance(value, list):
+        return [deserialize_msgpack_value(item) for item in value]
+    else:
+        return value
+
+
+def is_msgpack_enabled():
+    return msgpack is not None
+
+
+def is_msgpack_requested():
+    """
+    Return True if msgpack is the preferred format of the current request.
+    """
+    return (
+        is_msgpack_enabled()
+        and has_request_context()
+        and request.accept_mimetypes.best == MSGPACK_MIMETYPE
+    )
+
+
+class ApiRequest(Request):
+    """
+    Request that accepts msgpack bodies along JSON ones. They are decoded
+    into the same data as their JSON equivalent.
+    """
+
+    def get_json(self, force=False, silent=False, cache=True):
+        if self.mimetype != MSGPACK_MIMETYPE or not is_msgpack_enabled():
+            return Request.get_json(
+                self, force=force, silent=silent, cache=cache
+            )
+
+        try:
+            data = msgpack.unpackb(self.get_data(cache=cache), raw=False)
+        except (ValueError, msgpack.UnpackException) as exception:
+            if silent:
+                return None
+            return self.on_json_loading_failed(exception)
+        return deserialize_msgpack_value(data)
+
+
+json_encoders = {"json": output_json}
+if orjson is not None:
+    json_encoders["orjson"] = output_orjson
+
+
+def get_json_representation():
+    """
+    Return the function used to encode JSON responses, set through the
+    JSON_ENCODER configuration. It falls back on the standard library encoder
+    when the configured one is not available.
+    """
+    return json_encoders.get(config.JSON_ENCODER, output_json)
+
+
+def is_native_json_enabled():
+    """
+    Return True if the JSON encoder handles UUIDs and dates natively. In that
+    case, data sent as is in responses doesn't need to convert them.
+    """
+    return (
+        get_json_representation() is not output_json
+        and not is_msgpack_requested()
+    )
+
+
+def get_json_item_encoder():
+    """
+    Return a function that encodes a single item to JSON bytes, with the
+    configured encoder.
+    """
+    if get_json_representation() is output_orjson:
+        option = get_orjson_option()
+        return lambda item: orjson.dumps(
+            item, default=serialize_unknown_value, option=option
+        )
+    else:
+        settings = current_app.config.get("RESTFUL_JSON", {})
+        return lambda item: json.dumps(item, **settings).encode("utf-8")
+
+
+def stream_json_list(items):
+    """
+    Build a response that encodes given items one by one as a JSON array.
+    The array is sent in chunks while items are consumed, so the whole
+    encoded payload is never held in memory. Items can be a generator.
+    """
+    encode = get_json_item_encoder()
+
+    def generate():
+        buffer = [b"["]
+        buffer_size = 1
+        separator = b""
+        for item in items:
+            encoded_item = encode(item)
+            buffer.append(separator)
+            buffer.append(encoded_item)
+            buffer_size += len(encoded_item) + 1
+            separator = b","
+            if buffer_size >= STREAM_BUFFER_SIZE:
+                yield b"".join(buffer)
+                buffer = []
+                buffer_size = 0
+        buffer.append(b"]\n")
+        yield b"".join(buffer)
+
+    return Response(
+        stream_with_context(generate()), mimetype="application/json"
+    )
+
+
+def is_json_streaming_enabled():
+    return (
+        current_app.config.get("JSON_STREAMING", False)
+        and not is_msgpack_requested()
+    )
+
 
 def configure_api_from_blueprint(blueprint, route_tuples):
     """
@@ -12,10 +216,13 @@ def configure_api_from_blueprint(blueprint, route_tuples):
 
     api = Api(blueprint, catch_all_404s=True)
 
+    output = get_json_representation()
     api.representations = {
-        "application/json; charset=utf-8": output_json,
-        "application/json": output_json,
+        "application/json; charset=utf-8": output,
+        "application/json": output,
     }
+    if is_msgpack_enabled():
+        api.representations[MSGPACK_MIMETYPE] = output_msgpack
 
     for route_tuple in route_tuples:
         (path, resource) = route_tuple
@@ -2,15 +2,227 @@
 This module is a wrapper for flask_caching. It configures it and rename
 the memoize function. The aim with that cache is to minimize the requests
 made on the target database.
+
+Optionally, a local LRU cache can be set in front of the shared cache (Redis).
+It avoids a network round trip for each call of very frequently used memoized
+functions. When a memoized function is invalidated, the invalidation is
+broadcasted through Redis pub/sub so every worker drops its local copy.
+
+Memoized results can declare tags: the ids of the entries they depend on
+(ex: "task:<task_id>"). Invalidating a tag drops all results carrying it.
+Each invalidation gives a new version to its tags: a result is not stored
+when one of its tags was invalidated while it was computed.
+
+Frequently used getters can be memoized for the duration of a request too.
+That way, they are not fetched and deserialized again and again while the
+request is processed.
+
+Expensive functions can be memoized in single-flight mode: when a result
+expires, only one worker recomputes it while the others wait for it or get
+the stale value.
+
+Results of functions bound to a project can include the generation of that
+project in their cache key. Bumping the generation invalidates all of them at
+once, without touching the caches of other projects.
+
+Memoized results are always computed from the primary database, never from
+the read replica, so a late replica can't put outdated data in the cache.
+
+Calls, misses, computation time and payload size are counted for each
+memoized function. Counters are aggregated in Redis to cover all workers.
 """
+import inspect
+import json
+import math
+import os
+import pickle
+import random
+import threading
+import time
+import uuid
 import redis
 
+from collections import OrderedDict
 from functools import wraps
-from flask_caching import Cache
+from flask import g, has_app_context, has_request_context
+from flask_caching import Cache, function_namespace
 from zou.app import config
+from zou.app.utils import read_replica
+
+
+INVALIDATION_CHANNEL = "zou:memoize:invalidation"
+TAG_PREFIX = "zou:memoize:tag:"
+TAG_TIMEOUT = 86400
+TAG_VERSION_PREFIX = "zou:memoize:tag-version:"
+INVALIDATION_VERSION_KEY = "zou:memoize:invalidation-version"
+DEFAULT_TIMEOUT = 300
+LOCK_PREFIX = "zou:memoize:lock:"
+STALE_SUFFIX = ":stale"
+GENERATION_PREFIX = "zou:memoize:generation:"
+STATS_KEY = "zou:memoize:stats"
+STATS_PREFIX = "zou:memoize:stats:"
+STATS_FIELDS = ["calls", "misses", "call_time", "compute_time", "payload_size"]
+ENTITY_KINDS = [
+    "asset",
+    "edit",
+    "entity",
+    "episode",
+    "scene",
+    "sequence",
+    "shot",
+]
+
+
+class LocalCache(object):
+    """
+    Bounded in-process LRU store. Entries expire after a given timeout.
+    Values are stored pickled, that way every caller gets its own copy of the
+    cached result and can modify it safely (like with the shared cache).
+    Invalidating all entries of a function is done in O(1) by bumping a
+    version number stored for each function namespace.
+    """
+
+    def __init__(self, max_size=1000, timeout=10):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.versions = {}
+        self.tags = {}
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def build_key(self, namespace, argument_key):
+        return (namespace, self.versions.get(namespace, 0), argument_key)
+
+    def get(self, namespace, argument_key):
+        """
+        Return a (found, value) tuple for given function namespace and
+        arguments.
+        """
+        key = self.build_key(namespace, argument_key)
+        with self.lock:
+            entry = self.entries.get(key, None)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    self.remove_entry(key)
+                self.misses += 1
+                return (False, None)
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return (True, pickle.loads(entry[1]))
+
+    def set(self, namespace, argument_key, value, timeout=None, tags=[]):
+        if timeout is None or timeout <= 0 or timeout > self.timeout:
+            timeout = self.timeout
+        key = self.build_key(namespace, argument_key)
+        entry = (time.time() + timeout, pickle.dumps(value, -1), tags)
+        with self.lock:
+            self.remove_entry(key)
+            self.entries[key] = entry
+            for tag in tags:
+                self.tags.setdefault(tag, set()).add(key)
+            while len(self.entries) > self.max_size:
+                self.remove_entry(next(iter(self.entries)))
+                self.evictions += 1
+
+    def remove_entry(self, key):
+        """
+        Remove entry and its references in the tag index. Lock must be held
+        by the caller.
+        """
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            for tag in entry[2]:
+                keys = self.tags.get(tag, None)
+                if keys is not None:
+                    keys.discard(key)
+                    if len(keys) == 0:
+                        del self.tags[tag]
+
+    def delete(self, namespace, argument_key=None):
+        """
+        Drop entry matching given arguments. If no arguments are given, all
+        entries related to given function namespace are dropped.
+        """
+        with self.lock:
+            self.invalidations += 1
+            if argument_key is None:
+                self.versions[namespace] = self.versions.get(namespace, 0) + 1
+            else:
+                self.remove_entry(self.build_key(namespace, argument_key))
+
+    def delete_tags(self, tags):
+        """
+        Drop all entries carrying one of given tags.
+        """
+        with self.lock:
+            self.invalidations += 1
+            for tag in tags:
+                for key in list(self.tags.get(tag, [])):
+                    self.remove_entry(key)
+
+    def clear(self):
+        with self.lock:
+            self.invalidations += 1
+            self.entries.clear()
+            self.versions.clear()
+            self.tags.clear()
+
+    def get_stats(self):
+        total = self.hits + self.misses
+        return {
+            "enabled": True,
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "timeout": self.timeout,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": float(self.hits) / total if total > 0 else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class ZouCache(Cache):
+    """
+    Flask-Caching object that keeps the local cache tier in sync: deleting
+    memoized results or clearing the cache drops local entries too and
+    notifies other workers.
+    """
+
+    def delete_memoized(self, f, *args, **kwargs):
+        Cache.delete_memoized(self, f, *args, **kwargs)
+        clear_request_cache()
+        make_shared_key = getattr(f, "make_shared_key", None)
+        if make_shared_key is not None and (args or kwargs):
+            cache_key = make_shared_key(args, kwargs)
+            self.delete_many(cache_key, cache_key + STALE_SUFFIX)
+        namespace = getattr(f, "local_namespace", None)
+        if namespace is not None and local_cache is not None:
+            argument_key = None
+            if args or kwargs:
+                argument_key = f.make_local_key(args, kwargs)
+            local_cache.delete(namespace, argument_key)
+            publish_invalidation(namespace, argument_key)
+
+    def clear(self):
+        result = Cache.clear(self)
+        tag_index.clear()
+        clear_request_cache()
+        if local_cache is not None:
+            local_cache.clear()
+            publish_invalidation(None)
+        return result
 
 
 cache = None
+redis_cache = None
 
 try:
     redis_cache = redis.StrictRedis(
@@ -20,7 +232,7 @@ try:
         decode_responses=True,
     )
     redis_cache.get("test")
-    cache = Cache(
+    cache = ZouCache(
         config={
             "CACHE_TYPE": "redis",
             "CACHE_REDIS_HOST": config.KEY_VALUE_STORE["host"],
@@ -32,9 +244,812 @@ try:
 # This is needed to run tests which. This way they do not require a Redis
 # instance to work properly
 except redis.ConnectionError:
-    cache = Cache(config={"CACHE_TYPE": "simple"})
+    redis_cache = None
+    cache = ZouCache(config={"CACHE_TYPE": "simple"})
+
+local_cache = None
+if config.MEMOIZE_LOCAL_CACHE:
+    local_cache = LocalCache(
+        max_size=config.MEMOIZE_LOCAL_CACHE_SIZE,
+        timeout=config.MEMOIZE_LOCAL_CACHE_TIMEOUT,
+    )
+
+tag_index = {}
+tag_versions = {}
+invalidation_version = 0
+function_stats = {}
+stats_lock = threading.Lock()
+stats_flushed_at = time.time()
+worker_id = str(uuid.uuid4())
+subscriber_pid = None
+subscriber_lock = threading.Lock()
+
+
+def publish_invalidation(namespace, argument_key=None, tags=None):
+    """
+    Tell other workers to drop their local copy of the results of given
+    function namespace (or carrying given tags). If namespace and tags are
+    None, the whole local cache is dropped.
+    """
+    if redis_cache is None:
+        return
+    message = {
+        "origin": worker_id,
+        "namespace": namespace,
+        "argument_key": argument_key,
+        "tags": tags,
+    }
+    try:
+        redis_cache.publish(INVALIDATION_CHANNEL, json.dumps(message))
+    except redis.RedisError:
+        pass
+
+
+def handle_invalidation_message(message):
+    """
+    Apply invalidation sent by another worker to the local cache.
+    """
+    try:
+        data = json.loads(message["data"])
+    except (TypeError, ValueError):
+        return
+    if data.get("origin") == worker_id or local_cache is None:
+        return
+    if data.get("tags"):
+        local_cache.delete_tags(data["tags"])
+    elif data.get("namespace") is None:
+        local_cache.clear()
+    else:
+        local_cache.delete(data["namespace"], data.get("argument_key"))
+
+
+def listen_invalidations():
+    """
+    Start the thread that listens to invalidations sent by other workers. It is
+    started lazily and once per process because workers are forked after the
+    module is loaded (threads do not survive forks).
+    """
+    global subscriber_pid, worker_id
+    if redis_cache is None or subscriber_pid == os.getpid():
+        return
+    with subscriber_lock:
+        if subscriber_pid == os.getpid():
+            return
+        if subscriber_pid is not None:
+            worker_id = str(uuid.uuid4())
+            local_cache.clear()
+        subscriber_pid = os.getpid()
+        try:
+            pubsub = redis_cache.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(
+                **{INVALIDATION_CHANNEL: handle_invalidation_message}
+            )
+            pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except redis.RedisError:
+            pass
+
+
+def build_local_key_function(f):
+    """
+    Build a function that turns call arguments into a string key. Positional
+    and keyword arguments are normalized, so `f(1, b=2)` and `f(1, 2)` share
+    the same key (like the shared cache does).
+    """
+    parameters = [
+        parameter
+        for parameter in inspect.signature(f).parameters.values()
+        if parameter.kind == parameter.POSITIONAL_OR_KEYWORD
+    ]
+    nb_parameters = len(parameters)
+
+    def make_local_key(args, kwargs):
+        values = list(args[:nb_parameters])
+        remaining_kwargs = dict(kwargs)
+        for parameter in parameters[len(values):]:
+            if parameter.name in remaining_kwargs:
+                values.append(remaining_kwargs.pop(parameter.name))
+            elif parameter.default is not parameter.empty:
+                values.append(parameter.default)
+            else:
+                values.append(None)
+        values.extend(args[nb_parameters:])
+        return repr((values, sorted(remaining_kwargs.items())))
+
+    return make_local_key
+
+
+def tag(kind, instance_id):
+    """
+    Build the tag describing the dependency to the entry of given kind
+    (table name) and id.
+    """
+    return "%s:%s" % (kind, instance_id)
+
+
+def get_project_content_tags(project_id):
+    """
+    Return the tags of the listings covering the entities and tasks of given
+    project (or all projects).
+    """
+    tags = [tag("project_content", "all")]
+    if project_id is not None:
+        tags.append(tag("project_content", project_id))
+    return tags
+
+
+def get_tags_from_event_data(data):
+    """
+    Build tags from the ids listed in the data of an event. Shots, assets,
+    sequences, etc. are all stored as entities.
+    """
+    tags = []
+    for key, value in data.items():
+        if key.endswith("_id") and isinstance(value, str) and value:
+            kind = key[:-3]
+            if kind in ENTITY_KINDS:
+                kind = "entity"
+            tags.append(tag(kind, value))
+    return tags
+
+
+def register_tags(cache_key, tags):
+    """
+    Store in the tag index that the result stored at given cache key depends
+    on given tags.
+    """
+    if redis_cache is None:
+        for result_tag in tags:
+            tag_index.setdefault(result_tag, set()).add(cache_key)
+    else:
+        try:
+            pipeline = redis_cache.pipeline(transaction=False)
+            for result_tag in tags:
+                pipeline.sadd(TAG_PREFIX + result_tag, cache_key)
+                pipeline.expire(TAG_PREFIX + result_tag, TAG_TIMEOUT)
+            pipeline.execute()
+        except redis.RedisError:
+            pass
+
+
+def get_invalidation_version():
+    """
+    Return the version of the last tag invalidation (None if it can't be
+    read). It is read before computing a result to be able to detect the
+    invalidations that happen meanwhile.
+    """
+    if redis_cache is None:
+        return invalidation_version
+    try:
+        return int(redis_cache.get(INVALIDATION_VERSION_KEY) or 0)
+    except redis.RedisError:
+        return None
+
+
+def is_invalidated_since(tags, version):
+    """
+    Tell whether one of given tags was invalidated after given version.
+    """
+    tags = list(tags)
+    if len(tags) == 0:
+        return False
+    if version is None:
+        return True
+    if redis_cache is None:
+        versions = [tag_versions.get(result_tag, 0) for result_tag in tags]
+    else:
+        try:
+            versions = redis_cache.mget(
+                [TAG_VERSION_PREFIX + result_tag for result_tag in tags]
+            )
+        except redis.RedisError:
+            return True
+    return any(int(tag_version or 0) > version for tag_version in versions)
+
+
+def store_result(cache_key, entries, tags, version):
+    """
+    Store the cache entries (key: (value, timeout)) of a result computed
+    after given invalidation version and register its tags under given cache
+    key. Nothing is stored if one of the tags was invalidated meanwhile.
+    The check is done again once tags are registered: an invalidation may
+    have read the tag index just before.
+    """
+    if is_invalidated_since(tags, version):
+        return False
+    for key, (value, timeout) in entries.items():
+        cache.set(key, value, timeout)
+    register_tags(cache_key, tags)
+    if is_invalidated_since(tags, version):
+        cache.delete_many(*entries.keys())
+        return False
+    return True
+
+
+def invalidate_tags(*tags):
+    """
+    Drop every memoized result carrying one of given tags, in the shared
+    cache and in the local caches of all workers. Tags get a new version
+    first, so results being computed are not stored.
+    """
+    global invalidation_version
+    tags = sorted(set(result_tag for result_tag in tags if result_tag))
+    if len(tags) == 0:
+        return
+    clear_request_cache()
+
+    cache_keys = set()
+    if redis_cache is None:
+        invalidation_version += 1
+        for result_tag in tags:
+            tag_versions[result_tag] = invalidation_version
+            cache_keys.update(tag_index.pop(result_tag, []))
+    else:
+        try:
+            version = redis_cache.incr(INVALIDATION_VERSION_KEY)
+            pipeline = redis_cache.pipeline(transaction=True)
+            for result_tag in tags:
+                pipeline.set(
+                    TAG_VERSION_PREFIX + result_tag, version, ex=TAG_TIMEOUT
+                )
+            for result_tag in tags:
+                pipeline.smembers(TAG_PREFIX + result_tag)
+            pipeline.delete(*[TAG_PREFIX + result_tag for result_tag in tags])
+            for keys in pipeline.execute()[len(tags):-1]:
+                cache_keys.update(keys)
+        except redis.RedisError:
+            pass
+
+    if len(cache_keys) > 0:
+        stale_keys = [cache_key + STALE_SUFFIX for cache_key in cache_keys]
+        cache.delete_many(*(list(cache_keys) + stale_keys))
+
+    if local_cache is not None:
+        local_cache.delete_tags(tags)
+        publish_invalidation(None, tags=tags)
+
+
+def get_project_generation(project_id):
+    """
+    Return the current cache generation of given project. It is created when
+    missing. A random value is used rather than a counter: if the generation
+    expires, results stored with the former one can't be reached anymore.
+    """
+    generation_key = GENERATION_PREFIX + str(project_id)
+    generation = cache.get(generation_key)
+    if generation is None:
+        generation = uuid.uuid4().hex[:12]
+        if not cache.add(generation_key, generation, TAG_TIMEOUT):
+            generation = cache.get(generation_key) or generation
+    return generation
+
+
+def invalidate_project(project_id):
+    """
+    Drop every memoized result bound to given project by changing its
+    generation. It's a single write whatever the number of cached results,
+    so it can be used after bulk operations (imports, deletions, syncs).
+    """
+    if not project_id:
+        return
+    clear_request_cache()
+    cache.set(
+        GENERATION_PREFIX + str(project_id),
+        uuid.uuid4().hex[:12],
+        TAG_TIMEOUT,
+    )
+    if local_cache is not None:
+        tags = [tag("project_generation", project_id)]
+        local_cache.delete_tags(tags)
+        publish_invalidation(None, tags=tags)
+
+
+def get_request_cache():
+    """
+    Return the memo dict attached to the current request (None outside of a
+    request). It is dropped when the request ends.
+    """
+    if not has_request_context():
+        return None
+    request_cache = g.get("memoize_request_cache", None)
+    if request_cache is None:
+        request_cache = g.memoize_request_cache = {}
+    return request_cache
+
+
+def clear_request_cache():
+    """
+    Drop results memoized for the current request. It is called at teardown
+    and each time cached results are invalidated.
+    """
+    if has_app_context():
+        g.pop("memoize_request_cache", None)
+
+
+def record_stats(namespace, **values):
+    """
+    Add given values to the counters of given function namespace. When Redis
+    is available, counters are regularly flushed to it.
+    """
+    with stats_lock:
+        stats = function_stats.get(namespace, None)
+        if stats is None:
+            stats = function_stats[namespace] = dict.fromkeys(STATS_FIELDS, 0)
+        for field, value in values.items():
+            stats[field] += value
+        must_flush = (
+            redis_cache is not None
+            and time.time() - stats_flushed_at
+            > config.MEMOIZE_STATS_FLUSH_INTERVAL
+        )
+    if must_flush:
+        flush_stats()
+
+
+def flush_stats():
+    """
+    Add counters of current process to the ones stored in Redis, then reset
+    them.
+    """
+    global stats_flushed_at
+    if redis_cache is None:
+        return
+    with stats_lock:
+        stats_to_flush = dict(function_stats)
+        function_stats.clear()
+        stats_flushed_at = time.time()
+    if len(stats_to_flush) == 0:
+        return
+    try:
+        pipeline = redis_cache.pipeline(transaction=False)
+        for namespace, stats in stats_to_flush.items():
+            stats_key = STATS_PREFIX + namespace
+            pipeline.sadd(STATS_KEY, namespace)
+            for field, value in stats.items():
+                if value:
+                    pipeline.hincrbyfloat(stats_key, field, value)
+        pipeline.execute()
+    except redis.RedisError:
+        pass
+
+
+def get_payload_size(result):
+    try:
+        return len(pickle.dumps(result, -1))
+    except Exception:
+        return 0
+
+
+def get_function_stats():
+    """
+    Return counters of every memoized function called so far (by all workers
+    when Redis is available), with hit rate and averages.
+    """
+    if redis_cache is None:
+        with stats_lock:
+            raw_stats = {
+                namespace: dict(stats)
+                for namespace, stats in function_stats.items()
+            }
+    else:
+        flush_stats()
+        raw_stats = {}
+        try:
+            namespaces = sorted(redis_cache.smembers(STATS_KEY))
+            pipeline = redis_cache.pipeline(transaction=False)
+            for namespace in namespaces:
+                pipeline.hgetall(STATS_PREFIX + namespace)
+            for namespace, stats in zip(namespaces, pipeline.execute()):
+                raw_stats[namespace] = {
+                    field: float(stats.get(field, 0)) for field in STATS_FIELDS
+                }
+        except redis.RedisError:
+            pass
+
+    result = {}
+    for namespace, stats in raw_stats.items():
+        calls = int(stats["calls"])
+        misses = int(stats["misses"])
+        hits = max(calls - misses, 0)
+        result[namespace] = {
+            "calls": calls,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": float(hits) / calls if calls > 0 else 0.0,
+            "average_call_time": stats["call_time"] / calls if calls else 0.0,
+            "average_compute_time": (
+                stats["compute_time"] / misses if misses else 0.0
+            ),
+            "average_payload_size": (
+                int(stats["payload_size"] / misses) if misses else 0
+            ),
+        }
+    return result
+
+
+def build_computed_function(f, namespace):
+    """
+    Count computations (cache misses) of given function, their duration and
+    the size of their result.
+    """
+
+    @wraps(f)
+    def computed_function(*args, **kwargs):
+        start = time.time()
+        result = f(*args, **kwargs)
+        record_stats(
+            namespace,
+            misses=1,
+            compute_time=time.time() - start,
+            payload_size=get_payload_size(result),
+        )
+        return result
+
+    return computed_function
+
+
+def build_stats_function(f, cached_function, namespace):
+    """
+    Count calls of given memoized function and their duration.
+    """
+
+    @wraps(f)
+    def stats_function(*args, **kwargs):
+        start = time.time()
+        try:
+            return cached_function(*args, **kwargs)
+        finally:
+            record_stats(namespace, calls=1, call_time=time.time() - start)
+
+    return stats_function
+
+
+def build_shared_function(f, timeout, tags):
+    """
+    Memoize given function in the shared cache. Tags of computed results are
+    registered in the tag index. Results are stored only if their tags were
+    not invalidated during the computation.
+    """
+    cached_function = cache.memoize(timeout)(f)
+    if tags is None:
+        return cached_function
+
+    @wraps(f)
+    def tagged_function(*args, **kwargs):
+        try:
+            cache_key = cached_function.make_cache_key(f, *args, **kwargs)
+            result = cache.get(cache_key)
+        except Exception:
+            return f(*args, **kwargs)
+
+        if result is None:
+            version = get_invalidation_version()
+            result = f(*args, **kwargs)
+            if result is not None:
+                store_result(
+                    cache_key,
+                    {cache_key: (result, cached_function.cache_timeout)},
+                    tags(result, *args, **kwargs),
+                    version,
+                )
+        return result
+
+    tagged_function.uncached = f
+    tagged_function.cache_timeout = cached_function.cache_timeout
+    tagged_function.make_cache_key = cached_function.make_cache_key
+    return tagged_function
+
+
+def build_shared_key_function(f, cached_function, project):
+    """
+    Build the function computing the shared cache key of given call
+    arguments. For functions bound to a project, the generation of the project
+    is appended to the key built by Flask-Caching.
+    """
+
+    def make_shared_key(args, kwargs):
+        cache_key = cached_function.make_cache_key(f, *args, **kwargs)
+        if project is not None:
+            project_id = project(*args, **kwargs)
+            if project_id:
+                generation = get_project_generation(project_id)
+                cache_key = "%s:%s" % (cache_key, generation)
+        return cache_key
+
+    return make_shared_key
+
+
+def build_project_tags_function(tags, project):
+    """
+    Add the generation tag of the project to the tags of a result. It is
+    used by the local cache which doesn't rely on shared keys.
+    """
+
+    def project_tags(result, *args, **kwargs):
+        result_tags = []
+        if tags is not None:
+            result_tags = list(tags(result, *args, **kwargs))
+        project_id = project(*args, **kwargs)
+        if project_id:
+            result_tags.append(tag("project_generation", project_id))
+        return result_tags
+
+    return project_tags
+
+
+def build_project_function(f, make_shared_key, timeout, tags):
+    """
+    Memoize given function in the shared cache, under a key including the
+    generation of the project it is bound to.
+    """
+
+    @wraps(f)
+    def project_function(*args, **kwargs):
+        try:
+            cache_key = make_shared_key(args, kwargs)
+            result = cache.get(cache_key)
+        except Exception:
+            return f(*args, **kwargs)
+
+        if result is None:
+            version = None
+            if tags is not None:
+                version = get_invalidation_version()
+            result = f(*args, **kwargs)
+            if result is not None:
+                result_tags = []
+                if tags is not None:
+                    result_tags = tags(result, *args, **kwargs)
+                store_result(
+                    cache_key,
+                    {cache_key: (result, timeout)},
+                    result_tags,
+                    version,
+                )
+        return result
+
+    return project_function
+
+
+def should_refresh_early(expires_at, delta, beta):
+    """
+    Probabilistic early expiration: the closer the expiration date and the
+    longer the computation, the more likely the result is refreshed before it
+    expires. That way, results are recomputed before everybody needs them.
+    """
+    if not beta:
+        return False
+    return time.time() - delta * beta * math.log(random.random()) >= expires_at
+
+
+def build_single_flight_function(f, make_shared_key, timeout, tags, beta):
+    """
+    Memoize given function in the shared cache but make sure that only one
+    worker computes a missing result at a time. Others wait for it. If it
+    takes too long, they get the stale value (or compute it themselves when
+    there is none).
+    Results are stored with their expiration date and their computation time
+    to allow early refreshes.
+    """
+    if timeout is None:
+        timeout = DEFAULT_TIMEOUT
+
+    def compute(cache_key, args, kwargs):
+        version = None
+        if tags is not None:
+            version = get_invalidation_version()
+        start = time.time()
+        result = f(*args, **kwargs)
+        delta = time.time() - start
+        if result is not None:
+            result_tags = []
+            if tags is not None:
+                result_tags = tags(result, *args, **kwargs)
+            entries = {
+                cache_key: ((result, time.time() + timeout, delta), timeout),
+                cache_key + STALE_SUFFIX: (result, timeout * 2),
+            }
+            store_result(cache_key, entries, result_tags, version)
+        return result
+
+    @wraps(f)
+    def single_flight_function(*args, **kwargs):
+        try:
+            cache_key = make_shared_key(args, kwargs)
+            entry = cache.get(cache_key)
+        except Exception:
+            return f(*args, **kwargs)
+
+        if entry is not None:
+            (result, expires_at, delta) = entry
+            if not should_refresh_early(expires_at, delta, beta):
+                return result
+
+        lock_key = LOCK_PREFIX + cache_key
+        if cache.add(lock_key, worker_id, config.MEMOIZE_LOCK_TIMEOUT):
+            try:
+                return compute(cache_key, args, kwargs)
+            finally:
+                cache.delete(lock_key)
+        elif entry is not None:
+            return entry[0]
+
+        waited = 0.0
+        while waited < config.MEMOIZE_LOCK_WAIT:
+            time.sleep(0.05)
+            waited += 0.05
+            entry = cache.get(cache_key)
+            if entry is not None:
+                return entry[0]
+
+        result = cache.get(cache_key + STALE_SUFFIX)
+        if result is None:
+            result = compute(cache_key, args, kwargs)
+        return result
+
+    single_flight_function.single_flight = True
+    return single_flight_function
+
+
+def build_local_function(
+    f, cached_function, namespace, make_local_key, timeout, tags
+):
+    """
+    Put the local cache in front of the shared cache for given function.
+    """
+
+    @wraps(f)
+    def local_function(*args, **kwargs):
+        listen_invalidations()
+        argument_key = make_local_key(args, kwargs)
+        (found, result) = local_cache.get(namespace, argument_key)
+        if not found:
+            version = None
+            if tags is not None:
+                version = get_invalidation_version()
+            result = cached_function(*args, **kwargs)
+            if result is not None:
+                result_tags = []
+                if tags is not None:
+                    result_tags = tags(result, *args, **kwargs)
+                if not is_invalidated_since(result_tags, version):
+                    local_cache.set(
+                        namespace, argument_key, result, timeout, result_tags
+                    )
+                    if is_invalidated_since(result_tags, version):
+                        local_cache.delete(namespace, argument_key)
+        return result
+
+    return local_function
+
+
+def build_request_function(f, cached_function, namespace, make_local_key):
+    """
+    Put a request-scoped identity map in front of the other caches for given
+    function. Results are not copied, so callers must not modify them.
+    """
+
+    @wraps(f)
+    def request_function(*args, **kwargs):
+        request_cache = get_request_cache()
+        if request_cache is None:
+            return cached_function(*args, **kwargs)
+
+        key = (namespace, make_local_key(args, kwargs))
+        if key in request_cache:
+            return request_cache[key]
+        result = cached_function(*args, **kwargs)
+        request_cache[key] = result
+        return result
+
+    return request_function
+
+
+def memoize_function(
+    timeout=None,
+    tags=None,
+    request_scope=False,
+    single_flight=False,
+    early_refresh=0,
+    project=None,
+):
+    """
+    Memoize given function in the shared cache. If the local cache is enabled,
+    results are kept in memory too for a short time.
+
+    *tags* is an optional function that receives the result followed by the
+    call arguments. It returns the tags the result depends on (see `tag`).
+
+    With *request_scope*, results are kept for the whole request and returned
+    as is (without deserialisation): callers must treat them as read-only.
+
+    With *single_flight*, a missing result is computed by a single worker at a
+    time. *early_refresh* is the factor of the probabilistic early refresh (0
+    disables it, 1 is a good default, above 1 favors earlier refreshes).
+
+    *project* is an optional function that receives the call arguments and
+    returns the id of the project the result is bound to (or None). These
+    results are all dropped by `invalidate_project`.
+    """
+
+    def decorator(f):
+        namespace = function_namespace(f)[0]
+        computed_function = read_replica.use_primary(f)
+        if config.MEMOIZE_STATS:
+            computed_function = build_computed_function(
+                computed_function, namespace
+            )
+        cached_function = build_shared_function(
+            computed_function, timeout, tags
+        )
+        if (
+            local_cache is None
+            and not request_scope
+            and not single_flight
+            and project is None
+            and not config.MEMOIZE_STATS
+        ):
+            return cached_function
+
+        make_local_key = build_local_key_function(f)
+        make_shared_key = None
+        decorated_function = cached_function
+        if single_flight or project is not None:
+            make_shared_key = build_shared_key_function(
+                f, cached_function, project
+            )
+        if single_flight:
+            decorated_function = build_single_flight_function(
+                computed_function,
+                make_shared_key,
+                timeout,
+                tags,
+                early_refresh,
+            )
+        elif project is not None:
+            decorated_function = build_project_function(
+                computed_function, make_shared_key, timeout, tags
+            )
+        if local_cache is not None:
+            local_tags = tags
+            if project is not None:
+                local_tags = build_project_tags_function(tags, project)
+            decorated_function = build_local_function(
+                f,
+                decorated_function,
+                namespace,
+                make_local_key,
+                timeout,
+                local_tags,
+            )
+        if request_scope:
+            decorated_function = build_request_function(
+                f, decorated_function, namespace, make_local_key
+            )
+        if config.MEMOIZE_STATS:
+            decorated_function = build_stats_function(
+                f, decorated_function, namespace
+            )
+
+        decorated_function.uncached = f
+        decorated_function.make_cache_key = cached_function.make_cache_key
+        decorated_function.local_namespace = namespace
+        decorated_function.make_local_key = make_local_key
+        decorated_function.make_shared_key = make_shared_key
+        decorated_function.single_flight = single_flight
+        return decorated_function
+
+    return decorator
+
 
-memoize_function = cache.memoize
+def get_local_cache_stats():
+    """
+    Return hit rate and size information about the local cache. It is useful
+    to size it properly.
+    """
+    if local_cache is None:
+        return {"enabled": False}
+    else:
+        return local_cache.get_stats()
 
 
 def invalidate(*args):
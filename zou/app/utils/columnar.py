@@ -0,0 +1,125 @@
+"""
+Compact format for large listings of entities with their tasks. Instead
+of one dict per entry, each listing stores one array per column. Ids are
+stored once in a shared table and the columns listed in "id_columns" hold
+their index in that table.
+"""
+
+FORMAT_NAME = "columnar"
+MIMETYPE = "application/vnd.zou.columnar+json"
+
+TASK_COLUMNS = [
+    "id",
+    "entity_id",
+    "task_status_id",
+    "task_type_id",
+    "priority",
+    "estimation",
+    "duration",
+    "retake_count",
+    "real_start_date",
+    "end_date",
+    "start_date",
+    "due_date",
+    "last_comment_date",
+    "assignees",
+]
+TASK_ID_COLUMNS = [
+    "id",
+    "entity_id",
+    "task_status_id",
+    "task_type_id",
+    "assignees",
+]
+
+
+def new_listing(entity_type, entity_columns, entity_id_columns):
+    """
+    Return an empty listing for entities of given type and their tasks.
+    """
+    return {
+        "format": FORMAT_NAME,
+        "type": entity_type,
+        "ids": [],
+        "id_columns": {
+            "entities": list(entity_id_columns),
+            "tasks": list(TASK_ID_COLUMNS),
+        },
+        "entities": {column: [] for column in entity_columns},
+        "tasks": {column: [] for column in TASK_COLUMNS},
+    }
+
+
+def build_id_interner(listing):
+    """
+    Return a function that gives the index of an id in the id table of
+    given listing. Ids are added to the table when they are met for the
+    first time. None is kept as is.
+    """
+    ids = listing["ids"]
+    indexes = {value: index for index, value in enumerate(ids)}
+
+    def intern_id(value):
+        if value is None:
+            return None
+        value = str(value)
+        index = indexes.get(value, None)
+        if index is None:
+            index = len(ids)
+            indexes[value] = index
+            ids.append(value)
+        return index
+
+    return intern_id
+
+
+def append_row(table, columns, values):
+    """
+    Append given values to the matching columns of given table.
+    """
+    for column, value in zip(columns, values):
+        table[column].append(value)
+
+
+def get_ids(listing, table_name, column):
+    """
+    Return the ids stored in given column, resolved from the id table.
+    """
+    ids = listing["ids"]
+    return [
+        None if index is None else ids[index]
+        for index in listing[table_name][column]
+    ]
+
+
+def merge_listings(listings):
+    """
+    Return a new listing with the entries and the tasks of given listings.
+    Ids are interned again in the id table of the new listing.
+    """
+    first_listing = listings[0]
+    listing = new_listing(
+        first_listing["type"],
+        first_listing["entities"].keys(),
+        first_listing["id_columns"]["entities"],
+    )
+    intern_id = build_id_interner(listing)
+    for other_listing in listings:
+        other_ids = other_listing["ids"]
+
+        def convert(value):
+            if value is None:
+                return None
+            elif isinstance(value, list):
+                return [intern_id(other_ids[index]) for index in value]
+            else:
+                return intern_id(other_ids[value])
+
+        for table_name in ["entities", "tasks"]:
+            table = listing[table_name]
+            id_columns = listing["id_columns"][table_name]
+            for column, values in other_listing[table_name].items():
+                if column in id_columns:
+                    values = [convert(value) for value in values]
+                table[column].extend(values)
+    return listing
@@ -11,12 +11,15 @@ from zou.app.stores import auth_tokens_store, file_store
 from zou.app.services import (
     assets_service,
     backup_service,
+    cache_service,
     deletion_service,
     persons_service,
     projects_service,
     shots_service,
+    stats_service,
     sync_service,
     tasks_service,
+    time_spents_service,
 )
 
 from zou.app.services.exception import PersonNotFoundException
@@ -413,3 +416,23 @@ def upload_files_to_cloud_storage(days):
 
 def reset_tasks_data(project_id):
     deletion_service.reset_tasks_data(project_id)
+
+
+def warm_cache():
+    """
+    Load reference data and open projects into the cache.
+    """
+    result = cache_service.warm_cache()
+    for kind, count in sorted(result.items()):
+        print("%s %s cached." % (count, kind.replace("_", " ")))
+
+
+def rebuild_stats():
+    """
+    Compute again stored task stats of all projects and monthly sums of time
+    spents.
+    """
+    count = stats_service.rebuild_stats()
+    print("Task stats of %s projects rebuilt." % count)
+    count = time_spents_service.rebuild_monthly_time_spents()
+    print("%s monthly sums of time spents rebuilt." % count)
@@ -3,10 +3,12 @@ from sqlalchemy_utils import database_exists, create_database
 from sqlalchemy.engine.url import URL
 
 
-def get_db_uri():
-    from zou.app.config import DATABASE
+def get_db_uri(database=None):
+    if database is None:
+        from zou.app.config import DATABASE
 
-    return URL(**DATABASE)
+        database = DATABASE
+    return URL(**database)
 
 
 def is_db_exists():
@@ -1,10 +1,24 @@
+"""
+Events are not published right away: they are kept in an outbox attached to
+the database session. Their entries are inserted in the database with the
+transaction that commits, then committed events are relayed, in the order
+they were emitted: they are published to other services and their handlers
+are run. Events emitted during a transaction that is rolled back are dropped.
+During a request, events are relayed once the request is processed. Outside
+of requests, they are relayed right away.
+"""
+import datetime
+import json
+
 from collections import OrderedDict
 
-from flask import current_app
+from flask import has_request_context
+from sqlalchemy import event as sqlalchemy_event
 
+from zou.app import config, db
 from zou.app.stores import publisher_store
 from zou.app.models.event import ApiEvent
-from zou.app.utils import fields
+from zou.app.utils import cache, fields, handler_pool
 
 
 handlers = {}
@@ -17,6 +31,9 @@ def register(event, name, handler, app=None):
     Register a listener by linking an event name to an handler module.
     The handler module exposes a function named `handle_event` which is executed
     when linked event occurs.
+    It can expose instead a function named `handle_events` which receives
+    events in batches, as a list of dicts with the name and the data of each
+    event.
     """
     if event not in handlers:
         handlers[event] = OrderedDict()
@@ -62,37 +79,254 @@ def emit(event, data={}, persist=True):
     for that event name.
     It publishes too the event to other services
     (like the realtime event daemon).
+    The event is stored in the outbox until it is committed.
     """
-    event_handlers = handlers.get(event, {})
     data = fields.serialize_dict(data)
-    publisher_store.publish(event, data)
-    if persist:
-        save_event(event, data)
+    invalidate_cache_tags(db.session, data)
+    outbox = get_outbox(db.session)
+    outbox["pending"].append(
+        {
+            "name": event,
+            "data": data,
+            "row": build_event_row(event, data) if persist else None,
+            "saved": False,
+            "transactional": has_uncommitted_writes(db.session),
+        }
+    )
+    if len(get_unsaved_events(outbox)) >= config.EVENT_OUTBOX_FLUSH_SIZE:
+        save_events(db.session)
+    if not has_request_context():
+        flush()
+
+
+def invalidate_cache_tags(session, data):
+    """
+    Drop the memoized results depending on the entries listed in given event
+    data. While the session holds uncommitted writes, tags are only collected:
+    they are invalidated once the transaction is committed (see
+    `models.base`), so results can't be computed again from outdated data.
+    """
+    tags = cache.get_tags_from_event_data(data)
+    if has_uncommitted_writes(session) or "cache_tags" in session.info:
+        session.info.setdefault("cache_tags", set()).update(tags)
+    else:
+        cache.invalidate_tags(*tags)
+
+
+def get_changes_data(changes):
+    """
+    Return the data to add to an update event to describe given changes:
+    the modified fields with their new value. Nothing is added when changes
+    don't fit in EVENT_CHANGES_MAX_SIZE characters once encoded in JSON (0
+    disables changes). Clients that don't get changes fetch the entry again.
+    """
+    if not changes or config.EVENT_CHANGES_MAX_SIZE <= 0:
+        return {}
+    changes = fields.serialize_dict(changes)
+    if len(json.dumps(changes)) > config.EVENT_CHANGES_MAX_SIZE:
+        return {}
+    return {"changes": changes}
+
+
+def get_outbox(session):
+    """
+    Return the outbox of given session: events waiting for the commit of
+    their transaction (pending) and committed events waiting to be relayed
+    (ready).
+    """
+    if "events_outbox" not in session.info:
+        session.info["events_outbox"] = {
+            "pending": [],
+            "ready": [],
+            "relaying": False,
+        }
+    return session.info["events_outbox"]
+
+
+def has_uncommitted_writes(session):
+    return bool(
+        session.info.get("events_outbox_writes", False)
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
+
+def build_event_row(event, data):
+    """
+    Build the database entry of given event. The emission date is used as
+    creation date to keep the emission order.
+    """
+    try:
+        from zou.app.services.persons_service import get_current_user
+
+        person_id = get_current_user()["id"]
+    except:
+        person_id = None
+    now = datetime.datetime.utcnow()
+    return {
+        "id": fields.gen_uuid(),
+        "created_at": now,
+        "updated_at": now,
+        "name": event,
+        "data": data,
+        "user_id": person_id,
+    }
+
+
+def get_unsaved_events(outbox):
+    return [
+        event
+        for event in outbox["pending"]
+        if event["row"] is not None and not event["saved"]
+    ]
+
+
+def save_events(session):
+    """
+    Insert entries of pending events in the database with multi-row INSERT
+    statements of EVENT_OUTBOX_FLUSH_SIZE entries at most. Changes are not
+    committed.
+    """
+    events = get_unsaved_events(get_outbox(session))
+    size = config.EVENT_OUTBOX_FLUSH_SIZE
+    for index in range(0, len(events), size):
+        chunk = events[index : index + size]
+        session.execute(
+            ApiEvent.__table__.insert().values(
+                [event["row"] for event in chunk]
+            )
+        )
+        for event in chunk:
+            event["saved"] = True
+
+
+def flush():
+    """
+    Commit pending events, then relay committed events in emission order.
+    Events emitted by handlers are relayed too.
+    """
+    outbox = get_outbox(db.session)
+    if outbox["relaying"]:
+        return
+
+    outbox["relaying"] = True
+    try:
+        while len(outbox["pending"]) > 0 or len(outbox["ready"]) > 0:
+            if len(outbox["pending"]) > 0:
+                db.session.commit()
+            events = outbox["ready"]
+            outbox["ready"] = []
+            relay(events)
+    finally:
+        outbox["relaying"] = False
 
+
+def relay(events):
+    """
+    Publish given committed events in order, then run their handlers. Each
+    handler receives its events in order. Handlers are run through the job
+    queue, the handler pool or right away, depending on the configuration.
+    """
     from zou.app.config import ENABLE_JOB_QUEUE
 
-    for func in event_handlers.values():
+    for event in events:
+        publisher_store.publish(event["name"], event["data"])
+
+    for (name, func, handler_events) in get_handler_batches(events):
         if ENABLE_JOB_QUEUE:
             from zou.app.stores.queue_store import job_queue
 
-            job_queue.enqueue(func.handle_event, data)
+            if hasattr(func, "handle_events"):
+                job_queue.enqueue(func.handle_events, handler_events)
+            else:
+                for event in handler_events:
+                    job_queue.enqueue(func.handle_event, event["data"])
+        elif handler_pool.is_enabled():
+            handler_pool.submit(name, func, handler_events)
         else:
-            try:
-                func.handle_event(data)
-            except Exception:
-                current_app.logger.error("Error handling event", exc_info=1)
+            handler_pool.run(name, func, handler_events)
 
+    if not has_request_context() and not handler_pool.is_worker():
+        # Commands and jobs can exit before coalesced updates are published.
+        publisher_store.flush()
 
-def save_event(event, data):
+
+def get_handler_batches(events):
     """
-    Store event information in the database.
+    Return, for each handler of given events, the handler name, the handler
+    and the list of its events.
     """
-    try:
-        from zou.app.services.persons_service import get_current_user_raw
+    batches = OrderedDict()
+    for event in events:
+        for name, func in handlers.get(event["name"], {}).items():
+            if name not in batches:
+                batches[name] = (name, func, [])
+            batches[name][2].append(
+                {"name": event["name"], "data": event["data"]}
+            )
+    return list(batches.values())
 
-        person = get_current_user_raw()
-        person_id = person.id
-    except:
-        person_id = None
 
-    return ApiEvent.create(name=event, data=data, user_id=person_id)
+@sqlalchemy_event.listens_for(db.session, "after_flush")
+def track_flush(session, flush_context):
+    session.info["events_outbox_writes"] = True
+
+
+@sqlalchemy_event.listens_for(db.session, "after_bulk_update")
+@sqlalchemy_event.listens_for(db.session, "after_bulk_delete")
+def track_bulk_change(update_context):
+    update_context.session.info["events_outbox_writes"] = True
+
+
+@sqlalchemy_event.listens_for(db.session, "before_commit")
+def save_events_before_commit(session):
+    save_events(session)
+
+
+@sqlalchemy_event.listens_for(db.session, "after_commit")
+def mark_events_as_committed(session):
+    outbox = get_outbox(session)
+    outbox["ready"] += outbox["pending"]
+    outbox["pending"] = []
+    session.info["events_outbox_writes"] = False
+
+
+@sqlalchemy_event.listens_for(db.session, "after_rollback")
+def drop_rolled_back_events(session):
+    """
+    Drop events emitted during the rolled back transaction. Other pending
+    events are kept, their entries will be inserted with the next commit.
+    """
+    outbox = get_outbox(session)
+    outbox["pending"] = [
+        event for event in outbox["pending"] if not event["transactional"]
+    ]
+    for event in outbox["pending"]:
+        event["saved"] = False
+    session.info["events_outbox_writes"] = False
+
+
+def configure(app):
+    """
+    Register the request hooks that relay events emitted during the request.
+    When the request failed, the current transaction is rolled back first.
+    Events left by a request that raised an error are dropped.
+    """
+
+    @app.after_request
+    def flush_events(response):
+        outbox = get_outbox(db.session)
+        if len(outbox["pending"]) > 0 or len(outbox["ready"]) > 0:
+            try:
+                if response.status_code >= 400:
+                    db.session.rollback()
+                flush()
+            except Exception:
+                db.session.rollback()
+                app.logger.error("Events cannot be relayed", exc_info=1)
+        return response
+
+    @app.teardown_request
+    def drop_events(exception=None):
+        db.session.info.pop("events_outbox", None)
@@ -0,0 +1,161 @@
+"""
+Pool of worker threads that run event handlers in the background of the API
+process, when EVENT_HANDLERS_POOL_SIZE is greater than 0 and the job queue is
+disabled. With gevent workers, threads are monkey patched into greenlets.
+
+Calls are queued in a bounded queue (EVENT_HANDLERS_QUEUE_SIZE). When it is
+full, handlers are run by the emitter: emitters are slowed down instead of
+losing events. Each call is isolated: errors are logged and counted, they
+don't stop other handlers. Handler calls lasting more than
+EVENT_HANDLERS_TIMEOUT seconds are interrupted with gevent, they are only
+counted with regular threads.
+"""
+import queue
+import threading
+import time
+
+from flask import current_app
+
+from zou.app import config
+
+try:
+    import gevent
+
+    from gevent import monkey
+except ImportError:
+    gevent = None
+
+
+STATS_FIELDS = ["submitted", "inline", "completed", "failed", "timed_out"]
+
+calls = None
+workers = []
+start_lock = threading.Lock()
+stats = dict.fromkeys(STATS_FIELDS, 0)
+stats["max_queue_size"] = 0
+stats_lock = threading.Lock()
+
+
+def is_enabled():
+    return config.EVENT_HANDLERS_POOL_SIZE > 0
+
+
+def start():
+    """
+    Start worker threads if they are not running yet. It is done on first use
+    to start them in each process forked by the application server.
+    """
+    global calls
+
+    with start_lock:
+        if calls is None:
+            calls = queue.Queue(maxsize=config.EVENT_HANDLERS_QUEUE_SIZE)
+            for index in range(config.EVENT_HANDLERS_POOL_SIZE):
+                worker = threading.Thread(
+                    target=work, name="event-handlers-%s" % index
+                )
+                worker.daemon = True
+                worker.start()
+                workers.append(worker)
+    return calls
+
+
+def is_worker():
+    """
+    Tell if the current thread is a worker thread of the pool.
+    """
+    return threading.current_thread() in workers
+
+
+def submit(name, handler, events):
+    """
+    Queue the run of given handler for given events. If the queue is full,
+    the handler is run right away.
+    """
+    try:
+        start().put_nowait((name, handler, events))
+        record_stats(submitted=1)
+        with stats_lock:
+            stats["max_queue_size"] = max(
+                stats["max_queue_size"], calls.qsize()
+            )
+    except queue.Full:
+        record_stats(inline=1)
+        run(name, handler, events)
+
+
+def work():
+    from zou.app import app
+
+    while True:
+        (name, handler, events) = calls.get()
+        try:
+            with app.app_context():
+                run(name, handler, events, timeout=True)
+        except Exception:
+            app.logger.error(
+                "Event handler %s cannot be run" % name, exc_info=1
+            )
+        finally:
+            calls.task_done()
+
+
+def run(name, handler, events, timeout=False):
+    """
+    Run given handler for given events: once for all events if the handler
+    exposes a `handle_events` function, once per event otherwise.
+    """
+    if hasattr(handler, "handle_events"):
+        run_call(name, handler.handle_events, events, timeout)
+    else:
+        for event in events:
+            run_call(name, handler.handle_event, event["data"], timeout)
+
+
+def run_call(name, function, argument, timeout=False):
+    started_at = time.time()
+    try:
+        if timeout and is_gevent_patched():
+            with gevent.Timeout(config.EVENT_HANDLERS_TIMEOUT):
+                function(argument)
+        else:
+            function(argument)
+        if (
+            timeout
+            and time.time() - started_at > config.EVENT_HANDLERS_TIMEOUT
+        ):
+            record_stats(timed_out=1)
+        record_stats(completed=1)
+    except Exception:
+        record_stats(failed=1)
+        current_app.logger.error(
+            "Error handling event with %s" % name, exc_info=1
+        )
+    except BaseException as exception:
+        if gevent is not None and isinstance(exception, gevent.Timeout):
+            record_stats(timed_out=1)
+            current_app.logger.error("Event handler %s timed out" % name)
+        else:
+            raise
+
+
+def is_gevent_patched():
+    return gevent is not None and monkey.is_module_patched("threading")
+
+
+def record_stats(**values):
+    with stats_lock:
+        for field, value in values.items():
+            stats[field] += value
+
+
+def get_stats():
+    """
+    Return counters of handler runs and the current load of the pool.
+    """
+    with stats_lock:
+        result = dict(stats)
+    result["enabled"] = is_enabled()
+    result["workers"] = len(workers)
+    result["queue_size"] = calls.qsize() if calls is not None else 0
+    return result
@@ -1,7 +1,34 @@
+import base64
+import json
 import math
+import uuid
 
-from zou.app import app
-from zou.app.utils import fields
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from zou.app import app, db
+from zou.app.services.exception import WrongParameterException
+from zou.app.utils import columnar, fields
+
+
+CURSOR_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN statement of given query, to get the planner estimates.
+    """
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) %s" % compiler.process(
+        element.statement, **kw
+    )
 
 
 def get_query_criterions_from_request(request):
@@ -11,7 +38,7 @@ def get_query_criterions_from_request(request):
     """
     criterions = {}
     for key, value in request.args.items():
-        if key not in ["page"]:
+        if key not in ["page", "cursor", "total", "fields", "format"]:
             criterions[key] = value
     return criterions
 
@@ -24,6 +51,50 @@ def get_page_from_request(request):
     return request.args.get("page", 1)
 
 
+def get_fields_from_request(request):
+    """
+    Return the list of fields given through the fields parameter (comma
+    separated names). None means that all fields are required.
+    """
+    fields_option = request.args.get("fields", "")
+    fields = [field.strip() for field in fields_option.split(",")]
+    fields = [field for field in fields if field]
+    if len(fields) > 0:
+        return fields
+    else:
+        return None
+
+
+def is_columnar_format_requested(request):
+    """
+    Return True if the client asks for the columnar format, through the
+    format parameter or the Accept header.
+    """
+    return (
+        request.args.get("format", None) == columnar.FORMAT_NAME
+        or request.accept_mimetypes.best == columnar.MIMETYPE
+    )
+
+
+def select_fields(entry, fields):
+    """
+    Keep only given fields in given serialized entry.
+    """
+    return {field: entry[field] for field in fields if field in entry}
+
+
+def select_fields_from_request(request, entries):
+    """
+    Keep only the fields given through the fields parameter in given
+    serialized entries.
+    """
+    fields = get_fields_from_request(request)
+    if fields is None:
+        return entries
+    else:
+        return [select_fields(entry, fields) for entry in entries]
+
+
 def apply_criterions_to_db_query(model, db_query, criterions):
     """
     Apply criterions given in HTTP request to the sqlachemy db query object.
@@ -72,3 +143,109 @@ def get_paginated_results(query, page, relations=False):
                 "page": page,
             }
         return result
+
+
+def get_estimated_count(query):
+    """
+    Return the number of rows the database planner expects for given query.
+    It's much cheaper than a count on large tables, but it's only an estimate
+    based on table statistics.
+    """
+    plan = db.session.execute(Explain(query.statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_query_total(query, total_mode):
+    """
+    Return the exact total of entries for given query if *total_mode* is
+    "exact", an estimate if it is "estimate" and None otherwise.
+    """
+    if total_mode == "exact":
+        return query.count()
+    elif total_mode == "estimate":
+        return get_estimated_count(query)
+    else:
+        return None
+
+
+def encode_cursor(updated_at, entry_id):
+    """
+    Build an opaque cursor pointing after the entry with given update date
+    and id.
+    """
+    if updated_at is not None:
+        updated_at = updated_at.strftime(CURSOR_DATE_FORMAT)
+    value = json.dumps([updated_at, str(entry_id)])
+    return base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Return the update date and the id stored in given cursor.
+    """
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        (updated_at, entry_id) = json.loads(value.decode("utf-8"))
+        if updated_at is not None:
+            updated_at = fields.get_date_object(
+                updated_at, CURSOR_DATE_FORMAT
+            )
+        return (updated_at, str(uuid.UUID(entry_id)))
+    except (TypeError, ValueError, UnicodeError, AttributeError):
+        raise WrongParameterException("Cursor is not valid.")
+
+
+def apply_cursor(query, model, cursor):
+    """
+    Sort query by last update then by id and keep only entries located after
+    given cursor. Unlike an offset, the cursor doesn't require the database
+    to walk through all previous entries.
+    """
+    query = query.order_by(None).order_by(
+        model.updated_at.desc().nullslast(), model.id.desc()
+    )
+    if cursor:
+        (updated_at, entry_id) = decode_cursor(cursor)
+        if updated_at is None:
+            query = query.filter(
+                and_(model.updated_at.is_(None), model.id < entry_id)
+            )
+        else:
+            query = query.filter(
+                or_(
+                    model.updated_at < updated_at,
+                    and_(model.updated_at == updated_at, model.id < entry_id),
+                    model.updated_at.is_(None),
+                )
+            )
+    return query
+
+
+def get_cursor_results(
+    query, model, cursor, relations=False, total_mode=None, serialize=None
+):
+    """
+    Apply cursor pagination to the query object. The next cursor is None
+    when there is no more entries. The total is given only if required (see
+    get_query_total).
+    """
+    limit = app.config["NB_RECORDS_PER_PAGE"]
+    total = get_query_total(query, total_mode)
+    query = apply_cursor(query, model, cursor).limit(limit + 1)
+    entries = query.all()
+    has_next = len(entries) > limit
+    entries = entries[:limit]
+    if serialize is None:
+        data = fields.serialize_models(entries, relations=relations)
+    else:
+        data = serialize(entries)
+
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor(entries[-1].updated_at, entries[-1].id)
+    result = {"data": data, "limit": limit, "next_cursor": next_cursor}
+    if total is not None:
+        result["total"] = total
+    return result
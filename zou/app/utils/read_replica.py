@@ -0,0 +1,198 @@
+"""
+Routing of read only queries to a read replica of the database.
+
+Queries are sent to the replica only during GET requests and calls to
+functions decorated with use_read_replica. Everything else goes to the primary
+database: flushes, insert/update/delete statements, and all queries of a
+session once it wrote something. A user that wrote something is pinned to the
+primary database for a short time, so they read their own writes even if the
+replica is late. The replica is not used when it lags too much.
+
+Memoized functions always read from the primary database: a result computed
+from a late replica would be kept in the cache long after the replica caught
+up.
+"""
+import time
+
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy import SignallingSession, SQLAlchemy
+from sqlalchemy import orm, text
+from sqlalchemy.sql.expression import CompoundSelect, Select, UpdateBase
+
+from zou.app.stores import read_replica_store
+
+
+REPLICA_BIND = "replica"
+
+# Lag in seconds. It is 0 when the replica replayed all it received (the
+# primary may just be idle) or when it's not a standby server (stand-in).
+LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+    """
+)
+
+replica_status = {"checked_at": None, "lag": None}
+
+
+def is_read_replica_configured(app):
+    return REPLICA_BIND in (app.config.get("SQLALCHEMY_BINDS", None) or {})
+
+
+def get_replica_lag(db, app):
+    """
+    Return the lag of the read replica in seconds, None if it can't be
+    reached.
+    """
+    try:
+        engine = db.get_engine(app, bind=REPLICA_BIND)
+        with engine.connect() as connection:
+            lag = connection.execute(LAG_QUERY).scalar()
+        return 0 if lag is None else float(lag)
+    except Exception:
+        app.logger.error("Read replica cannot be checked", exc_info=1)
+        return None
+
+
+def is_replica_lag_acceptable(db, app):
+    """
+    Check that the read replica doesn't lag too much. The lag is checked once
+    every READ_REPLICA_CHECK_INTERVAL seconds per process.
+    """
+    now = time.time()
+    checked_at = replica_status["checked_at"]
+    if (
+        checked_at is None
+        or now - checked_at >= app.config["READ_REPLICA_CHECK_INTERVAL"]
+    ):
+        replica_status["lag"] = get_replica_lag(db, app)
+        replica_status["checked_at"] = now
+    lag = replica_status["lag"]
+    return lag is not None and lag <= app.config["READ_REPLICA_MAX_LAG"]
+
+
+def get_pin_key():
+    try:
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def is_read_replica_requested():
+    return has_app_context() and g.get("read_replica", False)
+
+
+def is_read_replica_usable(db, app):
+    """
+    Tell if the read replica can be used for the current request: it is
+    configured, the current user didn't write something recently and the
+    replica doesn't lag too much. The result is kept for the whole request.
+    """
+    usable = g.get("read_replica_usable", None)
+    if usable is None:
+        pin_key = get_pin_key()
+        usable = (
+            is_read_replica_configured(app)
+            and (pin_key is None or not read_replica_store.is_pinned(pin_key))
+            and is_replica_lag_acceptable(db, app)
+        )
+        g.read_replica_usable = usable
+    return usable
+
+
+class RoutingSession(SignallingSession):
+    """
+    Session that sends read only queries to the read replica when it's
+    requested and usable.
+    """
+
+    def get_bind(self, mapper=None, clause=None):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["has_writes"] = True
+        elif (
+            isinstance(clause, (Select, CompoundSelect))
+            and not self.info.get("has_writes", False)
+            and is_read_replica_requested()
+            and is_read_replica_usable(self.db, self.app)
+        ):
+            return self.db.get_engine(self.app, bind=REPLICA_BIND)
+        return SignallingSession.get_bind(self, mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+def use_read_replica(function):
+    """
+    Decorator for service functions that only read data: their queries are
+    sent to the read replica, even outside of GET requests.
+    """
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if not has_app_context() or g.get("read_replica", False):
+            return function(*args, **kwargs)
+        g.read_replica = True
+        try:
+            return function(*args, **kwargs)
+        finally:
+            g.read_replica = False
+
+    return wrapper
+
+
+def use_primary(function):
+    """
+    Decorator for functions that must read up to date data: their queries are
+    sent to the primary database, even during GET requests.
+    """
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if not has_app_context() or not g.get("read_replica", False):
+            return function(*args, **kwargs)
+        g.read_replica = False
+        try:
+            return function(*args, **kwargs)
+        finally:
+            g.read_replica = True
+
+    return wrapper
+
+
+def configure(app, db):
+    """
+    Register the request hooks that enable the read replica for GET requests
+    and pin users who wrote something to the primary database.
+    """
+
+    @app.before_request
+    def enable_read_replica():
+        g.read_replica = request.method == "GET"
+
+    @app.after_request
+    def pin_writers_to_primary(response):
+        if is_read_replica_configured(app) and db.session.info.get(
+            "has_writes", False
+        ):
+            pin_key = get_pin_key()
+            if pin_key is not None:
+                read_replica_store.pin(
+                    pin_key, current_app.config["READ_REPLICA_PIN_DURATION"]
+                )
+        return response
+
+    @app.teardown_request
+    def disable_read_replica(exception=None):
+        g.pop("read_replica", None)
+        g.pop("read_replica_usable", None)
+        db.session.info.pop("has_writes", None)
@@ -311,5 +311,32 @@ def clean_tasks_data(projectid):
         commands.reset_tasks_data(projectid)
 
 
+@cli.command()
+def warm_cache():
+    """
+    Load reference data (task types, task statuses, asset types, persons...)
+    and open projects into the cache. Run it after a deployment or a cache
+    flush so the first requests don't pay for cold misses.
+    """
+    from zou.app import app
+
+    with app.app_context():
+        commands.warm_cache()
+
+
+@cli.command()
+def rebuild_stats():
+    """
+    Compute again task stats (counts by episode, sequence and asset type)
+    of all projects from their tasks and monthly sums of time spents. They
+    are maintained when data change, run it after a data import or if they
+    look wrong.
+    """
+    from zou.app import app
+
+    with app.app_context():
+        commands.rebuild_stats()
+
+
 if __name__ == "__main__":
     cli()
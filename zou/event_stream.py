@@ -1,11 +1,20 @@
 from flask import Flask, jsonify
-from flask_socketio import SocketIO
+from flask_jwt_extended import (
+    JWTManager,
+    get_jwt_identity,
+    verify_jwt_in_request,
+)
+from flask_socketio import SocketIO, join_room
 from zou.app import config
 
 from gevent import monkey
 
 monkey.patch_all()
 
+from zou.app.services import persons_service, projects_service
+from zou.app.services.exception import PersonNotFoundException
+from zou.app.stores import auth_tokens_store, publisher_store
+
 
 def get_redis_url():
     redis_host = config.KEY_VALUE_STORE["host"]
@@ -13,11 +22,46 @@ def get_redis_url():
     return "redis://%s:%s/2" % (redis_host, redis_port)
 
 
+def get_rooms(email):
+    """
+    Return the rooms the person with given email joins: its own room, and
+    the rooms of its projects or the administrator room. Return None if the
+    person doesn't exist or is not active.
+    """
+    from zou.app import app as api_app
+
+    with api_app.app_context():
+        try:
+            person = persons_service.get_person_by_email_raw(email)
+        except PersonNotFoundException:
+            return None
+        if not person.active:
+            return None
+
+        rooms = [publisher_store.get_person_room(person.id)]
+        if person.role == "admin":
+            rooms.append(publisher_store.ADMINS_ROOM)
+        else:
+            project_ids = projects_service.get_project_ids_for_team_member(
+                person.id
+            )
+            rooms += [
+                publisher_store.get_project_room(project_id)
+                for project_id in project_ids
+            ]
+        return rooms
+
+
 def create_app(redis_url):
     socketio = SocketIO(logger=True)
 
     app = Flask(__name__)
-    app.config["SECRET_KEY"] = config.SECRET_KEY
+    app.config.from_object(config)
+    jwt = JWTManager(app)
+
+    @jwt.token_in_blacklist_loader
+    def check_if_token_is_revoked(decrypted_token):
+        return auth_tokens_store.is_revoked(decrypted_token)
 
     @app.route("/")
     def index():
@@ -25,7 +69,28 @@ def create_app(redis_url):
 
     @socketio.on("connect", namespace="/events")
     def connected():
-        app.logger.info("New websocket client connected")
+        """
+        When rooms are enabled, clients are authenticated with their JWT (in
+        cookies or headers), then they join their rooms.
+        """
+        if not config.EVENT_STREAM_ROOMS:
+            app.logger.info("New websocket client connected")
+            return
+
+        try:
+            verify_jwt_in_request()
+            email = get_jwt_identity()
+        except Exception:
+            app.logger.info("Websocket client rejected: no valid token")
+            return False
+
+        rooms = get_rooms(email)
+        if rooms is None:
+            app.logger.info("Websocket client rejected: unknown user")
+            return False
+        for room in rooms:
+            join_room(room)
+        app.logger.info("New websocket client connected: %s" % email)
 
     @socketio.on_error("/events")
     def on_error(error):